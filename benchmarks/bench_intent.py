@@ -0,0 +1,141 @@
+"""
+Benchmark: local intent classifier vs. the intent LLM call
+
+Evaluates, on a labelled JSONL file ({"text", "label"} per line):
+  - rules:  lexical greeting/help rules alone (offline)
+  - local:  rules + nearest-centroid over dense embeddings, leave-one-out when the evaluation
+            file is the training file; questions below the confidence margin count as fallbacks
+  - llm:    the current intent_prompt on Azure OpenAI
+
+The local and llm rows need Azure OpenAI credentials; they are skipped when unavailable.
+Reported local latency excludes the question embedding, which retrieval needs anyway and
+reads from the shared embedding cache.
+
+Usage:
+    python -m benchmarks.bench_intent [--eval FILE] [--skip-llm]
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+import numpy as np
+
+from convBI.intent_classifier import (
+    DEFAULT_EXAMPLES_PATH,
+    LocalIntentClassifier,
+    classify_rules,
+    load_examples,
+)
+from services.embedding_cache import DENSE
+from services.hybrid_retrieval import DENSE_MODEL_NAME
+
+
+def _latency(samples):
+    samples = sorted(samples)
+    return {
+        "mean_ms": statistics.mean(samples),
+        "p50_ms": samples[len(samples) // 2],
+        "p95_ms": samples[max(int(len(samples) * 0.95) - 1, 0)],
+    }
+
+
+def _report(name, results, total, latencies):
+    decided = [r for r in results if r is not None]
+    correct = sum(1 for r in decided if r[0] == r[1])
+    coverage = len(decided) / total if total else 0.0
+    accuracy = correct / len(decided) if decided else 0.0
+    stats = _latency(latencies) if latencies else {"mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0}
+    print(
+        f"  {name:<8} decided={coverage:6.1%}  accuracy={accuracy:6.1%}  "
+        f"mean={stats['mean_ms']:8.3f} ms  p50={stats['p50_ms']:8.3f} ms  p95={stats['p95_ms']:8.3f} ms"
+    )
+
+
+def bench_rules(examples):
+    results, latencies = [], []
+    for example in examples:
+        t0 = time.perf_counter()
+        prediction = classify_rules(example["text"])
+        latencies.append((time.perf_counter() - t0) * 1000)
+        results.append((prediction.label, example["label"]) if prediction else None)
+    _report("rules", results, len(examples), latencies)
+
+
+def bench_local(train_examples, eval_examples, leave_one_out):
+    try:
+        classifier = LocalIntentClassifier(train_examples)
+        classifier.train()
+        vectors = [
+            classifier.embedding_cache.get_or_compute(DENSE, DENSE_MODEL_NAME, e["text"], classifier.embeddings.embed_query)
+            for e in eval_examples
+        ]
+    except Exception as e:
+        print(f"  local    skipped: {e}")
+        return
+    train_vectors = [classifier.embedding_cache.get(DENSE, DENSE_MODEL_NAME, e["text"]) for e in train_examples]
+
+    results, latencies = [], []
+    for i, (example, vector) in enumerate(zip(eval_examples, vectors)):
+        if leave_one_out:
+            classifier.examples = train_examples[:i] + train_examples[i + 1:]
+            classifier._fit(train_vectors[:i] + train_vectors[i + 1:])
+        t0 = time.perf_counter()
+        prediction = classify_rules(example["text"])
+        if prediction is None:
+            prediction = classifier._accept(classifier.predict_vector(vector), has_history=False)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        results.append((prediction.label, example["label"]) if prediction else None)
+    _report("local", results, len(eval_examples), latencies)
+
+
+def bench_llm(examples):
+    from langchain_openai import AzureChatOpenAI
+    from convBI.agents.intent import run as run_intent
+    from convBI.prompts import intent_prompt
+
+    try:
+        llm = AzureChatOpenAI(
+            azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
+            azure_deployment=os.environ["AZURE_OPENAI_DEPLOYMENT_NAME"],
+            openai_api_version=os.environ["AZURE_OPENAI_API_VERSION"],
+            api_key=os.environ["AZURE_OPENAI_API_KEY"]
+        )
+    except Exception as e:
+        print(f"  llm      skipped: {e}")
+        return
+
+    results, latencies = [], []
+    try:
+        for example in examples:
+            state = {"question": example["text"], "history": []}
+            t0 = time.perf_counter()
+            run_intent(state, llm, intent_prompt, lambda tag: {})
+            latencies.append((time.perf_counter() - t0) * 1000)
+            results.append((state["intent"], example["label"]))
+    except Exception as e:
+        print(f"  llm      skipped: {e}")
+        return
+    _report("llm", results, len(examples), latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--eval", default=None, help="Labelled JSONL to evaluate on (default: leave-one-out on the training file)")
+    parser.add_argument("--skip-llm", action="store_true", help="Do not call the intent LLM")
+    args = parser.parse_args()
+
+    train_examples = load_examples(DEFAULT_EXAMPLES_PATH)
+    eval_examples = load_examples(args.eval) if args.eval else train_examples
+    labels, counts = np.unique([e["label"] for e in eval_examples], return_counts=True)
+
+    print(f"Intent classification over {len(eval_examples)} questions ({', '.join(f'{l}={c}' for l, c in zip(labels, counts))})")
+    bench_rules(eval_examples)
+    bench_local(train_examples, eval_examples, leave_one_out=args.eval is None)
+    if not args.skip_llm:
+        bench_llm(eval_examples)
+
+
+if __name__ == "__main__":
+    main()
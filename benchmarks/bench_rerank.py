@@ -0,0 +1,120 @@
+"""
+Benchmark: reranking latency and recall, Cohere vs. local cross-encoder vs. RRF only
+
+For every labelled question ({"question", "tables"} per line, expected table names), the RRF
+candidates are fetched once from the indexed collection (hybrid search without reranking,
+k * 3 candidates as search_tables requests when reranking) and then reordered by:
+  - rrf:        the fused Qdrant order as is
+  - cohere:     Cohere Rerank API (needs COHERE_API_KEY)
+  - fastembed:  local ONNX cross-encoder (LOCAL_RERANK_MODEL)
+Reported per path: recall@k of the expected tables, MRR of the first expected table, and rerank
+latency (the shared hybrid search is timed separately). Paths whose reranker cannot be created
+are skipped.
+
+Needs an indexed collection and the query embedding credentials (Azure OpenAI) for the search.
+
+Usage:
+    python -m benchmarks.bench_rerank [--collection NAME] [--queries FILE] [-k N] [--repeat N]
+"""
+
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+from services.hybrid_retrieval import HybridRetrieval
+from services.reranker import create_reranker
+
+# Questions over semantics/template.json and the tables they need
+DEFAULT_QUERIES = [
+    {"question": "How many users signed up last month?", "tables": ["users"]},
+    {"question": "List active users with their email addresses", "tables": ["users"]},
+    {"question": "Which organizations are in the healthcare industry?", "tables": ["organizations"]},
+    {"question": "Number of users per organization", "tables": ["users", "organizations"]},
+    {"question": "How many page views did we get yesterday?", "tables": ["events"]},
+    {"question": "Most common event types in the last week", "tables": ["events"]},
+    {"question": "Which users triggered the most purchase events?", "tables": ["events", "users"]},
+    {"question": "Show failed reports generated this month", "tables": ["reports"]},
+    {"question": "How many weekly reports does each organization have?", "tables": ["reports", "organizations"]},
+    {"question": "List critical safety incidents that are still open", "tables": ["incidents"]},
+    {"question": "Where do most near misses happen?", "tables": ["incidents"]},
+    {"question": "Who reported the most injuries?", "tables": ["incidents", "users"]},
+]
+
+
+def load_queries(path):
+    if path is None:
+        return DEFAULT_QUERIES
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _latency(samples):
+    if not samples:
+        return {"p50_ms": 0.0, "p95_ms": 0.0}
+    samples = sorted(samples)
+    return {"p50_ms": samples[len(samples) // 2], "p95_ms": samples[max(int(len(samples) * 0.95) - 1, 0)]}
+
+
+def _quality(ranked_names, expected, k):
+    recall = len(set(ranked_names[:k]) & set(expected)) / len(expected)
+    reciprocal_rank = next((1 / (i + 1) for i, name in enumerate(ranked_names) if name in expected), 0.0)
+    return recall, reciprocal_rank
+
+
+def _report(name, qualities, latencies, k):
+    stats = _latency(latencies)
+    print(
+        f"  {name:<10} recall@{k}={statistics.mean(q[0] for q in qualities):6.1%}  "
+        f"MRR={statistics.mean(q[1] for q in qualities):6.3f}  "
+        f"p50={stats['p50_ms']:8.1f} ms  p95={stats['p95_ms']:8.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collection", default="semantics", help="Indexed Qdrant collection")
+    parser.add_argument("--queries", type=Path, default=None, help="Labelled questions (JSONL); defaults to the template set")
+    parser.add_argument("-k", type=int, default=3, help="Tables kept after reranking")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed reranks per question (best is kept)")
+    args = parser.parse_args()
+
+    queries = load_queries(args.queries)
+    retrieval = HybridRetrieval(args.collection, use_reranking=False)
+    candidates, search_ms = [], []
+    for query in queries:
+        t0 = time.perf_counter()
+        candidates.append(retrieval.search_tables(query["question"], k=args.k * 3, use_reranking=False))
+        search_ms.append((time.perf_counter() - t0) * 1000)
+    stats = _latency(search_ms)
+    print(f"{len(queries)} questions on {args.collection}, {args.k * 3} RRF candidates each")
+    print(f"  hybrid search (shared)  p50={stats['p50_ms']:8.1f} ms  p95={stats['p95_ms']:8.1f} ms")
+
+    _report(
+        "rrf",
+        [_quality([r["table_name"] for r in results], query["tables"], args.k) for query, results in zip(queries, candidates)],
+        [],
+        args.k
+    )
+    for name in ("cohere", "fastembed"):
+        reranker = create_reranker(name)
+        if reranker is None:
+            print(f"  {name:<10} skipped: reranker unavailable")
+            continue
+        # Warm-up (model load / connection setup) is not part of the per-question latency
+        reranker.rerank_results(queries[0]["question"], candidates[0], args.k)
+        qualities, latencies = [], []
+        for query, results in zip(queries, candidates):
+            timings = []
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                reranked = reranker.rerank_results(query["question"], results, args.k)
+                timings.append((time.perf_counter() - t0) * 1000)
+            latencies.append(min(timings))
+            qualities.append(_quality([r["table_name"] for r in reranked], query["tables"], args.k))
+        _report(name, qualities, latencies, args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: result profiling cost and prompt size for large query results
+
+Builds a synthetic result (timestamp, category with nulls, amount, quantity with nulls, flag),
+times profile_result and compares the prompt input for the summarizer:
+  - records:  str() of the list of row dicts the prompts used to receive
+  - sampled:  CSV rendering sampled to the token budget, no profile
+  - profile:  column profile + row sample within the same budget
+
+Token counts use tiktoken when the encoding is available, otherwise a ~4 chars/token estimate.
+
+Usage:
+    python -m benchmarks.bench_result_profile [--rows N] [--repeat N]
+"""
+
+import argparse
+import datetime
+import random
+import time
+
+from convBI.query_result import QueryResult, render_for_prompt, token_budget
+from convBI.result_profile import profile_result
+from convBI.token_budget import count_tokens
+
+
+def build_result(n_rows: int, seed: int = 7) -> QueryResult:
+    rng = random.Random(seed)
+    start = datetime.datetime(2023, 1, 1)
+    regions = ["north", "south", "east", "west"]
+    rows = [
+        (
+            start + datetime.timedelta(hours=i),
+            rng.choice(regions) if rng.random() > 0.2 else None,
+            round(1000 + i / n_rows * 1000 + rng.gauss(0, 150), 2),
+            rng.randint(1, 20) if rng.random() > 0.1 else None,
+            rng.random() < 0.5,
+        )
+        for i in range(n_rows)
+    ]
+    return QueryResult.from_rows(
+        ["ts", "region", "revenue", "qty", "flag"],
+        ["timestamp", "text", "numeric", "int4", "bool"],
+        rows,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows in the synthetic result")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed profiling runs (best is reported)")
+    args = parser.parse_args()
+
+    result = build_result(args.rows)
+    timings = []
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        profile = profile_result(result)
+        timings.append((time.perf_counter() - t0) * 1000)
+
+    print(f"Result profiling over {args.rows} rows x {len(result.columns)} columns")
+    print(f"  profile_result  best={min(timings):8.1f} ms  worst={max(timings):8.1f} ms")
+
+    budget = token_budget("summarizer")
+    variants = {
+        "records": str(result.records()),
+        "sampled": render_for_prompt({"query_result": result}, "summarizer"),
+        "profile": render_for_prompt({"query_result": result, "result_profile": profile}, "summarizer"),
+    }
+    print(f"Summarizer prompt input (budget {budget} tokens)")
+    for name, text in variants.items():
+        print(f"  {name:<8} tokens={count_tokens(text):>10}")
+
+
+if __name__ == "__main__":
+    main()
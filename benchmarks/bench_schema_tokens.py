@@ -0,0 +1,83 @@
+"""
+Benchmark: prompt tokens of the retrieved schema, dict repr vs compact DDL
+
+Builds the semantics dict the retrieval step hands to text-to-SQL (every table of the template,
+in the shape QdrantService._organize_results produces) and compares:
+  - dict:  str() of the semantics, what the prompts used to receive
+  - ddl:   annotated CREATE TABLE-style rendering (convBI.schema_ddl)
+per table and in total, plus the cost of a cold render and a cached one.
+
+Token counts use tiktoken when the encoding is available, otherwise a ~4 chars/token estimate.
+
+Usage:
+    python -m benchmarks.bench_schema_tokens [--template PATH] [--repeat N]
+"""
+
+import argparse
+import hashlib
+import json
+import time
+from pathlib import Path
+
+from convBI import schema_ddl
+from convBI.token_budget import count_tokens
+
+DEFAULT_TEMPLATE = Path(__file__).parent.parent / "semantics" / "template.json"
+
+
+def load_semantics(path: Path) -> dict:
+    data = json.loads(Path(path).read_text())
+    semantics = {}
+    for schema_data in data.get("schemas", {}).values():
+        for table in schema_data.get("tables", []):
+            semantics[table["table_name"]] = {
+                "table_name": table["table_name"],
+                "description": table.get("description", ""),
+                "primary_key": table.get("primary_key", []),
+                "foreign_keys": table.get("foreign_keys", []),
+                "columns": table.get("columns", []),
+                "indexes": table.get("indexes", []),
+                # Stands in for the content hash stored with the indexed point (the render cache key)
+                "content_hash": hashlib.sha256(json.dumps(table, sort_keys=True).encode("utf-8")).hexdigest(),
+            }
+    return semantics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--template", type=Path, default=DEFAULT_TEMPLATE, help="Semantic template JSON")
+    parser.add_argument("--repeat", type=int, default=1000, help="Timed renders (best is reported)")
+    args = parser.parse_args()
+
+    semantics = load_semantics(args.template)
+    print(f"Schema prompt tokens for {len(semantics)} tables from {args.template}")
+    print(f"  {'table':<20} {'dict':>8} {'ddl':>8} {'saved':>7}")
+    for table_name, table in semantics.items():
+        dict_tokens = count_tokens(str(schema_ddl.prompt_semantics({table_name: table})))
+        ddl_tokens = count_tokens(schema_ddl.render_table(table_name, table))
+        print(f"  {table_name:<20} {dict_tokens:>8} {ddl_tokens:>8} {1 - ddl_tokens / dict_tokens:>7.0%}")
+
+    dict_tokens = count_tokens(str(schema_ddl.prompt_semantics(semantics)))
+    ddl_tokens = count_tokens(schema_ddl.render_schema(semantics))
+    print(f"  {'total':<20} {dict_tokens:>8} {ddl_tokens:>8} {1 - ddl_tokens / dict_tokens:>7.0%}")
+
+    timings = {"dict": [], "ddl cold": [], "ddl cached": []}
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        str(schema_ddl.prompt_semantics(semantics))
+        t1 = time.perf_counter()
+        schema_ddl._cache.clear()
+        schema_ddl.render_schema(semantics)
+        t2 = time.perf_counter()
+        schema_ddl.render_schema(semantics)
+        t3 = time.perf_counter()
+        timings["dict"].append((t1 - t0) * 1e6)
+        timings["ddl cold"].append((t2 - t1) * 1e6)
+        timings["ddl cached"].append((t3 - t2) * 1e6)
+    print("Render time per request")
+    for name, values in timings.items():
+        print(f"  {name:<11} best={min(values):8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: per-request workflow setup cost
+
+Compares the old request path (build a TextToSQLWorkflow, then build and compile the
+LangGraph for every question) against the shared, compiled-once workflow created in
+the FastAPI lifespan. No network access is needed: the Azure client and the Redis
+pool are constructed but never used.
+
+Usage:
+    python -m benchmarks.bench_workflow_setup [iterations]
+"""
+
+import os
+import sys
+import statistics
+import time
+
+# Dummy credentials so the clients can be constructed offline
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "https://example.openai.azure.com/")
+os.environ.setdefault("AZURE_OPENAI_DEPLOYMENT_NAME", "benchmark")
+os.environ.setdefault("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "benchmark")
+
+from langchain_openai import AzureChatOpenAI
+
+from convBI.conversationalBI import TextToSQLWorkflow
+from convBI.redis_session import RedisSessionService
+
+
+def _measure(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        "mean_ms": statistics.mean(samples),
+        "p50_ms": samples[len(samples) // 2],
+        "p95_ms": samples[int(len(samples) * 0.95) - 1],
+    }
+
+
+def main(iterations: int = 200):
+    shared = TextToSQLWorkflow()
+
+    def per_request_setup():
+        # What every request used to pay before the lifespan-managed workflow:
+        # a new LLM client, a new Redis client and a freshly compiled graph
+        AzureChatOpenAI(
+            azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
+            azure_deployment=os.environ["AZURE_OPENAI_DEPLOYMENT_NAME"],
+            openai_api_version=os.environ["AZURE_OPENAI_API_VERSION"],
+            api_key=os.environ["AZURE_OPENAI_API_KEY"]
+        )
+        RedisSessionService().close()
+        shared._build_workflow().compile()
+
+    def shared_setup():
+        # What every request pays now: a lookup of the shared instance
+        return shared.graph
+
+    results = {
+        "per_request (old)": _measure(per_request_setup, iterations),
+        "shared (new)": _measure(shared_setup, iterations),
+    }
+    shared.close()
+
+    print(f"Workflow setup overhead over {iterations} iterations")
+    for name, stats in results.items():
+        print(
+            f"  {name:<20} mean={stats['mean_ms']:8.3f} ms  "
+            f"p50={stats['p50_ms']:8.3f} ms  p95={stats['p95_ms']:8.3f} ms"
+        )
+    saved = results["per_request (old)"]["mean_ms"] - results["shared (new)"]["mean_ms"]
+    print(f"  Removed per-request overhead: {saved:.3f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -1,19 +1,35 @@
 from langchain_core.prompts import ChatPromptTemplate
 
-def run(state, llm, prompt, get_callback_config):
-    state["retry_count"] = state.get("retry_count", 0) + 1
+from convBI.schema_ddl import format_semantic_info, render_join_paths
 
-    chat_prompt = ChatPromptTemplate.from_messages(prompt)
-    chain = chat_prompt | llm
-    result = chain.invoke({
+def _inputs(state):
+    return {
         "question": state["question"],
         "sql_query": state.get("sql_query", ""),
         "error_message": state.get("error_message", ""),
-        "semantic_info": state.get("semantic_info", {}),
+        "semantic_info": format_semantic_info(state.get("semantic_info", {})),
+        "join_paths": render_join_paths(state.get("join_paths", [])),
         "previous_errors": state.get("error_history", [])
-    }, config=get_callback_config("debugger"))
+    }
+
+def run(state, llm, prompt, get_callback_config):
+    state["retry_count"] = state.get("retry_count", 0) + 1
+
+    chat_prompt = ChatPromptTemplate.from_messages(prompt)
+    chain = chat_prompt | llm
+    result = chain.invoke(_inputs(state), config=get_callback_config("debugger"))
 
     state["sql_query"] = result.content.strip()
     state["has_sql_error"] = False
     return state
 
+async def arun(state, llm, prompt, get_callback_config):
+    state["retry_count"] = state.get("retry_count", 0) + 1
+
+    chat_prompt = ChatPromptTemplate.from_messages(prompt)
+    chain = chat_prompt | llm
+    result = await chain.ainvoke(_inputs(state), config=get_callback_config("debugger"))
+
+    state["sql_query"] = result.content.strip()
+    state["has_sql_error"] = False
+    return state
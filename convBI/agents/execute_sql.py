@@ -1,64 +1,209 @@
+import os
+import uuid
+from typing import NamedTuple
+
 import psycopg
+from psycopg import sql
+
+from convBI.query_result import QueryResult
+
+class FetchLimits(NamedTuple):
+    max_rows: int
+    max_bytes: int
+    batch_size: int
+    statement_timeout_ms: int
+    count_rows: bool
+
+
+def fetch_limits() -> FetchLimits:
+    """Per-query execution caps; they bound worker memory whatever SQL the LLM writes"""
+    return FetchLimits(
+        max_rows=int(os.getenv("QUERY_MAX_ROWS", 1000)),
+        max_bytes=int(os.getenv("QUERY_MAX_RESULT_BYTES", 1_000_000)),
+        batch_size=int(os.getenv("QUERY_FETCH_BATCH_SIZE", 200)),
+        statement_timeout_ms=int(os.getenv("QUERY_STATEMENT_TIMEOUT_MS", 30000)),
+        # Counting the rows past the cap runs the rest of the query on the server
+        count_rows=os.getenv("QUERY_COUNT_TRUNCATED_ROWS", "false").lower() == "true",
+    )
+
+
+class _ResultCollector:
+    """Keeps rows until the row or byte cap is reached"""
+
+    def __init__(self, limits: FetchLimits):
+        self.limits = limits
+        self.rows = []
+        self.size = 0
+        self.fetched = 0
+        self.truncated = False
+
+    def next_batch_size(self) -> int:
+        # One row past the cap is enough to know whether the result was truncated
+        return max(min(self.limits.batch_size, self.limits.max_rows - len(self.rows) + 1), 1)
+
+    def add(self, batch) -> bool:
+        """Add a fetched batch; returns False once a cap is hit and fetching should stop"""
+        self.fetched += len(batch)
+        for row in batch:
+            row_size = len(repr(row))
+            if len(self.rows) >= self.limits.max_rows or (self.rows and self.size + row_size > self.limits.max_bytes):
+                self.truncated = True
+                return False
+            self.rows.append(row)
+            self.size += row_size
+        return True
 
-def run(state, get_db_connection):
 
+def _cursor_name() -> str:
+    return f"convbi_{uuid.uuid4().hex[:12]}"
+
+
+def _timeout_statement(limits: FetchLimits):
+    # Equivalent to SET LOCAL, but parameterizable
+    return "SELECT set_config('statement_timeout', %s, true)", (f"{limits.statement_timeout_ms}ms",)
+
+
+def _move_statement(cursor_name: str):
+    return sql.SQL("MOVE FORWARD ALL FROM {}").format(sql.Identifier(cursor_name))
+
+def _record_error(state, message, detail):
+    state["error_message"] = message
+    state["needs_clarification"] = True
+    state["has_sql_error"] = True
     try:
-        conn = get_db_connection()
-        if not conn:
-            raise ConnectionError("Could not establish database connection")
-        
-        cursor = conn.cursor()
-        query = state["sql_query"]
-
-        try:
-            cursor.execute(query)
-            results = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
-            formatted_results = [dict(zip(columns, row)) for row in results]
-
-            state["query_result"] = str(formatted_results)
-            state["needs_clarification"] = False
-            state["has_sql_error"] = False
-
-        except psycopg.OperationalError as op_err:
-            state["error_message"] = "Database connection error. Please retry."
-            state["needs_clarification"] = True
-            state["has_sql_error"] = True
-            try:
-                state.setdefault("error_history", []).append(f"OperationalError: {str(op_err)}")
-            except Exception:
-                pass
-
-        except psycopg.ProgrammingError as pg_err:
-            state["error_message"] = "Invalid SQL query."
-            state["needs_clarification"] = True
-            state["has_sql_error"] = True
-            try:
-                state.setdefault("error_history", []).append(f"ProgrammingError: {str(pg_err)}")
-            except Exception:
-                pass
-
-        except Exception as e:
-            state["error_message"] = f"Unexpected error: {e}"
-            state["needs_clarification"] = True
-            state["has_sql_error"] = True
+        state.setdefault("error_history", []).append(detail)
+    except Exception:
+        pass
+
+def _record_query_error(state, err):
+    if isinstance(err, psycopg.errors.QueryCanceled):
+        _record_error(state, "Query took too long and was cancelled.", f"QueryCanceled (statement_timeout): {str(err)}")
+    elif isinstance(err, psycopg.OperationalError):
+        _record_error(state, "Database connection error. Please retry.", f"OperationalError: {str(err)}")
+    elif isinstance(err, psycopg.ProgrammingError):
+        _record_error(state, "Invalid SQL query.", f"ProgrammingError: {str(err)}")
+    else:
+        _record_error(state, f"Unexpected error: {err}", f"Exception: {str(err)}")
+
+def _column_types(cursor):
+    """PostgreSQL type names of the result columns, from the cursor's type registry"""
+    types = []
+    for column in cursor.description:
+        info = cursor.adapters.types.get(column.type_code)
+        types.append(info.name if info else "unknown")
+    return types
+
+def _apply_result(state, result):
+    state["query_result"] = result
+    state["result_truncated"] = result.truncated
+    state["result_row_count"] = result.row_count
+
+def _record_results(state, cursor, collector, total_rows=None):
+    columns = [desc[0] for desc in cursor.description]
+    result = QueryResult.from_rows(
+        columns,
+        _column_types(cursor),
+        collector.rows,
+        truncated=collector.truncated,
+        # Exact total when everything was read or the remaining rows were counted; None if unknown
+        row_count=len(collector.rows) if not collector.truncated else total_rows,
+    )
+    _apply_result(state, result)
+    state["needs_clarification"] = False
+    state["has_sql_error"] = False
+
+def _apply_cached(state, payload):
+    _apply_result(state, QueryResult.from_dict(payload.get("query_result") or {}))
+    state["needs_clarification"] = False
+    state["has_sql_error"] = False
+    state["result_cache_hit"] = True
+    return state
+
+def _cache_payload(state):
+    return {"query_result": state["query_result"].to_dict()}
+
+def run(state, get_db_pool, result_cache=None):
+    collection_name = state.get("collection_name", "semantics")
+    state["result_cache_hit"] = False
+    if result_cache is not None:
+        cached = result_cache.get(state["sql_query"], collection_name)
+        if cached is not None:
+            return _apply_cached(state, cached)
+
+    try:
+        # Borrow a pooled connection; it is health-checked on checkout and returned afterwards
+        db_pool = get_db_pool()
+        with db_pool.connection() as conn:
+            # A trailing semicolon is not valid inside DECLARE ... CURSOR FOR
+            query = state["sql_query"].strip().rstrip(";")
+            limits = fetch_limits()
+
             try:
-                state.setdefault("error_history", []).append(f"Exception: {str(e)}")
-            except Exception:
-                pass
+                # Named (server-side) cursors live inside a transaction; rows are pulled in
+                # batches so only the capped result is ever held in memory
+                with conn.transaction():
+                    conn.execute(*_timeout_statement(limits))
+                    with conn.cursor(name=_cursor_name()) as cursor:
+                        cursor.execute(query)
+                        collector = _ResultCollector(limits)
+                        while True:
+                            batch = cursor.fetchmany(collector.next_batch_size())
+                            if not batch or not collector.add(batch):
+                                break
+                        total_rows = None
+                        if collector.truncated and limits.count_rows:
+                            total_rows = collector.fetched + conn.execute(_move_statement(cursor.name)).rowcount
+                        _record_results(state, cursor, collector, total_rows)
 
-        finally:
-            cursor.close()
-            conn.close()
+            except Exception as e:
+                _record_query_error(state, e)
 
     except Exception as conn_err:
-        state["error_message"] = "Database unavailable. Please try again later."
-        state["needs_clarification"] = True
-        state["has_sql_error"] = True
-        try:
-            state.setdefault("error_history", []).append(f"ConnectionError: {str(conn_err)}")
-        except Exception:
-            pass
+        _record_error(state, "Database unavailable. Please try again later.", f"ConnectionError: {str(conn_err)}")
+
+    if result_cache is not None and not state.get("has_sql_error"):
+        result_cache.set(state["sql_query"], collection_name, _cache_payload(state))
 
     return state
 
+async def arun(state, get_db_pool, result_cache=None):
+    collection_name = state.get("collection_name", "semantics")
+    state["result_cache_hit"] = False
+    if result_cache is not None:
+        cached = await result_cache.aget(state["sql_query"], collection_name)
+        if cached is not None:
+            return _apply_cached(state, cached)
+
+    try:
+        db_pool = await get_db_pool()
+        async with db_pool.connection() as conn:
+            # A trailing semicolon is not valid inside DECLARE ... CURSOR FOR
+            query = state["sql_query"].strip().rstrip(";")
+            limits = fetch_limits()
+
+            try:
+                async with conn.transaction():
+                    await conn.execute(*_timeout_statement(limits))
+                    async with conn.cursor(name=_cursor_name()) as cursor:
+                        await cursor.execute(query)
+                        collector = _ResultCollector(limits)
+                        while True:
+                            batch = await cursor.fetchmany(collector.next_batch_size())
+                            if not batch or not collector.add(batch):
+                                break
+                        total_rows = None
+                        if collector.truncated and limits.count_rows:
+                            moved = await conn.execute(_move_statement(cursor.name))
+                            total_rows = collector.fetched + moved.rowcount
+                        _record_results(state, cursor, collector, total_rows)
+
+            except Exception as e:
+                _record_query_error(state, e)
+
+    except Exception as conn_err:
+        _record_error(state, "Database unavailable. Please try again later.", f"ConnectionError: {str(conn_err)}")
+
+    if result_cache is not None and not state.get("has_sql_error"):
+        await result_cache.aset(state["sql_query"], collection_name, _cache_payload(state))
+
+    return state
@@ -1,15 +1,26 @@
 import json
 from langchain_core.prompts import ChatPromptTemplate
+from convBI.query_result import render_for_prompt
+from convBI.schema_ddl import prompt_semantics
+
+def _inputs(state):
+    return {
+        "question": state["question"],
+        "history": state.get("history", []),
+        "semantic_info": prompt_semantics(state.get("semantic_info", {})),
+        "query_result": render_for_prompt(state, "followups")
+    }
 
 def run(state, llm, prompt):
     chat_prompt = ChatPromptTemplate.from_messages(prompt)
     chain = chat_prompt | llm
-    result = chain.invoke({
-        "question": state["question"],
-        "history": state.get("history", []),
-        "semantic_info": state.get("semantic_info", {}),
-        "query_result": state.get("query_result", "")
-    })
+    result = chain.invoke(_inputs(state))
     state["follow_up_questions"] = json.loads(result.content.strip())
     return state
 
+async def arun(state, llm, prompt):
+    chat_prompt = ChatPromptTemplate.from_messages(prompt)
+    chain = chat_prompt | llm
+    result = await chain.ainvoke(_inputs(state))
+    state["follow_up_questions"] = json.loads(result.content.strip())
+    return state
@@ -1,18 +1,43 @@
 from langchain_core.prompts import ChatPromptTemplate
 
-def run(state, llm, prompt, get_callback_config):
-    
-
-    chat_prompt = ChatPromptTemplate.from_messages(prompt)
+def _inputs(state):
     prev_conv = state["history"][-6:] if state["history"] else []
-    chain = chat_prompt | llm
-
-    result = chain.invoke({
+    return {
         "question": state["question"],
         "history": prev_conv,
-    }, config=get_callback_config("intent_classification"))
+    }
 
-    state["intent"] = result.content.strip().lower()
-    
+def _apply_intent(state, intent, source, confidence=None):
+    state["intent"] = intent
+    details = {"source": source}
+    if confidence is not None:
+        details["confidence"] = round(confidence, 4)
+    state["metrics"] = {**state.get("metrics", {}), "intent": details}
     return state
 
+def run(state, llm, prompt, get_callback_config, classifier=None):
+    # Local classifier first; the LLM only decides when it is not confident
+    if classifier is not None:
+        prediction = classifier.classify(state["question"], has_history=bool(state["history"]))
+        if prediction is not None:
+            return _apply_intent(state, prediction.label, prediction.source, prediction.confidence)
+
+    chat_prompt = ChatPromptTemplate.from_messages(prompt)
+    chain = chat_prompt | llm
+
+    result = chain.invoke(_inputs(state), config=get_callback_config("intent_classification"))
+
+    return _apply_intent(state, result.content.strip().lower(), "llm")
+
+async def arun(state, llm, prompt, get_callback_config, classifier=None):
+    if classifier is not None:
+        prediction = await classifier.aclassify(state["question"], has_history=bool(state["history"]))
+        if prediction is not None:
+            return _apply_intent(state, prediction.label, prediction.source, prediction.confidence)
+
+    chat_prompt = ChatPromptTemplate.from_messages(prompt)
+    chain = chat_prompt | llm
+
+    result = await chain.ainvoke(_inputs(state), config=get_callback_config("intent_classification"))
+
+    return _apply_intent(state, result.content.strip().lower(), "llm")
@@ -1,23 +1,71 @@
-from convBI.qdrant_service import QdrantService
+from functools import partial
 
-def run(state):
+from convBI.qdrant_service import get_qdrant_service, aget_qdrant_service
+from convBI.schema_ddl import format_semantic_info
+from convBI.schema_pruning import prune_schema, schema_token_budget
+
+def _apply_semantic_data(state, semantic_data):
+    semantics = semantic_data.get('semantics', {})
+    selected = semantic_data.get("relevant_tables", [])
+    join_paths = semantic_data.get("join_paths", [])
+    if semantic_data.get("timings"):
+        # Search, rerank (with any deadline fallback) and join planning times
+        state["metrics"] = {**state.get("metrics", {}), "retrieval": semantic_data["timings"]}
+
+    budget = schema_token_budget()
+    if budget is not None and semantics:
+        # Bridge tables come last but carry the joins between retrieved tables: never drop them.
+        # Candidates are rendered uncached so they do not evict the renderings the prompts reuse
+        semantics, report = prune_schema(
+            semantics, state["question"], budget,
+            render=partial(format_semantic_info, cache=False), pinned=semantic_data.get("bridge_tables", [])
+        )
+        if report["tables_dropped"]:
+            selected = [table for table in selected if table not in report["tables_dropped"]]
+            join_paths = [
+                join for join in join_paths
+                if not {join["left_table"].split(".")[-1], join["right_table"].split(".")[-1]} & set(report["tables_dropped"])
+            ]
+        state["metrics"] = {**state.get("metrics", {}), "schema_pruning": report}
+
+    state["semantic_info"] = semantics
+    state["selected_tables"] = selected
+    state["join_paths"] = join_paths
+    return state
+
+def run(state, semantic_data=None):
+    """semantic_data may be passed in when it was already retrieved speculatively"""
 
     try:
-        collection_name = state.get("collection_name", "semantics")
-        
-        qdrant_service = QdrantService(collection_name=collection_name)
-        semantic_data = qdrant_service.get_all_semantic_data(state["question"])
+        if semantic_data is None:
+            collection_name = state.get("collection_name", "semantics")
 
-        semantics = semantic_data.get('semantics', {})
-        
-        state["semantic_info"] = semantics
-        
-        selected = semantic_data.get("relevant_tables", [])
-        state["selected_tables"] = selected
+            qdrant_service = get_qdrant_service(collection_name=collection_name)
+            semantic_data = qdrant_service.get_all_semantic_data(state["question"])
+
+        _apply_semantic_data(state, semantic_data)
         
     except Exception as e:
         state["selected_tables"] = []
         state["semantic_info"] = {}
+        state["join_paths"] = []
 
     return state
 
+async def arun(state, semantic_data=None):
+
+    try:
+        if semantic_data is None:
+            collection_name = state.get("collection_name", "semantics")
+
+            qdrant_service = await aget_qdrant_service(collection_name=collection_name)
+            semantic_data = await qdrant_service.aget_all_semantic_data(state["question"])
+
+        _apply_semantic_data(state, semantic_data)
+
+    except Exception as e:
+        state["selected_tables"] = []
+        state["semantic_info"] = {}
+        state["join_paths"] = []
+
+    return state
@@ -0,0 +1,29 @@
+import asyncio
+import logging
+import time
+
+from convBI.query_result import QueryResult
+from convBI.result_profile import profile_result
+
+logger = logging.getLogger(__name__)
+
+
+def run(state):
+    result = state.get("query_result")
+    if not isinstance(result, QueryResult) or not result.columns:
+        state["result_profile"] = {}
+        return state
+    t0 = time.perf_counter()
+    try:
+        state["result_profile"] = profile_result(result)
+    except Exception as e:
+        # The prompts fall back to the plain row rendering
+        logger.warning(f"Result profiling failed: {e}")
+        state["result_profile"] = {}
+    state["metrics"] = {**state.get("metrics", {}), "result_profile_ms": round((time.perf_counter() - t0) * 1000, 2)}
+    return state
+
+
+async def arun(state):
+    # NumPy work is CPU-bound; keep it off the event loop
+    return await asyncio.to_thread(run, state)
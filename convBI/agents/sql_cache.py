@@ -0,0 +1,93 @@
+import logging
+from langchain_core.messages import HumanMessage, AIMessage
+from convBI.qdrant_service import get_qdrant_service, aget_qdrant_service
+from convBI.index_epoch import get_index_epochs
+
+logger = logging.getLogger(__name__)
+
+def _reset(state):
+    state["sql_cache_hit"] = False
+    state["sql_cacheable"] = False
+    state["sql_cache_fallback"] = False
+    return state
+
+def _apply_match(state, match):
+    state["sql_cacheable"] = True
+    if match:
+        state["sql_query"] = match["sql"]
+        state["sql_cache_hit"] = True
+        state["sql_cache_match"] = match
+        state["intent"] = "system_query"
+        state["history"] = [
+            HumanMessage(content=state["question"]),
+            AIMessage(content=state["sql_query"])
+        ]
+    return state
+
+def _retrieval(state):
+    return get_qdrant_service(collection_name=state.get("collection_name", "semantics")).hybrid_retrieval
+
+async def _aretrieval(state):
+    return (await aget_qdrant_service(collection_name=state.get("collection_name", "semantics"))).hybrid_retrieval
+
+def _epoch(state):
+    return get_index_epochs().get(state.get("collection_name", "semantics"))
+
+async def _aepoch(state):
+    return await get_index_epochs().aget(state.get("collection_name", "semantics"))
+
+def run(state, sql_cache):
+    _reset(state)
+    # Only standalone questions are cacheable; follow-ups depend on the conversation
+    if state.get("history"):
+        return state
+    try:
+        vector = _retrieval(state).embed_query_dense(state["question"])
+        _apply_match(state, sql_cache.lookup(state.get("collection_name", "semantics"), vector, _epoch(state)))
+    except Exception as e:
+        logger.warning(f"SQL cache lookup failed: {e}")
+    return state
+
+async def arun(state, sql_cache):
+    _reset(state)
+    if state.get("history"):
+        return state
+    try:
+        retrieval = await _aretrieval(state)
+        vector = await retrieval.aembed_query_dense(state["question"])
+        _apply_match(state, sql_cache.lookup(state.get("collection_name", "semantics"), vector, await _aepoch(state)))
+    except Exception as e:
+        logger.warning(f"SQL cache lookup failed: {e}")
+    return state
+
+def _after_execute(state, sql_cache):
+    """Return True if the successful query should be stored; handles failed cache hits"""
+    collection_name = state.get("collection_name", "semantics")
+    if state.get("has_sql_error"):
+        if state.get("sql_cache_hit"):
+            # Cached SQL no longer works (e.g. schema changed): drop it and regenerate
+            match = state.get("sql_cache_match") or {}
+            sql_cache.invalidate(collection_name, match.get("question"))
+            state["sql_cache_hit"] = False
+            state["sql_cache_fallback"] = True
+        return False
+    return bool(state.get("sql_cacheable")) and not state.get("sql_cache_hit")
+
+def record_execution(state, sql_cache):
+    try:
+        if _after_execute(state, sql_cache):
+            vector = _retrieval(state).embed_query_dense(state["question"])
+            sql_cache.store(state.get("collection_name", "semantics"), state["question"], vector, state["sql_query"], _epoch(state))
+    except Exception as e:
+        logger.warning(f"SQL cache store failed: {e}")
+    return state
+
+async def arecord_execution(state, sql_cache):
+    try:
+        if _after_execute(state, sql_cache):
+            retrieval = await _aretrieval(state)
+            vector = await retrieval.aembed_query_dense(state["question"])
+            sql_cache.store(state.get("collection_name", "semantics"), state["question"], vector, state["sql_query"], await _aepoch(state))
+    except Exception as e:
+        logger.warning(f"SQL cache store failed: {e}")
+    return state
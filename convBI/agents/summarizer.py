@@ -1,17 +1,29 @@
 from langchain_core.prompts import ChatPromptTemplate
+from convBI.query_result import render_for_prompt
+
+def _inputs(state):
+    prez_conv = state["history"][-1:] if state["history"] else []
+    return {
+        "question": state["question"],
+        "history": prez_conv,
+        "query_result": render_for_prompt(state, "summarizer")
+    }
 
 def run(state, llm, prompt, get_callback_config):
     
     chat_prompt = ChatPromptTemplate.from_messages(prompt)
-    prez_conv = state["history"][-1:] if state["history"] else []
     chain = chat_prompt | llm
-    result = chain.invoke({
-        "question": state["question"],
-        "history": prez_conv,
-        "query_result": state.get("query_result", "")
-    }, config=get_callback_config("summarizer"))
+    result = chain.invoke(_inputs(state), config=get_callback_config("summarizer"))
 
     state["final_answer"] = result.content.strip()
     state["history"] = []
     return state
 
+async def arun(state, llm, prompt, get_callback_config):
+    chat_prompt = ChatPromptTemplate.from_messages(prompt)
+    chain = chat_prompt | llm
+    result = await chain.ainvoke(_inputs(state), config=get_callback_config("summarizer"))
+
+    state["final_answer"] = result.content.strip()
+    state["history"] = []
+    return state
@@ -1,19 +1,19 @@
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import HumanMessage, AIMessage
 
-def run(state, llm, prompt, get_callback_config):
-    
-    chat_prompt = ChatPromptTemplate.from_messages(prompt)
+from convBI.schema_ddl import format_semantic_info, render_join_paths
+
+def _inputs(state):
     prev_conv = state["history"][-6:] if state["history"] else []
-    chain = chat_prompt | llm
- 
-    result = chain.invoke({
-        "semantic_info": state.get("semantic_info", {}),
+    return {
+        "semantic_info": format_semantic_info(state.get("semantic_info", {})),
+        "join_paths": render_join_paths(state.get("join_paths", [])),
         "question": state["question"],
         "selected_tables": state.get("selected_tables", []),
         "history": prev_conv
-    }, config=get_callback_config("text_to_sql"))
+    }
 
+def _apply_result(state, result):
     state["sql_query"] = result.content.strip()
     #print("Semantic Info:", state.get("semantic_info", {}))
 
@@ -21,6 +21,21 @@ def run(state, llm, prompt, get_callback_config):
         HumanMessage(content=state["question"]),
         AIMessage(content=state["sql_query"])
     ]
-    
     return state
 
+def run(state, llm, prompt, get_callback_config):
+    
+    chat_prompt = ChatPromptTemplate.from_messages(prompt)
+    chain = chat_prompt | llm
+ 
+    result = chain.invoke(_inputs(state), config=get_callback_config("text_to_sql"))
+
+    return _apply_result(state, result)
+
+async def arun(state, llm, prompt, get_callback_config):
+    chat_prompt = ChatPromptTemplate.from_messages(prompt)
+    chain = chat_prompt | llm
+
+    result = await chain.ainvoke(_inputs(state), config=get_callback_config("text_to_sql"))
+
+    return _apply_result(state, result)
@@ -1,34 +1,59 @@
 import json
 from langchain_core.prompts import ChatPromptTemplate
+from convBI.chart_rules import recommend_chart
+from convBI.query_result import QueryResult, render_for_prompt
 
-def run(state, llm, prompt, get_callback_config):
+def _inputs(state):
+    prez_conv = state["history"][-1:] if state["history"] else []
+    return {
+        "question": state["question"],
+        "query_result": render_for_prompt(state, "visualization"),
+        "history": prez_conv,
+        "sql_query": state.get("sql_query", ""),
+    }
+
+def _apply_rules(state):
+    """Set the chart from the rules when the result shape decides it; True if it did"""
+    result = state.get("query_result")
+    if not isinstance(result, QueryResult):
+        return False
+    recommendation = recommend_chart(result, state.get("question", ""), state.get("result_profile"))
+    if recommendation is None:
+        return False
+    state["visualization_data"] = recommendation.option
+    state["metrics"] = {**state.get("metrics", {}), "visualization": {"source": "rules", "chart": recommendation.chart}}
+    return True
+
+def _record_llm(state):
+    state["metrics"] = {**state.get("metrics", {}), "visualization": {"source": "llm"}}
+
+def _parse_content(content):
+    content = content.strip()
+    
+    # Remove markdown code blocks if present
+    if content.startswith("```"):
+        # Remove ```json or ``` at start and end
+        lines = content.split("\n")
+        if lines[0].startswith("```"):
+            lines = lines[1:]
+        if lines[-1].strip() == "```":
+            lines = lines[:-1]
+        content = "\n".join(lines).strip()
+    
+    # Parse JSON
+    return json.loads(content)
+
+def run(state, llm, prompt, get_callback_config, rules=True):
+    if rules and _apply_rules(state):
+        return state
+    _record_llm(state)
     try:
         chat_prompt = ChatPromptTemplate.from_messages(prompt)
         chain = chat_prompt | llm
-        prez_conv = state["history"][-1:] if state["history"] else []
         
-        # Clean the result content - remove markdown code blocks if present
-        result = chain.invoke({
-            "question": state["question"],
-            "query_result": state.get("query_result", ""),
-            "history": prez_conv,
-            "sql_query": state.get("sql_query", ""),
-        }, config=get_callback_config("visualization"))
+        result = chain.invoke(_inputs(state), config=get_callback_config("visualization"))
         
-        content = result.content.strip()
-        
-        # Remove markdown code blocks if present
-        if content.startswith("```"):
-            # Remove ```json or ``` at start and end
-            lines = content.split("\n")
-            if lines[0].startswith("```"):
-                lines = lines[1:]
-            if lines[-1].strip() == "```":
-                lines = lines[:-1]
-            content = "\n".join(lines).strip()
-        
-        # Parse JSON
-        viz_data = json.loads(content)
+        viz_data = _parse_content(result.content)
         
         # Store as dict/object (not string)
         state["visualization_data"] = viz_data if viz_data else {}
@@ -41,3 +66,25 @@ def run(state, llm, prompt, get_callback_config):
     
     return state
 
+async def arun(state, llm, prompt, get_callback_config, rules=True):
+    if rules and _apply_rules(state):
+        return state
+    _record_llm(state)
+    try:
+        chat_prompt = ChatPromptTemplate.from_messages(prompt)
+        chain = chat_prompt | llm
+
+        result = await chain.ainvoke(_inputs(state), config=get_callback_config("visualization"))
+
+        viz_data = _parse_content(result.content)
+
+        # Store as dict/object (not string)
+        state["visualization_data"] = viz_data if viz_data else {}
+
+    except json.JSONDecodeError as e:
+        # Return empty dict on error
+        state["visualization_data"] = {}
+    except Exception as e:
+        state["visualization_data"] = {}
+
+    return state
@@ -0,0 +1,255 @@
+"""
+Rule-based chart recommendation
+Picks a chart (KPI, bar, line, pie or scatter) from the result's column types and cardinality
+and builds the same ECharts option the visualization LLM returns, always with a renderable
+series. Shapes the rules cannot decide return None so the LLM is consulted only for those.
+"""
+
+import os
+import re
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from convBI.query_result import QueryResult, type_category
+
+# Above these sizes a bar/pie/series chart stops being readable
+MAX_BAR_CATEGORIES = 50
+MAX_PIE_SLICES = 8
+MAX_SERIES = 8
+
+_PROPORTION_PATTERN = re.compile(
+    r"\b(?:share|shares|proportion|proportions|percentage|percentages|percent|breakdown|split|composition|distribution|ratio)\b"
+)
+
+
+class ChartRecommendation(NamedTuple):
+    chart: str  # kpi, bar, line, pie, scatter or empty
+    option: Dict[str, Any]  # ECharts option, same shape as the visualization LLM output
+
+
+def _category(result: QueryResult, index: int, profile: Optional[Dict[str, Any]]) -> str:
+    """number, temporal or label (text/boolean), using the profile's inference for untyped columns"""
+    category = type_category(result.types[index])
+    if result.types[index] == "unknown" and profile:
+        category = profile["columns"][index].get("category", category)
+    if category in ("number", "temporal"):
+        return category
+    return "label"
+
+
+def _distinct(result: QueryResult, index: int, profile: Optional[Dict[str, Any]]) -> int:
+    if profile and profile["columns"][index].get("distinct") is not None:
+        return profile["columns"][index]["distinct"]
+    try:
+        return len({row[index] for row in result.rows})
+    except TypeError:
+        return len({repr(row[index]) for row in result.rows})
+
+
+def _looks_like_key(result: QueryResult, index: int, profile: Optional[Dict[str, Any]]) -> bool:
+    """Integer column with one distinct value per row: an identifier, year or period number"""
+    values = [v for v in _column(result, index) if v is not None]
+    if not all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+        return False
+    return _distinct(result, index, profile) >= len(result.rows)
+
+
+def _unique_rows(result: QueryResult, indices: List[int]) -> bool:
+    """True when no two rows share the values of the given columns (rows with a None key ignored)"""
+    keys = [tuple(row[i] for i in indices) for row in result.rows if row[indices[0]] is not None]
+    try:
+        return len(set(keys)) == len(keys)
+    except TypeError:
+        return len({repr(key) for key in keys}) == len(keys)
+
+
+def _title(question: str, result: QueryResult) -> Dict[str, Any]:
+    text = " ".join((question or "").split())
+    title = {"text": text if len(text) <= 80 else text[:77] + "...", "left": "center"}
+    if result.truncated:
+        title["subtext"] = f"First {len(result.rows)} rows"
+    return title
+
+
+def _format_number(value: Any) -> str:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, int):
+        return f"{value:,}"
+    return f"{value:,.2f}".rstrip("0").rstrip(".")
+
+
+def _sort_value(value: Any) -> float:
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else float("-inf")
+
+
+def _column(result: QueryResult, index: int) -> List[Any]:
+    return [row[index] for row in result.rows]
+
+
+def kpi_chart(result: QueryResult, question: str) -> Dict[str, Any]:
+    """Single value as the title, over a one-bar chart of it"""
+    value = result.rows[0][0]
+    return {
+        "title": {"text": _format_number(value), "subtext": result.columns[0], "left": "center"},
+        "tooltip": {"trigger": "axis", "axisPointer": {"type": "shadow"}},
+        "grid": {"left": "3%", "right": "4%", "bottom": "3%", "containLabel": True},
+        "xAxis": {"type": "category", "data": [result.columns[0]]},
+        "yAxis": {"type": "value"},
+        "series": [{"name": result.columns[0], "type": "bar", "data": [value]}],
+    }
+
+
+def bar_chart(result: QueryResult, question: str, label_index: Optional[int], value_indices: List[int]) -> Dict[str, Any]:
+    title = _title(question, result)
+    if label_index is None:
+        # Single row of several measures: one bar per column
+        categories = [result.columns[i] for i in value_indices]
+        series = [{"name": "value", "type": "bar", "data": [result.rows[0][i] for i in value_indices]}]
+    else:
+        rows = result.rows
+        if len(rows) > MAX_BAR_CATEGORIES:
+            # Too many categories to read: keep the largest by the first measure
+            rows = sorted(rows, key=lambda row: _sort_value(row[value_indices[0]]), reverse=True)[:MAX_BAR_CATEGORIES]
+            title["subtext"] = f"Top {len(rows)} of {len(result.rows)}{'+' if result.truncated else ''} by {result.columns[value_indices[0]]}"
+        categories = [str(row[label_index]) for row in rows]
+        series = [{"name": result.columns[i], "type": "bar", "data": [row[i] for row in rows]} for i in value_indices]
+    option = {
+        "title": title,
+        "tooltip": {"trigger": "axis", "axisPointer": {"type": "shadow"}},
+        "grid": {"left": "3%", "right": "4%", "bottom": "3%", "containLabel": True},
+        "xAxis": {"type": "category", "data": categories},
+        "yAxis": {"type": "value"},
+        "series": series,
+    }
+    if len(series) > 1:
+        option["legend"] = {"top": "bottom"}
+    return option
+
+
+def pie_chart(result: QueryResult, question: str, label_index: int, value_index: int) -> Dict[str, Any]:
+    return {
+        "title": _title(question, result),
+        "tooltip": {"trigger": "item", "formatter": "{a} <br/>{b}: {c} ({d}%)"},
+        "legend": {"orient": "vertical", "left": "left"},
+        "series": [{
+            "name": result.columns[value_index],
+            "type": "pie",
+            "radius": "50%",
+            "data": [{"value": row[value_index], "name": str(row[label_index])} for row in result.rows],
+        }],
+    }
+
+
+def line_chart(result: QueryResult, question: str, time_index: int, value_indices: List[int], group_index: Optional[int] = None) -> Dict[str, Any]:
+    """One point per time (per group in long format); rows must not repeat a time (time, group) key"""
+    rows = sorted((row for row in result.rows if row[time_index] is not None), key=lambda row: row[time_index])
+    times = list(dict.fromkeys(row[time_index] for row in rows))
+    if group_index is None:
+        series = [
+            {"name": result.columns[i], "type": "line", "data": [row[i] for row in rows], "smooth": True}
+            for i in value_indices
+        ]
+    else:
+        # Long format (time, group, value): one series per group, aligned on the time axis
+        value_index = value_indices[0]
+        position = {t: i for i, t in enumerate(times)}
+        grouped: Dict[Any, List[Any]] = {}
+        for row in rows:
+            grouped.setdefault(row[group_index], [None] * len(times))[position[row[time_index]]] = row[value_index]
+        series = [
+            {"name": str(group), "type": "line", "data": data, "smooth": True, "connectNulls": True}
+            for group, data in grouped.items()
+        ]
+    option = {
+        "title": _title(question, result),
+        "tooltip": {"trigger": "axis"},
+        "grid": {"left": "3%", "right": "4%", "bottom": "3%", "containLabel": True},
+        "xAxis": {"type": "category", "boundaryGap": False, "data": times},
+        "yAxis": {"type": "value"},
+        "series": series,
+    }
+    if len(series) > 1:
+        option["legend"] = {"top": "bottom"}
+    return option
+
+
+def scatter_chart(result: QueryResult, question: str, x_index: int, y_index: int) -> Dict[str, Any]:
+    return {
+        "title": _title(question, result),
+        "tooltip": {"trigger": "item"},
+        "grid": {"left": "3%", "right": "4%", "bottom": "3%", "containLabel": True},
+        "xAxis": {"type": "value", "name": result.columns[x_index], "scale": True},
+        "yAxis": {"type": "value", "name": result.columns[y_index], "scale": True},
+        "series": [{
+            "type": "scatter",
+            "data": [[row[x_index], row[y_index]] for row in result.rows if row[x_index] is not None and row[y_index] is not None],
+        }],
+    }
+
+
+def recommend_chart(result: QueryResult, question: str = "", profile: Optional[Dict[str, Any]] = None) -> Optional[ChartRecommendation]:
+    """
+    Chart for shapes with an obvious answer, or None when the LLM should decide
+
+    Args:
+        result: Columnar query result
+        question: User question (chart title; proportion wording selects a pie chart)
+        profile: Optional result profile, used for distinct counts and untyped columns
+    """
+    if not result.columns:
+        return None
+    if not result.rows:
+        return ChartRecommendation("empty", {"title": {"text": "No data to visualize"}})
+
+    categories = [_category(result, i, profile) for i in range(len(result.columns))]
+    numbers = [i for i, c in enumerate(categories) if c == "number"]
+    temporal = [i for i, c in enumerate(categories) if c == "temporal"]
+    labels = [i for i, c in enumerate(categories) if c == "label"]
+    single_row = len(result.rows) == 1
+
+    # KPI: a single value
+    if single_row and len(result.columns) == 1 and numbers:
+        return ChartRecommendation("kpi", kpi_chart(result, question))
+    # One row of measures (e.g. count, sum, avg of the same thing)
+    if single_row and len(numbers) == len(result.columns) and len(numbers) <= MAX_BAR_CATEGORIES:
+        return ChartRecommendation("bar", bar_chart(result, question, None, numbers))
+
+    # Time series: one time column, measures, optionally one low-cardinality group column.
+    # A repeated time (or time and group) needs aggregation first, so it is left to the LLM
+    if len(temporal) == 1 and numbers and not labels and len(numbers) <= MAX_SERIES:
+        if not _unique_rows(result, temporal):
+            return None
+        return ChartRecommendation("line", line_chart(result, question, temporal[0], numbers))
+    if len(temporal) == 1 and len(numbers) == 1 and len(labels) == 1 and _distinct(result, labels[0], profile) <= MAX_SERIES:
+        if not _unique_rows(result, [temporal[0], labels[0]]):
+            return None
+        return ChartRecommendation("line", line_chart(result, question, temporal[0], numbers, group_index=labels[0]))
+
+    # Category -> measure(s), one row per category
+    if len(labels) == 1 and numbers and not temporal and len(numbers) <= MAX_SERIES:
+        label = labels[0]
+        if _distinct(result, label, profile) != len(result.rows):
+            return None  # Repeated labels need aggregation or pivoting
+        values = _column(result, numbers[0])
+        if (
+            len(numbers) == 1
+            and len(result.rows) <= MAX_PIE_SLICES
+            and _PROPORTION_PATTERN.search((question or "").lower())
+            and all(isinstance(v, (int, float)) and v >= 0 for v in values)
+        ):
+            return ChartRecommendation("pie", pie_chart(result, question, label, numbers[0]))
+        return ChartRecommendation("bar", bar_chart(result, question, label, numbers))
+
+    # Two measures and nothing else: correlation, unless one of them is really a key or period
+    if (
+        len(numbers) == 2
+        and len(result.columns) == 2
+        and len(result.rows) >= 3
+        and not any(_looks_like_key(result, i, profile) for i in numbers)
+    ):
+        return ChartRecommendation("scatter", scatter_chart(result, question, numbers[0], numbers[1]))
+    return None
+
+
+def is_chart_rules_enabled() -> bool:
+    return os.getenv("CHART_RULES_ENABLED", "true").lower() == "true"
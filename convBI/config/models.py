@@ -3,6 +3,22 @@ from typing_extensions import TypedDict
 from pydantic import BaseModel
 from langgraph.graph.message import add_messages
 
+from convBI.query_result import QueryResult
+
+
+def merge_dicts(left: Optional[Dict[str, Any]], right: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Reducer for dict fields that concurrent nodes may update in the same step"""
+    if not left:
+        return right or {}
+    if not right:
+        return left
+    return {**left, **right}
+
+
+def latest_non_empty(left: Optional[str], right: Optional[str]) -> str:
+    """Reducer that keeps the previous value when a node writes an empty one"""
+    return right if right else (left or "")
+
 
 class WorkflowState(TypedDict, total=False):
     history: Annotated[list, add_messages]
@@ -10,21 +26,41 @@ class WorkflowState(TypedDict, total=False):
     intent: str
     selected_tables: List[str]
     semantic_info: Dict[str, Any]
+    join_paths: List[Dict[str, Any]]  # Foreign-key join conditions connecting selected_tables
     sql_query: str
-    query_result: str
+    query_result: Optional[QueryResult]  # Columnar; prompts get a token-budgeted rendering
+    result_profile: Dict[str, Any]  # Per-column statistics of query_result (convBI.result_profile)
     error_message: str
     needs_clarification: bool
-    visualization_data: Dict[str, Any]
-    final_answer: str
-    follow_up_questions: Dict[str, Any]
+    # Written by the parallel post-query nodes (summarizer, visualization, follow-ups)
+    visualization_data: Annotated[Dict[str, Any], merge_dicts]
+    final_answer: Annotated[str, latest_non_empty]
+    follow_up_questions: Annotated[Dict[str, Any], merge_dicts]
 
     collection_name: str
     thread_id: str  # Added for Redis session management
+    request_id: str  # Unique per workflow run (a thread has many requests)
 
     retry_count: int
     has_sql_error: bool
     error_history: List[str]
 
+    # Set when the result hit the row/byte cap; row count is None if the total is unknown
+    result_truncated: bool
+    result_row_count: Optional[int]
+
+    # Semantic question-to-SQL cache
+    sql_cache_hit: bool
+    sql_cacheable: bool
+    sql_cache_fallback: bool
+    sql_cache_match: Dict[str, Any]
+
+    # SQL result cache
+    result_cache_hit: bool
+
+    # Per-request performance metrics reported in the final answer event
+    metrics: Annotated[Dict[str, Any], merge_dicts]
+
 
 class StreamResponse(BaseModel):
     type: str
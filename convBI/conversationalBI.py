@@ -5,9 +5,14 @@ import os
 from langgraph.graph import StateGraph,START,END 
 from langchain_openai import AzureChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
-from typing import Dict,Any,Optional,List
+from langchain_core.runnables import RunnableLambda
+from langchain_core.runnables.config import ensure_config, merge_configs
+from langchain_core.messages import AIMessageChunk
+from typing import Dict,Any,Optional,List,Union
 from datetime import datetime
 import asyncio
+import time
+import uuid
 from convBI.prompts import (
     intent_prompt,
     greeting_prompt,
@@ -19,18 +24,31 @@ from convBI.prompts import (
     debugger_prompt,
 )
 
-import psycopg
+from services.postgres.pool import get_db_pool, get_async_db_pool
 
-from convBI.agents.intent import run as run_intent
-from convBI.agents.populate_qdrant_data import run as run_populate_qdrant
-from convBI.agents.text_to_sql import run as run_text_to_sql
-from convBI.agents.execute_sql import run as run_execute_sql
-from convBI.agents.clarification import run as run_clarification
-from convBI.agents.summarizer import run as run_summarizer
-from convBI.agents.visualization import run as run_visualization
-from convBI.agents.followups import run as run_followups
+from convBI.agents.intent import run as run_intent, arun as arun_intent
+from convBI.agents.populate_qdrant_data import run as run_populate_qdrant, arun as arun_populate_qdrant
+from convBI.agents.text_to_sql import run as run_text_to_sql, arun as arun_text_to_sql
+from convBI.agents.execute_sql import run as run_execute_sql, arun as arun_execute_sql
+from convBI.agents.clarification import run as run_clarification, arun as arun_clarification
+from convBI.agents.profile_result import run as run_profile_result, arun as arun_profile_result
+from convBI.agents.summarizer import run as run_summarizer, arun as arun_summarizer
+from convBI.agents.visualization import run as run_visualization, arun as arun_visualization
+from convBI.agents.followups import run as run_followups, arun as arun_followups
+from convBI.agents.sql_cache import (
+    run as run_sql_cache_lookup,
+    arun as arun_sql_cache_lookup,
+    record_execution as record_sql_cache_execution,
+    arecord_execution as arecord_sql_cache_execution,
+)
+from convBI.sql_cache import get_sql_cache, is_sql_cache_enabled
+from convBI.result_cache import get_result_cache, is_result_cache_enabled
+from convBI.intent_classifier import get_intent_classifier, is_intent_classifier_enabled
+from convBI.speculative_retrieval import get_speculative_retrieval, is_speculative_retrieval_enabled
+from convBI.chart_rules import is_chart_rules_enabled
 from convBI.redis_session import (
     RedisSessionService,
+    AsyncRedisSessionService,
     convert_redis_to_langchain_messages
 )
 from convBI.config.models import WorkflowState, StreamResponse
@@ -46,47 +64,136 @@ except ImportError:
 
 def get_callback_config(tag: str):
     if langfuse_handler:
-        return {
+        # Merge into the running node's config: replacing its callbacks would detach the LLM
+        # call from the graph and hide its tokens from stream_mode="messages"
+        return merge_configs(ensure_config(), {
             "callbacks": [langfuse_handler],
             "metadata": {"langfuse_tags": [tag, "text_to_sql_workflow"]}
-        }
+        })
     else:
         return {}
 
 
+# User-facing status messages for each node
+NODE_MESSAGES = {
+    "sql_cache_lookup": "Checking for a recent answer to a similar question...",
+    "intent_classification": "Understanding what you need...",
+    "greeting": "Saying hello 👋...",
+    "help_agent": "Gathering helpful information...",
+    "populate_qdrant_data": "Finding the most relevant information for you...",
+    "text_to_sql": "Figuring out the best way to answer your question...",
+    "execute_sql_query": "Processing your request...",
+    "clarification_agent": "Making sure I understood you correctly...",
+    "profile_result": "Profiling the results...",
+    "summarizer": "Summarizing the key points...",
+    "visualization": "Creating a visual overview...",
+    "follow_up_questions": "Thinking of helpful next steps...",
+    "compose_answer": "Putting it all together...",
+    "noanswer": "Sorry, I couldn't find a clear answer this time."
+}
+
+# Nodes that fan out concurrently after the result is profiled
+POST_QUERY_NODES = ["summarizer", "visualization", "follow_up_questions"]
+
+
+def _answer_token_nodes() -> frozenset:
+    """Nodes whose LLM output is streamed to the client token by token"""
+    if os.getenv("STREAM_ANSWER_TOKENS", "true").lower() != "true":
+        return frozenset()
+    nodes = {"summarizer"}
+    if os.getenv("STREAM_GREETING_TOKENS", "false").lower() == "true":
+        nodes.add("greeting")
+    return frozenset(nodes)
 
 
 class TextToSQLWorkflow:
-    def __init__(self):
-        self.llm=AzureChatOpenAI(
+    """
+    Conversational BI workflow.
+
+    One instance is meant to be created per process (see the FastAPI lifespan in main.py)
+    and shared by all requests: the LLM client, the Redis connection pool and the compiled
+    graph are built once here, while everything request-specific lives in WorkflowState.
+
+    Every node has a sync and an async implementation, so the same compiled graph serves
+    run_stream_workflow (graph.stream) and arun_stream_workflow (graph.astream).
+    """
+
+    def __init__(
+        self,
+        llm: Optional[AzureChatOpenAI] = None,
+        redis_session: Optional[RedisSessionService] = None,
+        async_redis_session: Optional[AsyncRedisSessionService] = None
+    ):
+        self.llm = llm or AzureChatOpenAI(
             azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
             azure_deployment=os.environ["AZURE_OPENAI_DEPLOYMENT_NAME"],
             openai_api_version=os.environ["AZURE_OPENAI_API_VERSION"],
             api_key=os.environ["AZURE_OPENAI_API_KEY"]
         )
         # Initialize Redis session service for conversation history
-        self.redis_session = RedisSessionService()
-            
+        self.redis_session = redis_session or RedisSessionService()
+        self.async_redis_session = async_redis_session or AsyncRedisSessionService()
+        # Semantic SQL cache lets near-duplicate questions skip intent and text-to-SQL
+        self.sql_cache = get_sql_cache() if is_sql_cache_enabled() else None
+        # TTL cache of executed SQL results shared across users
+        self.result_cache = get_result_cache() if is_result_cache_enabled() else None
+        # Rules + embedding classifier in front of the intent LLM call
+        self.intent_classifier = get_intent_classifier() if is_intent_classifier_enabled() else None
+        # Overlap Qdrant retrieval with intent classification
+        self.speculative_retrieval = get_speculative_retrieval() if is_speculative_retrieval_enabled() else None
+        # Charts for unambiguous result shapes are built locally instead of by the LLM
+        self.chart_rules = is_chart_rules_enabled()
+        # Answer text is streamed as it is generated; "messages" mode is only requested if needed
+        self.answer_token_nodes = _answer_token_nodes()
+        self.stream_modes = ["updates", "messages"] if self.answer_token_nodes else ["updates"]
+        # Compile the graph once; it is stateless and safe to reuse across requests
+        self.graph = self._build_workflow().compile()
+
+    def close(self):
+        """Release shared resources (called on application shutdown)"""
+        self.redis_session.close()
+        if self.speculative_retrieval is not None:
+            self.speculative_retrieval.close()
+
+    async def aclose(self):
+        """Release shared async resources (called on application shutdown)"""
+        await self.async_redis_session.close()
+
+    @staticmethod
+    def _node(name: str, func, afunc) -> RunnableLambda:
+        """Wrap a sync/async pair so the node works under both graph.stream and graph.astream"""
+        return RunnableLambda(func, afunc=afunc, name=name)
     
     def _build_workflow(self)->StateGraph[WorkflowState]:
         graph_builder=StateGraph(WorkflowState)
-        graph_builder.add_node("intent_classification",self._intent_classification_agent)
-        graph_builder.add_node("greeting",self._greeting_agent)
+        graph_builder.add_node("intent_classification",self._node("intent_classification", self._intent_classification_agent, self._aintent_classification_agent))
+        graph_builder.add_node("greeting",self._node("greeting", self._greeting_agent, self._agreeting_agent))
         graph_builder.add_node("help_agent", self._help_agent)
-        graph_builder.add_node("populate_qdrant_data", self._populate_qdrant_data_agent)
-        graph_builder.add_node("text_to_sql",self._text_to_sql_agent)
-        graph_builder.add_node("execute_sql_query", self._execute_sql_query)
-        graph_builder.add_node("clarification_agent", self._clarification_agent)
+        graph_builder.add_node("populate_qdrant_data", self._node("populate_qdrant_data", self._populate_qdrant_data_agent, self._apopulate_qdrant_data_agent))
+        graph_builder.add_node("text_to_sql",self._node("text_to_sql", self._text_to_sql_agent, self._atext_to_sql_agent))
+        graph_builder.add_node("execute_sql_query", self._node("execute_sql_query", self._execute_sql_query, self._aexecute_sql_query))
+        graph_builder.add_node("clarification_agent", self._node("clarification_agent", self._clarification_agent, self._aclarification_agent))
+        graph_builder.add_node("profile_result", self._node("profile_result", self._profile_result_agent, self._aprofile_result_agent))
         
-        graph_builder.add_node("summarizer", self._summarizer_agent)
+        graph_builder.add_node("summarizer", self._node("summarizer", self._summarizer_agent, self._asummarizer_agent))
         graph_builder.add_node("noanswer", self._noanswer_agent)
-        graph_builder.add_node("visualization",self._visualization_agent)
-        graph_builder.add_node("follow_up_questions",self._follow_up_questions_agent)
+        graph_builder.add_node("visualization",self._node("visualization", self._visualization_agent, self._avisualization_agent))
+        graph_builder.add_node("follow_up_questions",self._node("follow_up_questions", self._follow_up_questions_agent, self._afollow_up_questions_agent))
+        graph_builder.add_node("compose_answer", self._compose_answer_agent)
 
 
         
 
-        graph_builder.add_edge(START,"intent_classification")
+        if self.sql_cache is not None:
+            graph_builder.add_node("sql_cache_lookup", self._node("sql_cache_lookup", self._sql_cache_lookup_agent, self._asql_cache_lookup_agent))
+            graph_builder.add_edge(START, "sql_cache_lookup")
+            graph_builder.add_conditional_edges(
+                "sql_cache_lookup",
+                self._route_after_sql_cache,
+                {"hit": "execute_sql_query", "miss": "intent_classification"}
+            )
+        else:
+            graph_builder.add_edge(START,"intent_classification")
         graph_builder.add_conditional_edges(
             "intent_classification",
             self._route_by_intent,  # Use a routing function
@@ -103,26 +210,38 @@ class TextToSQLWorkflow:
         graph_builder.add_conditional_edges(
             "execute_sql_query",
             self._route_after_execute,
-            {"success":"summarizer","retry":"clarification_agent","no_answer":"noanswer"}
+            {
+                "profile":"profile_result",
+                "retry":"clarification_agent","no_answer":"noanswer","regenerate":"populate_qdrant_data"
+            }
         )
         graph_builder.add_conditional_edges(
             "clarification_agent",
             self._route_after_debugger,
             {"retry_execute":"execute_sql_query", "end":END}
         )
-        graph_builder.add_edge("summarizer", "visualization")
-        graph_builder.add_edge("visualization","follow_up_questions")
+        # Summarizer, visualization and follow-ups only depend on the query result and its profile:
+        # fan out concurrently and join before the final answer
+        for node in POST_QUERY_NODES:
+            graph_builder.add_edge("profile_result", node)
+        graph_builder.add_edge(POST_QUERY_NODES, "compose_answer")
         graph_builder.add_edge("noanswer",END)
-        graph_builder.add_edge("follow_up_questions",END)
+        graph_builder.add_edge("compose_answer",END)
         graph_builder.add_edge("greeting",END)  
         graph_builder.add_edge("help_agent", END)
         
         return graph_builder
 
+    def _route_after_sql_cache(self, state: WorkflowState) -> str:
+        return "hit" if state.get("sql_cache_hit") else "miss"
+
     def _route_after_execute(self, state: WorkflowState) -> str:
-        # Success path
+        # Success path: profile the result, then summarizer, visualization and follow-ups run in parallel
         if not state.get("has_sql_error"):
-            return "success"
+            return "profile"
+        # A cached SQL failed: generate a fresh query instead of debugging the stale one
+        if state.get("sql_cache_fallback"):
+            return "regenerate"
         # If there is an error, decide whether to retry via debugger or clarify
         retry_count = state.get("retry_count", 0)
         if retry_count < 3:
@@ -139,6 +258,9 @@ class TextToSQLWorkflow:
     def _clarification_agent(self, state: WorkflowState) -> WorkflowState:
         return run_clarification(state, self.llm, debugger_prompt, get_callback_config)
 
+    async def _aclarification_agent(self, state: WorkflowState) -> WorkflowState:
+        return await arun_clarification(state, self.llm, debugger_prompt, get_callback_config)
+
     def _route_by_intent(self, state: WorkflowState) -> str:
         """Route based on the classified intent"""
         intent = state.get("intent", "").strip().lower()
@@ -154,7 +276,24 @@ class TextToSQLWorkflow:
             return "system_query"
 
     def _intent_classification_agent(self,state:WorkflowState)->WorkflowState:
-        return run_intent(state, self.llm, intent_prompt, get_callback_config)
+        if self.speculative_retrieval is not None:
+            self.speculative_retrieval.start(state["request_id"], state.get("collection_name", "semantics"), state["question"])
+        result_state = run_intent(state, self.llm, intent_prompt, get_callback_config, self.intent_classifier)
+        return self._settle_speculation(result_state)
+
+    async def _aintent_classification_agent(self, state: WorkflowState) -> WorkflowState:
+        if self.speculative_retrieval is not None:
+            self.speculative_retrieval.astart(state["request_id"], state.get("collection_name", "semantics"), state["question"])
+        result_state = await arun_intent(state, self.llm, intent_prompt, get_callback_config, self.intent_classifier)
+        return self._settle_speculation(result_state)
+
+    def _settle_speculation(self, state: WorkflowState) -> WorkflowState:
+        """Discard the speculative retrieval when the question will not reach populate_qdrant_data"""
+        if self.speculative_retrieval is not None and self._route_by_intent(state) != "system_query":
+            metrics = self.speculative_retrieval.discard(state["request_id"])
+            if metrics:
+                state["metrics"] = {**state.get("metrics", {}), "speculative_retrieval": metrics}
+        return state
     
     def _greeting_agent(self,state:WorkflowState)->WorkflowState:
         prompt=ChatPromptTemplate.from_messages(greeting_prompt)
@@ -168,6 +307,19 @@ class TextToSQLWorkflow:
         state["final_answer"]=result.content.strip()
 
         return state
+
+    async def _agreeting_agent(self, state: WorkflowState) -> WorkflowState:
+        prompt = ChatPromptTemplate.from_messages(greeting_prompt)
+        chain = prompt | self.llm
+
+        result = await chain.ainvoke({
+            "question": state["question"]
+        },
+        config=get_callback_config("greeting")
+        )
+        state["final_answer"] = result.content.strip()
+
+        return state
     
     def _help_agent(self, state: WorkflowState) -> WorkflowState:
         """Agent to handle help/assistance questions"""
@@ -176,11 +328,50 @@ class TextToSQLWorkflow:
         return state
 
     def _populate_qdrant_data_agent(self, state: WorkflowState) -> WorkflowState:
-        return run_populate_qdrant(state)
+        if self.speculative_retrieval is None:
+            return run_populate_qdrant(state)
+        semantic_data, metrics = self.speculative_retrieval.take(state["request_id"])
+        if metrics:
+            state["metrics"] = {**state.get("metrics", {}), "speculative_retrieval": metrics}
+        return run_populate_qdrant(state, semantic_data)
+
+    async def _apopulate_qdrant_data_agent(self, state: WorkflowState) -> WorkflowState:
+        if self.speculative_retrieval is None:
+            return await arun_populate_qdrant(state)
+        semantic_data, metrics = await self.speculative_retrieval.atake(state["request_id"])
+        if metrics:
+            state["metrics"] = {**state.get("metrics", {}), "speculative_retrieval": metrics}
+        return await arun_populate_qdrant(state, semantic_data)
 
     
     
+    def _sql_cache_lookup_agent(self, state: WorkflowState) -> WorkflowState:
+        result_state = run_sql_cache_lookup(state, self.sql_cache)
+        # Record reused SQL in the conversation just like generated SQL
+        thread_id = state.get("thread_id")
+        if thread_id and result_state.get("sql_cache_hit"):
+            self.redis_session.add_message(
+                thread_id=thread_id,
+                role="assistant",
+                content=result_state.get("sql_query", ""),
+                sql_query=result_state.get("sql_query", "")
+            )
+        return result_state
+
+    async def _asql_cache_lookup_agent(self, state: WorkflowState) -> WorkflowState:
+        result_state = await arun_sql_cache_lookup(state, self.sql_cache)
+        thread_id = state.get("thread_id")
+        if thread_id and result_state.get("sql_cache_hit"):
+            await self.async_redis_session.add_message(
+                thread_id=thread_id,
+                role="assistant",
+                content=result_state.get("sql_query", ""),
+                sql_query=result_state.get("sql_query", "")
+            )
+        return result_state
+
     def _text_to_sql_agent(self,state:WorkflowState)->WorkflowState:
+        state["sql_cache_fallback"] = False
         result_state = run_text_to_sql(state, self.llm, text_to_sql_prompt, get_callback_config)
         # Save SQL query to Redis if we have a thread_id in the state
         thread_id = state.get("thread_id")
@@ -192,24 +383,42 @@ class TextToSQLWorkflow:
                 sql_query=result_state.get("sql_query", "")
             )
         return result_state
+
+    async def _atext_to_sql_agent(self, state: WorkflowState) -> WorkflowState:
+        state["sql_cache_fallback"] = False
+        result_state = await arun_text_to_sql(state, self.llm, text_to_sql_prompt, get_callback_config)
+        thread_id = state.get("thread_id")
+        if thread_id and result_state.get("sql_query"):
+            await self.async_redis_session.add_message(
+                thread_id=thread_id,
+                role="assistant",
+                content=result_state.get("sql_query", ""),
+                sql_query=result_state.get("sql_query", "")
+            )
+        return result_state
     
     def _execute_sql_query(self, state: WorkflowState) -> WorkflowState:
-        return run_execute_sql(state, self._get_db_connection)
-    def _get_db_connection(self):
-        try:
-            from urllib.parse import quote_plus
-            q_user = os.getenv('QUERY_DB_USER')
-            q_pass = os.getenv('QUERY_DB_PASSWORD', '')
-            q_host = os.getenv('QUERY_DB_HOST')
-            q_port = os.getenv('QUERY_DB_PORT')
-            q_name = os.getenv('QUERY_DB_NAME')
-            encoded_q_pass = quote_plus(q_pass or '')
-            DATABASE_URL = f"postgresql://{q_user}:{encoded_q_pass}@{q_host}:{q_port}/{q_name}?sslmode=require"
-            connection = psycopg.connect(DATABASE_URL)
-            return connection
-        except psycopg.Error:
-            return None  
+        result_state = run_execute_sql(state, get_db_pool, self.result_cache)
+        if self.sql_cache is not None:
+            record_sql_cache_execution(result_state, self.sql_cache)
+        return result_state
+
+    async def _aexecute_sql_query(self, state: WorkflowState) -> WorkflowState:
+        result_state = await arun_execute_sql(state, get_async_db_pool, self.result_cache)
+        if self.sql_cache is not None:
+            await arecord_sql_cache_execution(result_state, self.sql_cache)
+        return result_state
     
+    def _profile_result_agent(self, state: WorkflowState) -> WorkflowState:
+        result_state = run_profile_result(state)
+        return {"result_profile": result_state.get("result_profile", {}), "metrics": result_state.get("metrics", {})}
+
+    async def _aprofile_result_agent(self, state: WorkflowState) -> WorkflowState:
+        result_state = await arun_profile_result(state)
+        return {"result_profile": result_state.get("result_profile", {}), "metrics": result_state.get("metrics", {})}
+
+    # Post-query nodes run concurrently, so each returns only the keys it owns
+
     def _summarizer_agent(self, state: WorkflowState) -> WorkflowState:
         result_state = run_summarizer(state, self.llm, summarizer_prompt, get_callback_config)
         # Save final answer to Redis if we have a thread_id
@@ -220,7 +429,18 @@ class TextToSQLWorkflow:
                 role="assistant",
                 content=result_state.get("final_answer", "")
             )
-        return result_state
+        return {"final_answer": result_state.get("final_answer", "")}
+
+    async def _asummarizer_agent(self, state: WorkflowState) -> WorkflowState:
+        result_state = await arun_summarizer(state, self.llm, summarizer_prompt, get_callback_config)
+        thread_id = state.get("thread_id")
+        if thread_id and result_state.get("final_answer"):
+            await self.async_redis_session.add_message(
+                thread_id=thread_id,
+                role="assistant",
+                content=result_state.get("final_answer", "")
+            )
+        return {"final_answer": result_state.get("final_answer", "")}
 
     def _noanswer_agent(self, state: WorkflowState) -> WorkflowState:
 
@@ -229,28 +449,37 @@ class TextToSQLWorkflow:
         return state
     
     def _visualization_agent(self, state: WorkflowState) -> WorkflowState:
-        return run_visualization(state, self.llm, visualization_prompt, get_callback_config)
+        result_state = run_visualization(state, self.llm, visualization_prompt, get_callback_config, rules=self.chart_rules)
+        return {"visualization_data": result_state.get("visualization_data", {}), "metrics": result_state.get("metrics", {})}
+
+    async def _avisualization_agent(self, state: WorkflowState) -> WorkflowState:
+        result_state = await arun_visualization(state, self.llm, visualization_prompt, get_callback_config, rules=self.chart_rules)
+        return {"visualization_data": result_state.get("visualization_data", {}), "metrics": result_state.get("metrics", {})}
 
     def _follow_up_questions_agent(self, state: WorkflowState) -> WorkflowState:
-        return run_followups(state, self.llm, follow_up_questions_prompt)
+        result_state = run_followups(state, self.llm, follow_up_questions_prompt)
+        return {"follow_up_questions": result_state.get("follow_up_questions", {})}
 
+    async def _afollow_up_questions_agent(self, state: WorkflowState) -> WorkflowState:
+        result_state = await arun_followups(state, self.llm, follow_up_questions_prompt)
+        return {"follow_up_questions": result_state.get("follow_up_questions", {})}
 
-    def run_stream_workflow(self, question: str, thread_id: str, collection_name: str = "semantics"):
-        # Load conversation history from Redis
-        redis_history = self.redis_session.get_conversation_history(thread_id, limit=10)
-        langchain_history = convert_redis_to_langchain_messages(redis_history)
-        
-        # Save user question to Redis
-        self.redis_session.add_message(thread_id=thread_id, role="user", content=question)
-        
-        input_state = WorkflowState(
-            history=langchain_history,
+    def _compose_answer_agent(self, state: WorkflowState) -> WorkflowState:
+        """Join point for the parallel post-query nodes; their outputs are merged by the state reducers"""
+        return {}
+
+
+    def _initial_state(self, question: str, thread_id: str, collection_name: str, history: list) -> WorkflowState:
+        return WorkflowState(
+            history=history,
             question=question,
             intent="",
             selected_tables=[],
             semantic_info="",
+            join_paths=[],
             sql_query="", 
-            query_result="", 
+            query_result=None, 
+            result_profile={},
             needs_clarification="", 
             visualization_data={},
             final_answer="",
@@ -259,78 +488,159 @@ class TextToSQLWorkflow:
             retry_count=0,
             has_sql_error=False,
             error_history=[],
-            thread_id=thread_id  # Store thread_id in state for agents to access
+            sql_cache_hit=False,
+            result_cache_hit=False,
+            result_truncated=False,
+            result_row_count=None,
+            metrics={},
+            thread_id=thread_id,  # Store thread_id in state for agents to access
+            request_id=uuid.uuid4().hex
+        )
+
+    def _discard_speculation(self, input_state: WorkflowState):
+        # Normally a no-op; covers runs that failed before populate_qdrant_data took the result
+        if self.speculative_retrieval is not None:
+            self.speculative_retrieval.discard(input_state["request_id"])
+
+    def _node_update_event(self, node_name: str, thread_id: str) -> str:
+        update_response = StreamResponse(
+            type="node_update",
+            data={
+                "node": node_name,
+                "message": NODE_MESSAGES.get(node_name, "Working on it...")
+            },
+            node=node_name,
+            thread_id=thread_id,
+            timestamp=datetime.now().isoformat(),
+        )
+        return f"data: {update_response.model_dump_json()}\n\n"
+
+    def _answer_token_event(self, message, metadata: Dict[str, Any], thread_id: str) -> Optional[str]:
+        node_name = metadata.get("langgraph_node")
+        # Only LLM token chunks of answer nodes; other nodes' LLM calls stay internal
+        if node_name not in self.answer_token_nodes or not isinstance(message, AIMessageChunk):
+            return None
+        if not isinstance(message.content, str) or not message.content:
+            return None
+        token_response = StreamResponse(
+            type="answer_token",
+            data={"node": node_name, "token": message.content},
+            node=node_name,
+            thread_id=thread_id,
+            timestamp=datetime.now().isoformat(),
         )
+        return f"data: {token_response.model_dump_json()}\n\n"
+
+    def _stream_events(self, mode: str, payload: Any, latest_state: Dict[str, Any], thread_id: str, started: float):
+        """Turn one (mode, payload) item of graph.stream/astream into SSE events"""
+        if mode == "messages":
+            message, metadata = payload
+            event = self._answer_token_event(message, metadata, thread_id)
+            if event is not None:
+                metrics = latest_state.get("metrics") or {}
+                if "time_to_first_token_ms" not in metrics:
+                    latest_state["metrics"] = {**metrics, "time_to_first_token_ms": round((time.perf_counter() - started) * 1000, 2)}
+                yield event
+            return
+        for node_name, update in payload.items():
+            # Update our tracked state with the latest values
+            if isinstance(update, dict):
+                # Keep stream-side metrics when a node returns the whole metrics dict
+                if "metrics" in update:
+                    update = {**update, "metrics": {**latest_state.get("metrics", {}), **(update["metrics"] or {})}}
+                latest_state.update(update)
+
+            yield self._node_update_event(node_name, thread_id)
+
+    def _final_answer_event(self, latest_state: Dict[str, Any], thread_id: str) -> str:
+        # Extract final values from the tracked state
+        final_answer = latest_state.get("final_answer", "")
+        visualization_data = latest_state.get("visualization_data", {})
+        sql_query = latest_state.get("sql_query", "")
+        follow_up_questions = latest_state.get("follow_up_questions", {})
+
+        completion_response = StreamResponse(
+            type="final_answer",
+            data={"final_answer": final_answer,"visualization_data":visualization_data,"sql_query":sql_query,"follow_up_questions":follow_up_questions,"sql_cache_hit":latest_state.get("sql_cache_hit", False),"result_cache_hit":latest_state.get("result_cache_hit", False),"result_truncated":latest_state.get("result_truncated", False),"result_row_count":latest_state.get("result_row_count"),"metrics":latest_state.get("metrics", {})},
+            thread_id=thread_id,
+            timestamp=datetime.now().isoformat(),
+        )
+        return f"data: {completion_response.model_dump_json()}\n\n"
+
+    def _error_event(self, error: Exception, thread_id: str) -> str:
+        import traceback
+        print(f"Error in streaming workflow: {error}")
+        print(traceback.format_exc())
+        # Send error response
+        error_response = StreamResponse(
+            type="error",
+            data={"error": str(error)},
+            thread_id=thread_id,
+            timestamp=datetime.now().isoformat(),
+        )
+        return f"data: {error_response.model_dump_json()}\n\n"
+
+    def run_stream_workflow(self, question: str, thread_id: str, collection_name: str = "semantics"):
+        # Load conversation history from Redis
+        redis_history = self.redis_session.get_conversation_history(thread_id, limit=10)
+        langchain_history = convert_redis_to_langchain_messages(redis_history)
+        
+        # Save user question to Redis
+        self.redis_session.add_message(thread_id=thread_id, role="user", content=question)
+        
+        input_state = self._initial_state(question, thread_id, collection_name, langchain_history)
         
         try:
-            workflow = self._build_workflow()
-            graph = workflow.compile()  # No checkpointer needed
-
             config = {"configurable": {"thread_id": thread_id}}
-            # User-facing status messages for each node
-            user_friendly_messages = {
-                "intent_classification": "Understanding what you need...",
-                "greeting": "Saying hello 👋...",
-                "help_agent": "Gathering helpful information...",
-                "populate_qdrant_data": "Finding the most relevant information for you...",
-                "text_to_sql": "Figuring out the best way to answer your question...",
-                "execute_sql_query": "Processing your request...",
-                "clarification_agent": "Making sure I understood you correctly...",
-                "summarizer": "Summarizing the key points...",
-                "visualization": "Creating a visual overview...",
-                "follow_up_questions": "Thinking of helpful next steps...",
-                "noanswer": "Sorry, I couldn't find a clear answer this time."
-            }
             
             # Track the latest state during streaming
             latest_state = input_state.copy()
+            started = time.perf_counter()
             
-            for chunk in graph.stream(
+            for mode, payload in self.graph.stream(
                 input=input_state,
                 config=config,
-                stream_mode="updates",
+                stream_mode=self.stream_modes,
             ):
-                for node_name, update in chunk.items():
-                    # Update our tracked state with the latest values
-                    if isinstance(update, dict):
-                        latest_state.update(update)
-                    
-                    update_response = StreamResponse(
-                        type="node_update",
-                        data={
-                            "node": node_name,
-                            "message": user_friendly_messages.get(node_name, "Working on it...")
-                        },
-                        node=node_name,
-                        thread_id=thread_id,
-                        timestamp=datetime.now().isoformat(),
-                    )
-                    yield f"data: {update_response.model_dump_json()}\n\n"
-
-            # Extract final values from the tracked state
-            final_answer = latest_state.get("final_answer", "")
-            visualization_data = latest_state.get("visualization_data", {})
-            sql_query = latest_state.get("sql_query", "")
-            follow_up_questions = latest_state.get("follow_up_questions", {})
-
-            completion_response = StreamResponse(
-                type="final_answer",
-                data={"final_answer": final_answer,"visualization_data":visualization_data,"sql_query":sql_query,"follow_up_questions":follow_up_questions},
-                thread_id=thread_id,
-                timestamp=datetime.now().isoformat(),
-            )
-            yield f"data: {completion_response.model_dump_json()}\n\n"
+                yield from self._stream_events(mode, payload, latest_state, thread_id, started)
+
+            yield self._final_answer_event(latest_state, thread_id)
             
         except Exception as e:
-            import traceback
-            print(f"Error in streaming workflow: {e}")
-            print(traceback.format_exc())
-            # Send error response
-            error_response = StreamResponse(
-                type="error",
-                data={"error": str(e)},
-                thread_id=thread_id,
-                timestamp=datetime.now().isoformat(),
-            )
-            yield f"data: {error_response.model_dump_json()}\n\n"
+            yield self._error_event(e, thread_id)
+        finally:
+            self._discard_speculation(input_state)
 
+    async def arun_stream_workflow(self, question: str, thread_id: str, collection_name: str = "semantics"):
+        """
+        Async variant of run_stream_workflow built on graph.astream.
+
+        All I/O (LLM, Qdrant, PostgreSQL, Redis) is awaited, so many SSE streams can be
+        served concurrently by a single worker without blocking the event loop.
+        """
+        redis_history = await self.async_redis_session.get_conversation_history(thread_id, limit=10)
+        langchain_history = convert_redis_to_langchain_messages(redis_history)
+        
+        await self.async_redis_session.add_message(thread_id=thread_id, role="user", content=question)
+        
+        input_state = self._initial_state(question, thread_id, collection_name, langchain_history)
+        
+        try:
+            config = {"configurable": {"thread_id": thread_id}}
+            latest_state = input_state.copy()
+            started = time.perf_counter()
+            
+            async for mode, payload in self.graph.astream(
+                input=input_state,
+                config=config,
+                stream_mode=self.stream_modes,
+            ):
+                for event in self._stream_events(mode, payload, latest_state, thread_id, started):
+                    yield event
+
+            yield self._final_answer_event(latest_state, thread_id)
+            
+        except Exception as e:
+            yield self._error_event(e, thread_id)
+        finally:
+            self._discard_speculation(input_state)
@@ -0,0 +1,126 @@
+"""
+Per-collection index epoch
+A counter in Redis that is incremented whenever a collection's index changes. State derived
+from the index in a worker process (the semantic SQL cache and the QdrantService registry)
+records the epoch it was built for and is rebuilt once the shared epoch moves on, so a
+re-index served by one worker invalidates every worker. Reads are cached for
+INDEX_EPOCH_REFRESH_SECONDS; Redis calls time out after INDEX_EPOCH_REDIS_TIMEOUT seconds and,
+while Redis is unreachable, the last known epoch is used and bumps are process-local.
+"""
+
+import os
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from convBI.redis_session import create_redis_pool, create_async_redis_pool
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "index_epoch"
+
+
+def _epoch_key(collection_name: str) -> str:
+    return f"{KEY_PREFIX}:{collection_name}"
+
+
+class IndexEpochs:
+    """
+    Index epochs of all collections, read through a short-lived local cache
+
+    Args:
+        refresh_seconds: How long a read epoch is trusted before Redis is asked again
+        redis_timeout: Socket connect/read timeout of the Redis calls, in seconds
+    """
+
+    def __init__(self, refresh_seconds: float = 1.0, redis_timeout: float = 0.5, redis_client=None, async_redis_client=None):
+        self.refresh_seconds = refresh_seconds
+        self.redis_timeout = redis_timeout
+        self._redis_client = redis_client
+        self._async_redis_client = async_redis_client
+        self._local: Dict[str, Tuple[float, int]] = {}  # collection -> (read at, epoch)
+        self._lock = threading.Lock()
+
+    def _pool_kwargs(self) -> Dict[str, float]:
+        return {"socket_timeout": self.redis_timeout, "socket_connect_timeout": self.redis_timeout}
+
+    @property
+    def redis_client(self):
+        if self._redis_client is None:
+            import redis
+            self._redis_client = redis.Redis(connection_pool=create_redis_pool(**self._pool_kwargs()))
+        return self._redis_client
+
+    @property
+    def async_redis_client(self):
+        if self._async_redis_client is None:
+            import redis.asyncio as aioredis
+            self._async_redis_client = aioredis.Redis(connection_pool=create_async_redis_pool(**self._pool_kwargs()))
+        return self._async_redis_client
+
+    def _cached(self, collection_name: str) -> Optional[Tuple[float, int]]:
+        with self._lock:
+            return self._local.get(collection_name)
+
+    def _remember(self, collection_name: str, epoch: int) -> int:
+        with self._lock:
+            self._local[collection_name] = (time.monotonic(), epoch)
+        return epoch
+
+    def _fresh(self, cached: Optional[Tuple[float, int]]) -> bool:
+        return cached is not None and time.monotonic() - cached[0] < self.refresh_seconds
+
+    def _read_failed(self, collection_name: str, cached: Optional[Tuple[float, int]], error: Exception) -> int:
+        # Keep serving the last known epoch; retried after refresh_seconds
+        logger.warning(f"Index epoch read failed for {collection_name}: {error}")
+        return self._remember(collection_name, cached[1] if cached is not None else 0)
+
+    def get(self, collection_name: str) -> int:
+        """Current epoch of a collection (0 until it is first re-indexed)"""
+        cached = self._cached(collection_name)
+        if self._fresh(cached):
+            return cached[1]
+        try:
+            epoch = int(self.redis_client.get(_epoch_key(collection_name)) or 0)
+        except Exception as e:
+            return self._read_failed(collection_name, cached, e)
+        return self._remember(collection_name, epoch)
+
+    async def aget(self, collection_name: str) -> int:
+        """Async variant of get for the event loop"""
+        cached = self._cached(collection_name)
+        if self._fresh(cached):
+            return cached[1]
+        try:
+            epoch = int(await self.async_redis_client.get(_epoch_key(collection_name)) or 0)
+        except Exception as e:
+            return self._read_failed(collection_name, cached, e)
+        return self._remember(collection_name, epoch)
+
+    def bump(self, collection_name: str) -> int:
+        """Start a new epoch after the collection's index changed; returns it"""
+        try:
+            epoch = int(self.redis_client.incr(_epoch_key(collection_name)))
+        except Exception as e:
+            logger.warning(f"Index epoch update failed for {collection_name}, only this process sees it: {e}")
+            cached = self._cached(collection_name)
+            epoch = (cached[1] if cached is not None else 0) + 1
+        return self._remember(collection_name, epoch)
+
+
+_epochs: Optional[IndexEpochs] = None
+_epochs_lock = threading.Lock()
+
+
+def get_index_epochs() -> IndexEpochs:
+    """Return the process-wide index epochs configured from the environment"""
+    global _epochs
+    if _epochs is None:
+        with _epochs_lock:
+            if _epochs is None:
+                _epochs = IndexEpochs(
+                    refresh_seconds=float(os.getenv("INDEX_EPOCH_REFRESH_SECONDS", 1.0)),
+                    redis_timeout=float(os.getenv("INDEX_EPOCH_REDIS_TIMEOUT", 0.5))
+                )
+    return _epochs
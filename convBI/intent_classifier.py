@@ -0,0 +1,224 @@
+"""
+Local intent classifier
+Cheap lexical rules for greetings and help requests, followed by a nearest-centroid model over
+dense sentence embeddings trained from a small labelled file. It runs in front of the intent LLM
+call; only questions it is not confident about fall through to the LLM.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from services.embedding_cache import DENSE, get_embedding_cache
+from services.hybrid_retrieval import DENSE_MODEL_NAME, get_dense_embeddings
+
+logger = logging.getLogger(__name__)
+
+INTENTS = ("general", "help", "system_query")
+DEFAULT_EXAMPLES_PATH = Path(__file__).parent / "data" / "intent_examples.jsonl"
+
+# Whole-message small talk: greetings, thanks and goodbyes with nothing else in them
+_GREETING_PATTERN = re.compile(
+    r"^(?:(?:hi|hello|hey|hiya|yo|greetings|good (?:morning|afternoon|evening|night|day)|"
+    r"thanks|thank you|thx|cheers|bye|goodbye|see you|ok|okay|cool|great|awesome|nice)"
+    r"(?: there| again| so much| a lot| all| everyone| later)?[\s,.!]*)+$"
+)
+_HELP_PATTERNS = [
+    re.compile(p) for p in (
+        r"^help[\s.!?]*$",
+        r"\bwhat (?:else )?(?:can|do) you (?:do|help|offer)\b",
+        r"\bhow (?:can|could) you (?:help|assist)\b",
+        r"\bhow (?:do|can|should) i use (?:this|you|the (?:system|app|tool|assistant))\b",
+        r"\bwhat are your (?:capabilities|features|limitations)\b",
+        r"\b(?:who|what) are you\b",
+        r"\btell me about yourself\b",
+        r"\bwhat (?:kind of|type of|sort of)? ?questions can i ask\b",
+    )
+]
+
+
+class IntentPrediction(NamedTuple):
+    label: str
+    confidence: float
+    source: str  # "rules" or "centroid"
+
+
+def load_examples(path: Path = DEFAULT_EXAMPLES_PATH) -> List[Dict[str, str]]:
+    """Read {"text", "label"} records from a JSONL file"""
+    examples = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if record.get("label") not in INTENTS:
+                raise ValueError(f"Unknown intent label in {path}: {record.get('label')}")
+            examples.append({"text": record["text"], "label": record["label"]})
+    return examples
+
+
+def classify_rules(question: str) -> Optional[IntentPrediction]:
+    """Match unambiguous greetings and help requests without any model"""
+    text = " ".join(question.lower().replace("’", "'").split())
+    if not text:
+        return None
+    if _GREETING_PATTERN.match(text):
+        return IntentPrediction("general", 1.0, "rules")
+    if any(pattern.search(text) for pattern in _HELP_PATTERNS):
+        return IntentPrediction("help", 1.0, "rules")
+    return None
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+class LocalIntentClassifier:
+    """
+    Rules + nearest-centroid intent classifier
+
+    Question embeddings go through the shared embedding cache under the same keys as retrieval,
+    so the vector computed here is reused by the SQL cache and the Qdrant search.
+
+    Args:
+        examples: Labelled {"text", "label"} training examples
+        min_margin: Minimum gap between the best and second-best centroid similarity
+        min_similarity: Minimum similarity to the best centroid
+    """
+
+    def __init__(self, examples: List[Dict[str, str]], min_margin: float = 0.05, min_similarity: float = 0.3):
+        self.examples = examples
+        self.min_margin = min_margin
+        self.min_similarity = min_similarity
+        self.embeddings = get_dense_embeddings()
+        self.embedding_cache = get_embedding_cache()
+        self.labels: List[str] = []
+        self.centroids: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        self._train_lock = threading.Lock()
+        self._stats = {"rules": 0, "centroid": 0, "fallback": 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _fit(self, vectors: List[List[float]]) -> None:
+        matrix = _normalize_rows(np.asarray(vectors, dtype=np.float32))
+        example_labels = np.array([e["label"] for e in self.examples])
+        labels = [label for label in INTENTS if (example_labels == label).any()]
+        centroids = np.vstack([matrix[example_labels == label].mean(axis=0) for label in labels])
+        self.labels, self.centroids = labels, _normalize_rows(centroids)
+
+    def _cached_example_vectors(self) -> List[Optional[List[float]]]:
+        return [self.embedding_cache.get(DENSE, DENSE_MODEL_NAME, e["text"]) for e in self.examples]
+
+    def train(self) -> None:
+        """Embed the examples (batched, through the embedding cache) and build the centroids"""
+        vectors = self._cached_example_vectors()
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if missing:
+            computed = self.embeddings.embed_documents([self.examples[i]["text"] for i in missing])
+            for i, vector in zip(missing, computed):
+                self.embedding_cache.set(DENSE, DENSE_MODEL_NAME, self.examples[i]["text"], vector)
+                vectors[i] = vector
+        self._fit(vectors)
+
+    async def atrain(self) -> None:
+        vectors = self._cached_example_vectors()
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if missing:
+            computed = await self.embeddings.aembed_documents([self.examples[i]["text"] for i in missing])
+            for i, vector in zip(missing, computed):
+                self.embedding_cache.set(DENSE, DENSE_MODEL_NAME, self.examples[i]["text"], vector)
+                vectors[i] = vector
+        self._fit(vectors)
+
+    def predict_vector(self, vector) -> IntentPrediction:
+        """Nearest centroid for a question embedding; confidence is the similarity margin"""
+        query = _normalize_rows(np.asarray(vector, dtype=np.float32))
+        similarities = self.centroids @ query
+        order = np.argsort(similarities)[::-1]
+        best = float(similarities[order[0]])
+        runner_up = float(similarities[order[1]]) if len(order) > 1 else 0.0
+        confidence = best - runner_up if best >= self.min_similarity else 0.0
+        return IntentPrediction(self.labels[order[0]], confidence, "centroid")
+
+    def _accept(self, prediction: Optional[IntentPrediction], has_history: bool) -> Optional[IntentPrediction]:
+        if prediction is None or prediction.source == "rules":
+            return prediction
+        if prediction.confidence < self.min_margin:
+            return None
+        # Follow-ups only make sense with the conversation, which the LLM prompt sees
+        if has_history and prediction.label != "system_query":
+            return None
+        return prediction
+
+    def _finish(self, prediction: Optional[IntentPrediction]) -> Optional[IntentPrediction]:
+        self._count(prediction.source if prediction else "fallback")
+        return prediction
+
+    def classify(self, question: str, has_history: bool = False) -> Optional[IntentPrediction]:
+        """Return a confident prediction, or None when the LLM should decide"""
+        prediction = classify_rules(question)
+        if prediction is None:
+            try:
+                if self.centroids is None:
+                    with self._train_lock:
+                        if self.centroids is None:
+                            self.train()
+                vector = self.embedding_cache.get_or_compute(DENSE, DENSE_MODEL_NAME, question, self.embeddings.embed_query)
+                prediction = self.predict_vector(vector)
+            except Exception as e:
+                logger.warning(f"Local intent classification failed: {e}")
+        return self._finish(self._accept(prediction, has_history))
+
+    async def aclassify(self, question: str, has_history: bool = False) -> Optional[IntentPrediction]:
+        prediction = classify_rules(question)
+        if prediction is None:
+            try:
+                if self.centroids is None:
+                    # Concurrent first requests may both train; the result is identical
+                    await self.atrain()
+                vector = await self.embedding_cache.aget_or_compute(DENSE, DENSE_MODEL_NAME, question, self.embeddings.aembed_query)
+                prediction = self.predict_vector(vector)
+            except Exception as e:
+                logger.warning(f"Local intent classification failed: {e}")
+        return self._finish(self._accept(prediction, has_history))
+
+    def stats(self) -> Dict[str, Any]:
+        """How many questions were decided by rules, by the centroid model, or by the LLM"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["trained"] = self.centroids is not None
+        stats["examples"] = len(self.examples)
+        return stats
+
+
+_classifier: Optional[LocalIntentClassifier] = None
+_classifier_lock = threading.Lock()
+
+
+def is_intent_classifier_enabled() -> bool:
+    return os.getenv("INTENT_CLASSIFIER_ENABLED", "false").lower() == "true"
+
+
+def get_intent_classifier() -> LocalIntentClassifier:
+    """Return the process-wide local intent classifier configured from the environment"""
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                _classifier = LocalIntentClassifier(
+                    examples=load_examples(Path(os.getenv("INTENT_CLASSIFIER_EXAMPLES", DEFAULT_EXAMPLES_PATH))),
+                    min_margin=float(os.getenv("INTENT_CLASSIFIER_MIN_MARGIN", 0.05)),
+                    min_similarity=float(os.getenv("INTENT_CLASSIFIER_MIN_SIMILARITY", 0.3))
+                )
+    return _classifier
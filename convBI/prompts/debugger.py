@@ -8,7 +8,10 @@ CONTEXT
 - User question: {question}
 - Current SQL (may be wrong): {sql_query}
 - Error message: {error_message}
-- Table semantic info (column meanings): {semantic_info}
+- Table semantic info (column meanings; "->" marks a foreign key reference):
+{semantic_info}
+- Known join conditions (foreign keys):
+{join_paths}
  - Previous errors (most recent last): {previous_errors}
 
 STRICT RULES
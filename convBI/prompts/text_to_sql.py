@@ -5,7 +5,10 @@ INPUT DATA (consider unique_values/sample_values to infer realistic filter patte
 - User Question: {question}
 - Conversation History: {history}
 - Selected Tables: {selected_tables}
-- Semantic Information: {semantic_info}
+- Semantic Information (table definitions; "->" marks a foreign key reference):
+{semantic_info}
+- Join Paths (foreign-key join conditions connecting the tables, including any bridge tables; use these instead of guessing joins):
+{join_paths}
 
 STRICT RULES - POSTGRESQL COMPLIANCE:
 
@@ -26,7 +29,7 @@ STRICT RULES - POSTGRESQL COMPLIANCE:
    - Boolean: Use TRUE/FALSE (not 1/0)
 
 3. JOINS AND RELATIONSHIPS:
-   - Identify foreign key relationships from semantic_info
+   - Identify foreign key relationships from semantic_info; when Join Paths are listed, join through exactly those conditions (and bridge tables)
    - Use INNER JOIN for required relationships
    - Use LEFT JOIN when data might be missing
    - Always use table aliases for clarity
@@ -1,37 +1,220 @@
+import os
+import asyncio
+import logging
 import time
-from typing import Dict, Any
-from services.hybrid_retrieval import HybridRetrieval
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+from services.hybrid_retrieval import HybridRetrieval, is_column_index_enabled
+from services.join_graph import JoinGraph, is_join_graph_enabled, join_graph_max_bridges
+from convBI.schema_pruning import key_columns
+from convBI.index_epoch import get_index_epochs
+
+logger = logging.getLogger(__name__)
 
 
 class QdrantService:
-    def __init__(self, collection_name: str = "semantics", use_reranking: bool = True):
+    def __init__(self, collection_name: str = "semantics", use_reranking: bool = True, index_epoch: int = 0):
         self.collection_name = collection_name
         self.use_reranking = use_reranking
+        # Index epoch (convBI.index_epoch) the cached join graph and settings were loaded for
+        self.index_epoch = index_epoch
         self.hybrid_retrieval = HybridRetrieval(collection_name, use_reranking=use_reranking)
+        # Column-level collection: wide tables only carry matching columns (plus keys) into prompts
+        self.use_column_index = is_column_index_enabled()
+        self.column_top_k = int(os.getenv("COLUMN_INDEX_TOP_K", 50))
+        self.min_pruned_columns = int(os.getenv("COLUMN_INDEX_MIN_TABLE_COLUMNS", 30))
+        # Foreign-key join graph stored at index time: explicit join conditions and bridge tables
+        self.use_join_graph = is_join_graph_enabled()
+        self.max_bridge_tables = join_graph_max_bridges()
+        self._join_graph: Optional[JoinGraph] = None
+        self._join_graph_loaded = False
+        self._join_graph_lock = threading.Lock()
     
     def get_all_semantic_data(self, question: str, top_k: int = 10) -> Dict[str, Any]:
         try:
             t0 = time.time()
             # Search for relevant tables using hybrid retrieval with reranking
             results = self.hybrid_retrieval.search_tables(question, k=top_k * 2, use_reranking=self.use_reranking)
+            column_hits = self._search_columns(question) if self.use_column_index else None
             t1 = time.time()
-            
-            # Count reranked results
-            reranked_count = sum(1 for r in results if r.get('reranking_applied', False))
-            
-            organized = self._organize_results(results, top_k)
-            t2 = time.time()
-            
-            organized["timings"] = {
-                "hybrid_search_ms": int((t1 - t0) * 1000),
-                "organize_ms": int((t2 - t1) * 1000),
-                "total_ms": int((t2 - t0) * 1000),
-                "reranking_applied": reranked_count > 0,
-                "reranked_results": reranked_count
-            }
-            return organized
+            join_plan, bridges = self._join_paths(results, top_k)
+            return self._organize_with_timings(results, top_k, t0, t1, column_hits, join_plan, bridges)
         except Exception as e:
             return {"relevant_tables": [], "all_tables": [], "semantics": {}}
+
+    async def aget_all_semantic_data(self, question: str, top_k: int = 10) -> Dict[str, Any]:
+        """Async variant of get_all_semantic_data that does not block the event loop"""
+        try:
+            t0 = time.time()
+            if self.use_column_index:
+                # Both searches share the cached query embeddings
+                results, column_hits = await asyncio.gather(
+                    self.hybrid_retrieval.asearch_tables(question, k=top_k * 2, use_reranking=self.use_reranking),
+                    self._asearch_columns(question)
+                )
+            else:
+                results = await self.hybrid_retrieval.asearch_tables(question, k=top_k * 2, use_reranking=self.use_reranking)
+                column_hits = None
+            t1 = time.time()
+            join_plan, bridges = await self._ajoin_paths(results, top_k)
+            return self._organize_with_timings(results, top_k, t0, t1, column_hits, join_plan, bridges)
+        except Exception as e:
+            return {"relevant_tables": [], "all_tables": [], "semantics": {}}
+
+    def _search_columns(self, question: str) -> Optional[List[Dict]]:
+        """Column hits, or None (keep every column) if the column search fails"""
+        try:
+            return self.hybrid_retrieval.search_columns(question, k=self.column_top_k)
+        except Exception as e:
+            logger.warning(f"Column search failed for {self.collection_name}: {e}")
+            return None
+
+    async def _asearch_columns(self, question: str) -> Optional[List[Dict]]:
+        try:
+            return await self.hybrid_retrieval.asearch_columns(question, k=self.column_top_k)
+        except Exception as e:
+            logger.warning(f"Column search failed for {self.collection_name}: {e}")
+            return None
+
+    def _get_join_graph(self) -> Optional[JoinGraph]:
+        if not self._join_graph_loaded:
+            with self._join_graph_lock:
+                if not self._join_graph_loaded:
+                    self._join_graph = self.hybrid_retrieval.load_join_graph()
+                    self._join_graph_loaded = True
+        return self._join_graph
+
+    async def _aget_join_graph(self) -> Optional[JoinGraph]:
+        if not self._join_graph_loaded:
+            self._join_graph = await self.hybrid_retrieval.aload_join_graph()
+            self._join_graph_loaded = True
+        return self._join_graph
+
+    def _plan_joins(self, graph: JoinGraph, results: List[Dict]) -> Dict[str, Any]:
+        keys = [graph.resolve(r.get("table_name", ""), r.get("schema_name")) for r in results]
+        return graph.join_paths([key for key in keys if key], self.max_bridge_tables)
+
+    def _join_paths(self, results: List[Dict], top_k: int) -> Tuple[Optional[Dict], List[Dict]]:
+        """
+        Join plan for the top_k results and the bridge tables it pulls in
+
+        Returns (None, []) when the join graph is disabled, missing or fails to load, so
+        retrieval degrades to the plain table list.
+        """
+        if not self.use_join_graph:
+            return None, []
+        try:
+            t0 = time.time()
+            graph = self._get_join_graph()
+            if graph is None:
+                return None, []
+            plan = self._plan_joins(graph, results[:top_k])
+            bridges = self.hybrid_retrieval.get_tables(plan["bridge_tables"])
+            plan["ms"] = int((time.time() - t0) * 1000)
+            return plan, bridges
+        except Exception as e:
+            logger.warning(f"Join path planning failed for {self.collection_name}: {e}")
+            return None, []
+
+    async def _ajoin_paths(self, results: List[Dict], top_k: int) -> Tuple[Optional[Dict], List[Dict]]:
+        if not self.use_join_graph:
+            return None, []
+        try:
+            t0 = time.time()
+            graph = await self._aget_join_graph()
+            if graph is None:
+                return None, []
+            plan = self._plan_joins(graph, results[:top_k])
+            bridges = await self.hybrid_retrieval.aget_tables(plan["bridge_tables"])
+            plan["ms"] = int((time.time() - t0) * 1000)
+            return plan, bridges
+        except Exception as e:
+            logger.warning(f"Join path planning failed for {self.collection_name}: {e}")
+            return None, []
+
+    def _organize_with_timings(self, results, top_k, t0, t1, column_hits=None, join_plan=None, bridges=()):
+        # Count reranked results
+        reranked_count = sum(1 for r in results if r.get('reranking_applied', False))
+        
+        organized = self._organize_results(results, top_k)
+        if join_plan is not None:
+            self._add_join_paths(organized, join_plan, bridges)
+        column_stats = self._safe_prune_columns(organized["semantics"], column_hits) if column_hits is not None else None
+        t2 = time.time()
+        
+        organized["timings"] = {
+            "hybrid_search_ms": int((t1 - t0) * 1000),
+            "organize_ms": int((t2 - t1) * 1000),
+            "total_ms": int((t2 - t0) * 1000),
+            "reranking_applied": reranked_count > 0,
+            "reranked_results": reranked_count,
+            # Set when the reranker missed its budget, had no free worker or failed and RRF order was kept
+            "rerank_fallback": next((r["rerank_fallback"] for r in results if r.get("rerank_fallback")), None),
+            "rerank_cache_hit": any(r.get("rerank_cached") for r in results)
+        }
+        if column_stats is not None:
+            organized["timings"]["column_pruning"] = column_stats
+        if join_plan is not None:
+            organized["timings"]["join_paths"] = {
+                "ms": join_plan.get("ms", 0),
+                "joins": len(join_plan["joins"]),
+                "bridge_tables": join_plan["bridge_tables"],
+                "unconnected": join_plan["unconnected"],
+            }
+        return organized
+
+    def _add_join_paths(self, organized: Dict[str, Any], join_plan: Dict[str, Any], bridges: List[Dict]):
+        """
+        Append the bridge tables after the retrieved ones and attach the join conditions
+
+        bridge_tables lists them so schema pruning keeps them for as long as the tables they join.
+        """
+        organized["bridge_tables"] = []
+        for result in bridges:
+            table_name = result.get("table_name")
+            if table_name and table_name not in organized["semantics"]:
+                organized["relevant_tables"].append(table_name)
+                organized["all_tables"].append(table_name)
+                organized["semantics"][table_name] = self._table_semantics(result)
+                organized["bridge_tables"].append(table_name)
+        organized["join_paths"] = join_plan["joins"]
+
+    def _safe_prune_columns(self, semantics: Dict[str, Dict], column_hits: List[Dict]) -> Optional[Dict[str, int]]:
+        """Column pruning that keeps every column instead of failing the retrieval"""
+        try:
+            return self._prune_columns(semantics, column_hits)
+        except Exception as e:
+            logger.warning(f"Column pruning failed for {self.collection_name}, keeping all columns: {e}")
+            return None
+
+    def _prune_columns(self, semantics: Dict[str, Dict], column_hits: List[Dict]) -> Dict[str, int]:
+        """
+        Keep only matching columns plus primary/foreign key columns of wide tables
+
+        Tables with fewer than COLUMN_INDEX_MIN_TABLE_COLUMNS columns, and wide tables without any
+        matching column, keep every column. Semantics are only modified once every table is pruned.
+        """
+        matches: Dict[str, set] = {}
+        for hit in column_hits:
+            matches.setdefault(hit["table_name"], set()).add(hit["column_name"])
+
+        total = 0
+        pruned: Dict[str, List[Dict]] = {}
+        for table_name, table in semantics.items():
+            columns = table.get("columns", [])
+            total += len(columns)
+            matched = matches.get(table_name)
+            if len(columns) < self.min_pruned_columns or not matched:
+                continue
+            wanted = matched | key_columns(table)
+            pruned[table_name] = [c for c in columns if c.get("column_name") in wanted]
+
+        for table_name, columns in pruned.items():
+            table = semantics[table_name]
+            table["omitted_column_count"] = len(table.get("columns", [])) - len(columns)
+            table["columns"] = columns
+        kept = sum(len(table.get("columns", [])) for table in semantics.values())
+        return {"columns_total": total, "columns_kept": kept, "column_hits": len(column_hits)}
     
     def _organize_results(self, results, top_k):
         relevant_tables = []
@@ -47,14 +230,7 @@ class QdrantService:
                 relevant_tables.append(table_name)
             all_tables.add(table_name)
             
-            semantics[table_name] = {
-                "table_name": table_name,
-                "description": result.get("table_description", result.get("description", "")),
-                "primary_key": result.get("primary_key", []),
-                "foreign_keys": result.get("foreign_keys", []),
-                "columns": result.get("columns_summary", result.get("columns", [])),
-                "indexes": result.get("indexes", [])
-            }
+            semantics[table_name] = self._table_semantics(result)
         
         #print("Semantics:", semantics)
         return {
@@ -62,4 +238,55 @@ class QdrantService:
             "all_tables": list(all_tables),
             "semantics": semantics
         }
-     
+
+    def _table_semantics(self, result: Dict) -> Dict[str, Any]:
+        return {
+            "table_name": result.get("table_name"),
+            "description": result.get("table_description", result.get("description", "")),
+            "primary_key": result.get("primary_key", []),
+            "foreign_keys": result.get("foreign_keys", []),
+            "columns": result.get("columns_summary", result.get("columns", [])),
+            "indexes": result.get("indexes", []),
+            "content_hash": result.get("content_hash", "")  # Schema rendering cache key
+        }
+
+
+# Long-lived services per (collection, reranking) so every request reuses the same
+# HybridRetrieval and its shared embedding models / network clients
+_service_registry: Dict[Tuple[str, bool], QdrantService] = {}
+_registry_lock = threading.Lock()
+
+
+def get_qdrant_service(collection_name: str = "semantics", use_reranking: bool = True) -> QdrantService:
+    """Return the shared QdrantService for a collection, rebuilding it when the index epoch moved on"""
+    return _service_for_epoch(collection_name, use_reranking, get_index_epochs().get(collection_name))
+
+
+async def aget_qdrant_service(collection_name: str = "semantics", use_reranking: bool = True) -> QdrantService:
+    """Async variant of get_qdrant_service: reads the index epoch without blocking the event loop"""
+    return _service_for_epoch(collection_name, use_reranking, await get_index_epochs().aget(collection_name))
+
+
+def _service_for_epoch(collection_name: str, use_reranking: bool, epoch: int) -> QdrantService:
+    key = (collection_name, use_reranking)
+    service = _service_registry.get(key)
+    if service is None or service.index_epoch != epoch:
+        with _registry_lock:
+            service = _service_registry.get(key)
+            if service is None or service.index_epoch != epoch:
+                service = QdrantService(collection_name=collection_name, use_reranking=use_reranking, index_epoch=epoch)
+                _service_registry[key] = service
+    return service
+
+
+def invalidate_qdrant_service(collection_name: Optional[str] = None):
+    """
+    Drop registered services so they are rebuilt on next use
+
+    Args:
+        collection_name: Collection that was re-indexed (None = all collections)
+    """
+    with _registry_lock:
+        for key in list(_service_registry):
+            if collection_name is None or key[0] == collection_name:
+                del _service_registry[key]
@@ -0,0 +1,202 @@
+"""
+Columnar query results
+Column names and types are stored once and rows as tuples of JSON-friendly values. Prompts
+receive a compact CSV rendering sized to a per-prompt token budget instead of the Python repr
+of a list of dicts, which repeated every column name on every row.
+"""
+
+import csv
+import datetime
+import decimal
+import io
+import os
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from convBI.token_budget import count_tokens
+
+# Default rendering budget (tokens) per prompt; override with RESULT_TOKEN_BUDGET_<PROMPT>
+DEFAULT_TOKEN_BUDGETS = {
+    "summarizer": 1500,
+    "visualization": 2000,
+    "followups": 600,
+}
+
+_NUMERIC_TYPES = {"int2", "int4", "int8", "float4", "float8", "numeric", "money", "oid"}
+_TEMPORAL_TYPES = {"date", "time", "timetz", "timestamp", "timestamptz", "interval"}
+
+
+def type_category(type_name: str) -> str:
+    """Coarse category of a PostgreSQL type name: number, temporal, boolean or text"""
+    if type_name in _NUMERIC_TYPES:
+        return "number"
+    if type_name in _TEMPORAL_TYPES:
+        return "temporal"
+    if type_name == "bool":
+        return "boolean"
+    return "text"
+
+
+def to_json_value(value: Any) -> Any:
+    """Convert a database value to something json.dumps and the prompts handle directly"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, decimal.Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return str(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<{len(value)} bytes>"
+    if isinstance(value, (list, tuple)):
+        return [to_json_value(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): to_json_value(v) for k, v in value.items()}
+    return str(value)
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return format(value, ".6g")
+    return str(value)
+
+
+def _csv_line(values: Sequence[Any]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="").writerow([_cell(v) for v in values])
+    return buffer.getvalue()
+
+
+def _sample_indices(total: int, keep: int) -> List[int]:
+    """First half of the budget from the top of the result, the rest spread over the remainder"""
+    if keep >= total:
+        return list(range(total))
+    if keep <= 0:
+        return []
+    head = (keep + 1) // 2
+    rest = keep - head
+    if rest == 0:
+        return list(range(head))
+    step = (total - head) / rest
+    return list(range(head)) + [min(head + int(i * step), total - 1) for i in range(rest)]
+
+
+@dataclass
+class QueryResult:
+    columns: List[str]
+    types: List[str]
+    rows: List[Tuple[Any, ...]] = field(default_factory=list)
+    # True when execution stopped at the row/byte cap; row_count is the full total if known
+    truncated: bool = False
+    row_count: Optional[int] = None
+
+    @classmethod
+    def from_rows(cls, columns: List[str], types: List[str], rows, truncated: bool = False, row_count: Optional[int] = None) -> "QueryResult":
+        return cls(
+            columns=list(columns),
+            types=list(types),
+            rows=[tuple(to_json_value(v) for v in row) for row in rows],
+            truncated=truncated,
+            row_count=row_count,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "columns": self.columns,
+            "types": self.types,
+            "rows": [list(row) for row in self.rows],
+            "truncated": self.truncated,
+            "row_count": self.row_count,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QueryResult":
+        return cls(
+            columns=list(data.get("columns", [])),
+            types=list(data.get("types", [])),
+            rows=[tuple(row) for row in data.get("rows", [])],
+            truncated=bool(data.get("truncated", False)),
+            row_count=data.get("row_count"),
+        )
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Rows as dicts (for callers that need the old shape)"""
+        return [dict(zip(self.columns, row)) for row in self.rows]
+
+    def _header(self, shown: int) -> List[str]:
+        lines = ["columns: " + ", ".join(f"{name} ({type_name})" for name, type_name in zip(self.columns, self.types))]
+        fetched = len(self.rows)
+        if self.truncated:
+            total = f"{self.row_count} rows in total" if self.row_count is not None else "more rows than were fetched"
+            lines.append(f"rows: {fetched} fetched (result truncated; {total})")
+        else:
+            lines.append(f"rows: {fetched}")
+        if shown < fetched:
+            lines.append(f"showing {shown} sampled rows: the first {(shown + 1) // 2}, then evenly spaced")
+        return lines
+
+    def render(self, max_tokens: int) -> str:
+        """Compact CSV with a short header, sampling rows so the text fits max_tokens"""
+        return self.render_sampled(max_tokens)[0]
+
+    def render_sampled(self, max_tokens: int) -> Tuple[str, int]:
+        """Like render, also returning how many rows made it into the text"""
+        if not self.columns:
+            return "", 0
+        lines = [_csv_line(row) for row in self.rows]
+        column_line = _csv_line(self.columns)
+
+        def build(keep: int) -> str:
+            indices = _sample_indices(len(lines), keep)
+            return "\n".join(self._header(len(indices)) + [column_line] + [lines[i] for i in indices])
+
+        text = build(len(lines))
+        tokens = count_tokens(text)
+        if tokens <= max_tokens or not lines:
+            return text, len(lines)
+
+        # Estimate the rows that fit from the average row cost, then shrink until it does
+        fixed = count_tokens(build(0))
+        per_row = max((tokens - fixed) / len(lines), 1e-6)
+        keep = max(int((max_tokens - fixed) / per_row), 1)
+        text = build(keep)
+        while keep > 1 and count_tokens(text) > max_tokens:
+            keep = max(int(keep * 0.9), 1)
+            text = build(keep)
+        return text, len(_sample_indices(len(lines), keep))
+
+
+def token_budget(prompt_name: str) -> int:
+    default = DEFAULT_TOKEN_BUDGETS.get(prompt_name, 1500)
+    return int(os.getenv(f"RESULT_TOKEN_BUDGET_{prompt_name.upper()}", default))
+
+
+def render_for_prompt(state, prompt_name: str) -> str:
+    """
+    Rendering of the state's query result sized to the prompt's token budget
+
+    Results that fit are sent in full. Larger ones are described by the result profile (when the
+    profile node produced one) followed by a row sample in whatever budget the profile leaves.
+    """
+    result = state.get("query_result")
+    if not result:
+        return ""
+    if not isinstance(result, QueryResult):
+        return str(result)
+    budget = token_budget(prompt_name)
+    text, shown = result.render_sampled(budget)
+    profile = state.get("result_profile")
+    if shown >= len(result.rows) or not profile:
+        return text
+
+    from convBI.result_profile import render_profile  # result_profile imports this module
+    summary = render_profile(profile)
+    # Keep at least a quarter of the budget for sample rows, even for very wide results
+    sample_budget = max(budget - count_tokens(summary) - 4, budget // 4)
+    return f"{summary}\n\nSample rows:\n{result.render(sample_budget)}"
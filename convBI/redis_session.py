@@ -4,6 +4,7 @@ Handles conversation history storage and retrieval using Redis
 """
 
 import redis
+import redis.asyncio as aioredis
 import json
 import os
 from typing import List, Dict, Any, Optional
@@ -11,38 +12,75 @@ from datetime import datetime
 from langchain_core.messages import HumanMessage, AIMessage, BaseMessage
 
 
+def _redis_pool_kwargs(decode_responses: bool = True, **overrides) -> Dict[str, Any]:
+    """Connection settings shared by the sync and async pools (overrides e.g. socket_timeout)"""
+    return {
+        "host": os.getenv('REDIS_HOST', 'localhost'),
+        "port": int(os.getenv('REDIS_PORT', 6379)),
+        "password": os.getenv('REDIS_PASSWORD', ''),
+        "db": int(os.getenv('REDIS_DB', 0)),
+        "max_connections": int(os.getenv('REDIS_MAX_CONNECTIONS', 50)),
+        "decode_responses": decode_responses,
+        **overrides
+    }
+
+
+def create_redis_pool(decode_responses: bool = True, **overrides) -> redis.ConnectionPool:
+    """Create a Redis connection pool from environment configuration"""
+    return redis.ConnectionPool(**_redis_pool_kwargs(decode_responses, **overrides))
+
+
+def create_async_redis_pool(decode_responses: bool = True, **overrides) -> aioredis.ConnectionPool:
+    """Create an asyncio Redis connection pool from environment configuration"""
+    return aioredis.ConnectionPool(**_redis_pool_kwargs(decode_responses, **overrides))
+
+
+def _conversation_key(thread_id: str) -> str:
+    return f"conversation:{thread_id}"
+
+
+def _build_message(role: str, content: str, sql_query: str = None) -> Dict[str, Any]:
+    message = {
+        "role": role,
+        "content": content,
+        "timestamp": datetime.now().isoformat()
+    }
+    if sql_query:
+        message["sql_query"] = sql_query
+    return message
+
+
 class RedisSessionService:
     """Simple Redis service for conversation session management"""
 
-    def __init__(self):
-        """Initialize Redis connection"""
-        self.redis_client = redis.Redis(
-            host=os.getenv('REDIS_HOST', 'localhost'),
-            port=int(os.getenv('REDIS_PORT', 6379)),
-            password=os.getenv('REDIS_PASSWORD', ''),
-            db=int(os.getenv('REDIS_DB', 0)),
-            decode_responses=True
-        )
+    def __init__(self, connection_pool: Optional[redis.ConnectionPool] = None):
+        """
+        Initialize Redis connection
+
+        Args:
+            connection_pool: Shared connection pool (if None, a new pool is created)
+        """
+        self.connection_pool = connection_pool or create_redis_pool()
+        self.redis_client = redis.Redis(connection_pool=self.connection_pool)
+
+    def close(self):
+        """Release all pooled connections"""
+        self.connection_pool.disconnect()
 
     def add_message(self, thread_id: str, role: str, content: str, sql_query: str = None):
         """Add message to conversation history"""
-        key = f"conversation:{thread_id}"
-        message = {
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now().isoformat()
-        }
-        if sql_query:
-            message["sql_query"] = sql_query
-
-        # Add to Redis list
-        self.redis_client.lpush(key, json.dumps(message))
-        # Set expiry to 24 hours (86400 seconds)
-        self.redis_client.expire(key, 86400)
+        key = _conversation_key(thread_id)
+        message = _build_message(role, content, sql_query)
+
+        # Add to Redis list and set expiry to 24 hours (86400 seconds) in one round-trip
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.lpush(key, json.dumps(message))
+        pipe.expire(key, 86400)
+        pipe.execute()
 
     def get_conversation_history(self, thread_id: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Get conversation history for thread (limited to recent messages)"""
-        key = f"conversation:{thread_id}"
+        key = _conversation_key(thread_id)
         try:
             # Get only the most recent messages (limit)
             messages = self.redis_client.lrange(key, 0, limit - 1)
@@ -70,6 +108,43 @@ class RedisSessionService:
             return 0
 
 
+class AsyncRedisSessionService:
+    """asyncio counterpart of RedisSessionService used by the async workflow path"""
+
+    def __init__(self, connection_pool: Optional[aioredis.ConnectionPool] = None):
+        """
+        Initialize asyncio Redis connection
+
+        Args:
+            connection_pool: Shared connection pool (if None, a new pool is created)
+        """
+        self.connection_pool = connection_pool or create_async_redis_pool()
+        self.redis_client = aioredis.Redis(connection_pool=self.connection_pool)
+
+    async def close(self):
+        """Release all pooled connections"""
+        await self.connection_pool.disconnect()
+
+    async def add_message(self, thread_id: str, role: str, content: str, sql_query: str = None):
+        """Add message to conversation history"""
+        key = _conversation_key(thread_id)
+        message = _build_message(role, content, sql_query)
+
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.lpush(key, json.dumps(message))
+        pipe.expire(key, 86400)
+        await pipe.execute()
+
+    async def get_conversation_history(self, thread_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get conversation history for thread (limited to recent messages)"""
+        key = _conversation_key(thread_id)
+        try:
+            messages = await self.redis_client.lrange(key, 0, limit - 1)
+            return [json.loads(msg) for msg in reversed(messages)]
+        except Exception as e:
+            return []
+
+
 def convert_redis_to_langchain_messages(redis_history: List[Dict[str, Any]]) -> List[BaseMessage]:
     """
     Convert Redis message format to LangChain message format
@@ -0,0 +1,258 @@
+"""
+TTL result cache for executed SQL
+Results are stored in Redis as zlib-compressed JSON, keyed by canonicalized SQL plus target
+database, and indexed by referenced table so they can be invalidated per table (re-indexing a
+collection invalidates the tables whose definitions changed).
+"""
+
+import os
+import re
+import json
+import zlib
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from convBI.redis_session import create_redis_pool, create_async_redis_pool
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "sqlresult"
+_IDENTIFIER = r'(?:"[^"]+"|[a-z_][\w$]*)'
+_TABLE_NAME = rf'{_IDENTIFIER}(?:\s*\.\s*{_IDENTIFIER})?'
+_TABLE_PATTERN = re.compile(rf'\b(?:from|join)\s+({_TABLE_NAME})')
+# Next entry of a comma-separated FROM list: optional alias of the previous table, comma, table
+_FROM_LIST_ITEM = re.compile(rf'\s*(?:(?:as\s+)?{_IDENTIFIER}\s*)?,\s*({_TABLE_NAME})')
+
+
+def canonicalize_sql(sql: str) -> str:
+    """
+    Normalize SQL text so trivially different spellings share a cache entry
+
+    Whitespace is collapsed and unquoted text is lower-cased (PostgreSQL folds unquoted
+    identifiers and keywords); string literals and quoted identifiers are kept verbatim.
+    """
+    parts = []
+    quote = None
+    pending_space = False
+    for char in sql.strip().rstrip(";").strip():
+        if quote:
+            parts.append(char)
+            if char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            if pending_space:
+                parts.append(" ")
+                pending_space = False
+            quote = char
+            parts.append(char)
+        elif char.isspace():
+            pending_space = bool(parts)
+        else:
+            if pending_space:
+                parts.append(" ")
+                pending_space = False
+            parts.append(char.lower())
+    return "".join(parts)
+
+
+def table_names(table: str) -> List[str]:
+    """Names a table is indexed and invalidated under: as written and bare (search path)"""
+    name = re.sub(r"\s+", "", table).replace('"', "").lower()
+    return sorted({name, name.split(".")[-1]})
+
+
+def extract_tables(canonical_sql: str) -> List[str]:
+    """Table names referenced in FROM (including comma-separated lists) and JOIN clauses"""
+    tables = set()
+    for match in _TABLE_PATTERN.finditer(canonical_sql):
+        tables.update(table_names(match.group(1)))
+        end = match.end()
+        while True:
+            item = _FROM_LIST_ITEM.match(canonical_sql, end)
+            if item is None:
+                break
+            tables.update(table_names(item.group(1)))
+            end = item.end()
+    return sorted(tables)
+
+
+def _table_index_key(table: str) -> str:
+    return f"{KEY_PREFIX}:table:{table.lower()}"
+
+
+def _table_index_keys(tables: List[str]) -> List[str]:
+    return sorted({_table_index_key(name) for table in tables for name in table_names(table)})
+
+
+def _encode(payload: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(payload, default=str, separators=(",", ":")).encode("utf-8"))
+
+
+def _decode(data: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+class SQLResultCache:
+    """
+    Redis-backed cache of query results
+
+    Args:
+        database_id: Identity of the target database (results are scoped to it)
+        default_ttl: Expiry in seconds when the collection has no specific TTL
+        ttl_by_collection: Per-collection expiry in seconds (0 disables caching)
+    """
+
+    def __init__(
+        self,
+        database_id: str,
+        default_ttl: int = 60,
+        ttl_by_collection: Optional[Dict[str, int]] = None,
+        redis_client=None,
+        async_redis_client=None
+    ):
+        import redis
+        import redis.asyncio as aioredis
+        self.database_id = database_id
+        self.default_ttl = default_ttl
+        self.ttl_by_collection = ttl_by_collection or {}
+        self.redis_client = redis_client or redis.Redis(connection_pool=create_redis_pool(decode_responses=False))
+        self.async_redis_client = async_redis_client or aioredis.Redis(connection_pool=create_async_redis_pool(decode_responses=False))
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "errors": 0}
+
+    def ttl_for(self, collection_name: str) -> int:
+        return int(self.ttl_by_collection.get(collection_name, self.default_ttl))
+
+    def make_key(self, sql: str) -> str:
+        digest = hashlib.sha256(f"{self.database_id}\n{canonicalize_sql(sql)}".encode("utf-8")).hexdigest()
+        return f"{KEY_PREFIX}:{digest}"
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _after_get(self, data: Optional[bytes]) -> Optional[Dict[str, Any]]:
+        if data is None:
+            self._count("misses")
+            return None
+        self._count("hits")
+        return _decode(data)
+
+    def get(self, sql: str, collection_name: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result payload or None"""
+        if self.ttl_for(collection_name) <= 0:
+            return None
+        try:
+            return self._after_get(self.redis_client.get(self.make_key(sql)))
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"SQL result cache read failed: {e}")
+            return None
+
+    async def aget(self, sql: str, collection_name: str) -> Optional[Dict[str, Any]]:
+        if self.ttl_for(collection_name) <= 0:
+            return None
+        try:
+            return self._after_get(await self.async_redis_client.get(self.make_key(sql)))
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"SQL result cache read failed: {e}")
+            return None
+
+    def _write(self, pipe, sql: str, ttl: int, payload: Dict[str, Any]):
+        key = self.make_key(sql)
+        pipe.set(key, _encode(payload), ex=ttl)
+        for table in extract_tables(canonicalize_sql(sql)):
+            # The table index outlives the entries it points to by one TTL at most
+            pipe.sadd(_table_index_key(table), key)
+            pipe.expire(_table_index_key(table), ttl)
+
+    def set(self, sql: str, collection_name: str, payload: Dict[str, Any]):
+        """Store a result payload for the collection's TTL"""
+        ttl = self.ttl_for(collection_name)
+        if ttl <= 0:
+            return
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            self._write(pipe, sql, ttl, payload)
+            pipe.execute()
+            self._count("stores")
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"SQL result cache write failed: {e}")
+
+    async def aset(self, sql: str, collection_name: str, payload: Dict[str, Any]):
+        ttl = self.ttl_for(collection_name)
+        if ttl <= 0:
+            return
+        try:
+            pipe = self.async_redis_client.pipeline(transaction=False)
+            self._write(pipe, sql, ttl, payload)
+            await pipe.execute()
+            self._count("stores")
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"SQL result cache write failed: {e}")
+
+    def invalidate_tables(self, tables: List[str]) -> int:
+        """
+        Delete every cached result that references any of the tables; returns the number removed
+
+        Schema-qualified names also drop results that reference the bare table name, since SQL
+        may rely on the search path.
+        """
+        index_keys = _table_index_keys(tables)
+        if not index_keys:
+            return 0
+        pipe = self.redis_client.pipeline(transaction=False)
+        for index_key in index_keys:
+            pipe.smembers(index_key)
+        keys = set().union(*pipe.execute())
+        removed = self.redis_client.delete(*keys) if keys else 0
+        self.redis_client.delete(*index_keys)
+        return removed
+
+    async def ainvalidate_table(self, table: str) -> int:
+        """Async variant of invalidate_tables for one table (bare or schema-qualified)"""
+        index_keys = _table_index_keys([table])
+        pipe = self.async_redis_client.pipeline(transaction=False)
+        for index_key in index_keys:
+            pipe.smembers(index_key)
+        keys = set().union(*await pipe.execute())
+        removed = await self.async_redis_client.delete(*keys) if keys else 0
+        await self.async_redis_client.delete(*index_keys)
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["default_ttl"] = self.default_ttl
+        stats["ttl_by_collection"] = self.ttl_by_collection
+        return stats
+
+
+_cache: Optional[SQLResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def is_result_cache_enabled() -> bool:
+    return os.getenv("SQL_RESULT_CACHE_ENABLED", "false").lower() == "true"
+
+
+def get_result_cache() -> SQLResultCache:
+    """Return the process-wide SQL result cache configured from the environment"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                from services.postgres.pool import get_database_identity
+                _cache = SQLResultCache(
+                    database_id=get_database_identity(),
+                    default_ttl=int(os.getenv("SQL_RESULT_CACHE_TTL", 60)),
+                    ttl_by_collection=json.loads(os.getenv("SQL_RESULT_CACHE_TTL_BY_COLLECTION", "{}") or "{}")
+                )
+    return _cache
@@ -0,0 +1,228 @@
+"""
+Vectorized query result profiling
+Per-column statistics computed with NumPy (null ratio, min/max/mean/quantiles, cardinality,
+top values, time range) plus simple trend and outlier flags. For results too large to send in
+full, prompts receive this profile and a small row sample instead of the raw rows.
+"""
+
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from convBI.query_result import QueryResult, type_category
+
+_TIME_UNITS = [
+    # (label, upper bound of the median step in days)
+    ("hour", 0.5),
+    ("day", 3.5),
+    ("week", 10),
+    ("month", 45),
+    ("quarter", 135),
+    ("year", float("inf")),
+]
+
+
+def _round(value: float, digits: int = 4) -> Optional[float]:
+    if value is None or not np.isfinite(value):
+        return None
+    return float(round(value, digits))
+
+
+def _column_arrays(result: QueryResult) -> List[np.ndarray]:
+    """One object array per column, built in a single pass over the rows"""
+    rows, width = result.rows, len(result.columns)
+    matrix = np.empty((len(rows), width), dtype=object)
+    if not rows:
+        return list(matrix.T)
+    try:
+        matrix[:] = rows
+        return list(matrix.T)
+    except ValueError:
+        # List/dict cells make the rows look nested to NumPy; fill column by column instead
+        return [np.fromiter(column, dtype=object, count=len(rows)) for column in zip(*rows)]
+
+
+def _infer_category(values: np.ndarray) -> str:
+    """Category for columns whose database type is unknown, from the first non-null value"""
+    for value in values[:1]:
+        if isinstance(value, bool):
+            return "boolean"
+        if isinstance(value, (int, float)):
+            return "number"
+        if isinstance(value, (list, dict)):
+            return "json"
+    return "text"
+
+
+def _to_datetime64(values: np.ndarray) -> Optional[np.ndarray]:
+    """Parse ISO date/timestamp strings; fractions and timezone offsets are dropped"""
+    if values.size == 0:
+        return None
+    try:
+        if all(len(values[i]) <= 19 for i in (0, -1)):
+            return values.astype("datetime64[s]")
+        return np.array([value[:19] for value in values], dtype="datetime64[s]")
+    except (TypeError, ValueError):
+        return None
+
+
+def _numeric_stats(values: np.ndarray) -> Dict[str, Any]:
+    data = values.astype(np.float64)
+    if data.size == 0:
+        return {"distinct": 0}
+    q1, median, q3 = np.percentile(data, [25, 50, 75])
+    iqr = q3 - q1
+    outliers = int(np.count_nonzero((data < q1 - 1.5 * iqr) | (data > q3 + 1.5 * iqr))) if iqr > 0 else 0
+    return {
+        "distinct": int(np.unique(data).size),
+        "min": _round(data.min()),
+        "max": _round(data.max()),
+        "mean": _round(data.mean()),
+        "std": _round(data.std()),
+        "p25": _round(q1),
+        "median": _round(median),
+        "p75": _round(q3),
+        "sum": _round(data.sum()),
+        "outliers": outliers,
+    }
+
+
+def _temporal_stats(times: np.ndarray) -> Dict[str, Any]:
+    unique = np.unique(times)
+    start, end = unique[0], unique[-1]
+    stats = {
+        "distinct": int(unique.size),
+        "start": str(start),
+        "end": str(end),
+        "span_days": _round((end - start) / np.timedelta64(1, "D"), 2),
+        "sorted": bool(np.all(times[1:] >= times[:-1])),
+    }
+    if unique.size > 1:
+        step = float(np.median(np.diff(unique) / np.timedelta64(1, "D")))
+        stats["granularity"] = next(label for label, bound in _TIME_UNITS if step <= bound)
+    return stats
+
+
+def _categorical_stats(values: np.ndarray, top_k: int) -> Dict[str, Any]:
+    counts = Counter(values.tolist())
+    total = len(values) or 1
+    return {
+        "distinct": len(counts),
+        "top_values": [
+            {"value": value, "count": count, "share": _round(count / total, 3)}
+            for value, count in counts.most_common(top_k)
+        ],
+    }
+
+
+def _column_profile(name: str, type_name: str, column: np.ndarray, top_k: int, parsed_times: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    null_mask = np.equal(column, None)
+    present = column[~null_mask]
+    category = _infer_category(present) if type_name == "unknown" else type_category(type_name)
+    profile = {
+        "name": name,
+        "type": type_name,
+        "category": category,
+        "null_ratio": _round(float(null_mask.mean()) if column.size else 0.0, 3),
+    }
+
+    if category == "number":
+        try:
+            profile.update(_numeric_stats(present))
+            return profile
+        except (TypeError, ValueError):
+            category = "text"
+    elif category == "temporal":
+        times = _to_datetime64(present)
+        if times is not None:
+            parsed_times[name] = times
+            profile.update(_temporal_stats(times))
+            return profile
+        category = "text"
+    elif category == "boolean":
+        profile["distinct"] = len(set(present.tolist()))
+        profile["true_ratio"] = _round(float(np.mean(present.astype(bool))) if present.size else 0.0, 3)
+        return profile
+
+    if category != "json":
+        try:
+            profile["category"] = category
+            profile.update(_categorical_stats(present, top_k))
+            return profile
+        except TypeError:
+            pass
+    # Unhashable cells (arrays, JSON objects): cardinality only
+    profile["category"] = "json"
+    profile["distinct"] = len(set(map(repr, present.tolist())))
+    return profile
+
+
+def _trends(columns: List[np.ndarray], profiles: List[Dict[str, Any]], time_index: int, times: np.ndarray) -> Dict[str, Any]:
+    """Direction of each numeric column over the time column (least-squares slope)"""
+    if times.size < 3:
+        return {}
+    valid_time = ~np.equal(columns[time_index], None)
+    x = (times - times.min()) / np.timedelta64(1, "D")
+    order = np.argsort(x, kind="stable")
+    x = x[order]
+    trends = {}
+    for index, profile in enumerate(profiles):
+        if profile["category"] != "number":
+            continue
+        y = columns[index][valid_time][order]
+        present = ~np.equal(y, None)
+        if present.sum() < 3:
+            continue
+        xs, ys = x[present], y[present].astype(np.float64)
+        if np.ptp(xs) == 0:
+            continue
+        slope = np.polyfit(xs, ys, 1)[0]
+        scale = np.abs(ys).mean() or 1.0
+        change_ratio = slope * np.ptp(xs) / scale
+        direction = "flat" if abs(change_ratio) < 0.05 else ("increasing" if change_ratio > 0 else "decreasing")
+        trends[profile["name"]] = {
+            "direction": direction,
+            "first": _round(ys[0]),
+            "last": _round(ys[-1]),
+            "fitted_change_pct": _round(change_ratio * 100, 1),
+        }
+    return trends
+
+
+def profile_result(result: QueryResult, top_k: int = 5) -> Dict[str, Any]:
+    """Profile a columnar query result; cost is a few vectorized passes per column"""
+    columns = _column_arrays(result)
+    parsed_times: Dict[str, np.ndarray] = {}
+    profiles = [
+        _column_profile(name, type_name, columns[index], top_k, parsed_times)
+        for index, (name, type_name) in enumerate(zip(result.columns, result.types))
+    ]
+    time_index = next((i for i, p in enumerate(profiles) if p["name"] in parsed_times), None)
+    time_column = profiles[time_index]["name"] if time_index is not None else None
+    return {
+        "row_count": len(result.rows),
+        "truncated": result.truncated,
+        "total_rows": result.row_count,
+        "columns": profiles,
+        "time_column": time_column,
+        "trends": _trends(columns, profiles, time_index, parsed_times[time_column]) if time_column else {},
+    }
+
+
+def render_profile(profile: Dict[str, Any]) -> str:
+    """Compact text form of a profile for prompts"""
+    lines = [f"Result profile ({profile['row_count']} rows{', truncated' if profile.get('truncated') else ''}):"]
+    skip = {"name", "type", "category", "top_values"}
+    for column in profile["columns"]:
+        details = ", ".join(f"{key}={value}" for key, value in column.items() if key not in skip and value is not None)
+        top = column.get("top_values")
+        if top:
+            details += "; top: " + ", ".join(f"{item['value']} ({item['count']})" for item in top)
+        lines.append(f"- {column['name']} [{column['type']}] {details}")
+    for name, trend in profile.get("trends", {}).items():
+        lines.append(
+            f"- trend of {name} over {profile['time_column']}: {trend['direction']} "
+            f"({trend['first']} -> {trend['last']}, fitted change {trend['fitted_change_pct']}%)"
+        )
+    return "\n".join(lines)
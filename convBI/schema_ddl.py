@@ -0,0 +1,183 @@
+"""
+Compact schema serialization for prompts
+Renders retrieved table definitions as annotated CREATE TABLE-style text instead of the Python
+dict repr: one line per column with its type, key markers, foreign key arrows and the
+description and known values as an inline comment. Rendered tables are cached by the index
+content hash of their definition plus the columns and sections kept, so a table is rendered once
+per version and pruning rather than on every request.
+
+    -- Stores user account information
+    CREATE TABLE users (
+      user_id uuid PRIMARY KEY,  -- Unique identifier for each user
+      organization_id uuid -> organizations.org_id,  -- Organization the user belongs to
+      status varchar(20),  -- Account status; unique_values: 'active', 'inactive'
+      -- 12 more columns not shown
+    );
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from services.join_graph import column_names
+
+# Column keys rendered explicitly; any other key is appended to the column comment
+_COLUMN_KEYS = {"column_name", "data_type", "description"}
+_VALUE_KEYS = ("unique_values", "sample_values", "enum_values")
+# Table keys rendered explicitly or not meant for the prompt
+_TABLE_KEYS = {
+    "table_name", "description", "primary_key", "foreign_keys", "columns", "indexes", "omitted_column_count", "content_hash"
+}
+
+MAX_RENDERED_VALUES = 20
+_CACHE_SIZE = 1024
+
+_cache: "OrderedDict[tuple, str]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _one_line(text: Any) -> str:
+    return " ".join(str(text).split())
+
+
+def _values(values: Any) -> str:
+    if not isinstance(values, (list, tuple)):
+        return _one_line(values)
+    shown = ", ".join(f"'{v}'" if isinstance(v, str) else _one_line(v) for v in values[:MAX_RENDERED_VALUES])
+    if len(values) > MAX_RENDERED_VALUES:
+        shown += f", ... ({len(values)} total)"
+    return shown
+
+
+def _reference(references: Any) -> str:
+    if isinstance(references, dict):
+        table = ".".join(str(part) for part in (references.get("schema"), references.get("table")) if part)
+        return f"{table}.{', '.join(column_names(references.get('column')))}" if references.get("column") else table
+    return _one_line(references)
+
+
+def _column_line(column: Dict[str, Any], primary_key: List[str], fk_arrows: Dict[str, str]) -> str:
+    name = column.get("column_name", "")
+    line = f"  {name}"
+    if column.get("data_type"):
+        line += f" {column['data_type']}"
+    if primary_key == [name]:
+        line += " PRIMARY KEY"
+    if name in fk_arrows:
+        line += f" -> {fk_arrows[name]}"
+    line += ","
+
+    notes = []
+    if column.get("description"):
+        notes.append(_one_line(column["description"]))
+    for key in _VALUE_KEYS:
+        if column.get(key):
+            notes.append(f"{key}: {_values(column[key])}")
+    for key, value in column.items():
+        if key not in _COLUMN_KEYS and key not in _VALUE_KEYS and value not in (None, "", [], {}):
+            notes.append(f"{key}: {_values(value)}")
+    if notes:
+        line += f"  -- {'; '.join(notes)}"
+    return line
+
+
+def _render_table(table_name: str, table: Dict[str, Any]) -> str:
+    lines = []
+    if table.get("description"):
+        lines.append(f"-- {_one_line(table['description'])}")
+    for key, value in table.items():
+        if key not in _TABLE_KEYS and value not in (None, "", [], {}):
+            lines.append(f"-- {key}: {_values(value)}")
+    lines.append(f"CREATE TABLE {table_name} (")
+
+    primary_key = column_names(table.get("primary_key"))
+    fk_arrows: Dict[str, str] = {}
+    composite_fks = []
+    for fk in table.get("foreign_keys", []) or []:
+        if not isinstance(fk, dict):
+            continue
+        columns = column_names(fk.get("column"))
+        if len(columns) == 1:
+            fk_arrows[columns[0]] = _reference(fk.get("references"))
+        elif columns:
+            composite_fks.append(f"  FOREIGN KEY ({', '.join(columns)}) -> {_reference(fk.get('references'))},")
+
+    lines.extend(_column_line(column, primary_key, fk_arrows) for column in table.get("columns", []) or [])
+    if table.get("omitted_column_count"):
+        lines.append(f"  -- {table['omitted_column_count']} more columns not shown")
+    if len(primary_key) > 1:
+        lines.append(f"  PRIMARY KEY ({', '.join(primary_key)}),")
+    lines.extend(composite_fks)
+    lines.append(");")
+
+    indexes = [
+        f"{index.get('index_type') + ' ' if index.get('index_type') not in (None, '', 'btree') else ''}({', '.join(column_names(index.get('columns')))})"
+        for index in table.get("indexes", []) or []
+        if isinstance(index, dict) and index.get("columns")
+    ]
+    if indexes:
+        lines.append(f"-- indexes: {', '.join(indexes)}")
+    return "\n".join(lines)
+
+
+def _cache_key(table_name: str, table: Dict[str, Any]) -> Optional[tuple]:
+    """The stored content hash identifies the definition; pruning only removes columns and indexes"""
+    if not table.get("content_hash"):
+        return None
+    columns = tuple(column.get("column_name") for column in table.get("columns", []) or [])
+    return table_name, table["content_hash"], columns, bool(table.get("indexes")), table.get("omitted_column_count")
+
+
+def render_table(table_name: str, table: Dict[str, Any], cache: bool = True) -> str:
+    """
+    CREATE TABLE-style text for one table definition
+
+    Cached when the definition carries its index content_hash and cache is True; pass False for
+    one-off renderings (e.g. pruning candidates) so they do not evict the ones reused per request.
+    """
+    key = _cache_key(table_name, table) if cache else None
+    if key is None:
+        return _render_table(table_name, table)
+    with _cache_lock:
+        text = _cache.get(key)
+        if text is not None:
+            _cache.move_to_end(key)
+            return text
+    text = _render_table(table_name, table)
+    with _cache_lock:
+        _cache[key] = text
+        if len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return text
+
+
+def render_schema(semantics: Dict[str, Dict], cache: bool = True) -> str:
+    """CREATE TABLE-style text for semantics (table name -> table definition)"""
+    return "\n\n".join(render_table(table_name, table, cache) for table_name, table in (semantics or {}).items())
+
+
+def render_join_paths(join_paths: List[Dict[str, Any]]) -> str:
+    """One join condition per line, or "none" when the tables need no (known) joins"""
+    if not join_paths:
+        return "none"
+    return "\n".join(f"- {join['condition']}" for join in join_paths)
+
+
+def is_compact_schema_enabled() -> bool:
+    return os.getenv("COMPACT_SCHEMA_ENABLED", "true").lower() == "true"
+
+
+def prompt_semantics(semantics: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Semantics without the bookkeeping keys (content_hash) that only cost prompt tokens"""
+    return {
+        table_name: {key: value for key, value in table.items() if key != "content_hash"}
+        for table_name, table in (semantics or {}).items()
+    }
+
+
+def format_semantic_info(semantics: Dict[str, Dict], cache: bool = True) -> str:
+    """Schema text for the prompts: compact DDL, or the dict repr when COMPACT_SCHEMA_ENABLED=false"""
+    if is_compact_schema_enabled():
+        return render_schema(semantics, cache)
+    return str(prompt_semantics(semantics))
@@ -0,0 +1,164 @@
+"""
+Token-budgeted schema pruning
+Ranks the retrieved tables' columns by lexical relevance to the question and keeps as many as
+fit the schema token budget, always keeping primary and foreign key columns. The budget is
+measured on the same rendering the prompts receive, with the real tokenizer when available.
+"""
+
+import os
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from convBI.token_budget import count_tokens
+from services.join_graph import column_names
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from", "get", "give",
+    "how", "i", "id", "in", "is", "it", "list", "me", "many", "much", "of", "on", "or", "per", "show",
+    "tell", "that", "the", "their", "there", "this", "to", "was", "we", "were", "what", "when", "where",
+    "which", "who", "with", "all", "each", "our", "my", "top",
+}
+_CAMEL_BOUNDARY = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _stem(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: Any) -> Set[str]:
+    """Lower-cased, lightly stemmed word set; identifiers are split on case and underscores"""
+    text = _CAMEL_BOUNDARY.sub(" ", str(text or ""))
+    return {_stem(word) for word in _WORD.findall(text.lower()) if word not in _STOPWORDS}
+
+
+def key_columns(table: Dict[str, Any]) -> Set[str]:
+    """Primary key and foreign key column names of a table (composite keys flattened)"""
+    keys = set(column_names(table.get("primary_key")))
+    for fk in table.get("foreign_keys", []) or []:
+        if isinstance(fk, dict):
+            keys.update(column_names(fk.get("column")))
+    return keys
+
+
+def _column_score(column: Dict[str, Any], question_tokens: Set[str]) -> int:
+    name_tokens = tokenize(column.get("column_name", ""))
+    score = 3 * len(question_tokens & name_tokens) + len(question_tokens & tokenize(column.get("description", "")))
+    values = column.get("unique_values") or column.get("sample_values") or column.get("enum_values")
+    if values:
+        score += 2 * len(question_tokens & tokenize(" ".join(map(str, values))))
+    return score
+
+
+def _build(semantics: Dict[str, Dict], keep: Dict[str, Set[int]], drop_indexes: bool) -> Dict[str, Dict]:
+    pruned = {}
+    for table_name, kept in keep.items():
+        table = semantics[table_name]
+        columns = table.get("columns", [])
+        new_table = {key: value for key, value in table.items() if key != "columns" and not (drop_indexes and key == "indexes")}
+        new_table["columns"] = [column for i, column in enumerate(columns) if i in kept]
+        omitted = len(columns) - len(new_table["columns"])
+        if omitted:
+            new_table["omitted_column_count"] = table.get("omitted_column_count", 0) + omitted
+        pruned[table_name] = new_table
+    return pruned
+
+
+def prune_schema(
+    semantics: Dict[str, Dict],
+    question: str,
+    max_tokens: int,
+    render: Callable[[Dict[str, Dict]], str] = str,
+    pinned: Iterable[str] = ()
+) -> Tuple[Dict[str, Dict], Dict[str, Any]]:
+    """
+    Fit semantics (table name -> table definition, in retrieval order) into max_tokens
+
+    Steps, stopping as soon as the rendering fits: drop index definitions, drop the columns least
+    related to the question (never key columns), drop the lowest-ranked table (never the first
+    nor a pinned one, such as a join bridge) and refit the columns of the remaining tables.
+    Returns the pruned semantics and a report with token and column counts.
+    """
+    tokens_before = count_tokens(render(semantics))
+    columns_before = sum(len(table.get("columns", [])) for table in semantics.values())
+    report = {
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_before,
+        "tokens_saved": 0,
+        "columns_before": columns_before,
+        "columns_after": columns_before,
+        "tables_dropped": [],
+        "budget": max_tokens,
+    }
+    if tokens_before <= max_tokens or not semantics:
+        return semantics, report
+
+    question_tokens = tokenize(question)
+    tables = list(semantics)
+    mandatory: Dict[str, Set[int]] = {}
+    optional: List[Tuple[int, int, int, str]] = []  # (-score, table rank, column position, table)
+    for rank, table_name in enumerate(tables):
+        table = semantics[table_name]
+        keys = key_columns(table)
+        mandatory[table_name] = set()
+        for position, column in enumerate(table.get("columns", [])):
+            if column.get("column_name") in keys:
+                mandatory[table_name].add(position)
+            else:
+                optional.append((-_column_score(column, question_tokens), rank, position, table_name))
+    optional.sort()
+
+    def build(count: int, table_names: List[str]) -> Dict[str, Dict]:
+        keep = {name: set(mandatory[name]) for name in table_names}
+        for _, _, position, table_name in optional[:count]:
+            if table_name in keep:
+                keep[table_name].add(position)
+        return _build(semantics, keep, drop_indexes=True)
+
+    def fits(candidate: Dict[str, Dict]) -> Tuple[bool, int]:
+        tokens = count_tokens(render(candidate))
+        return tokens <= max_tokens, tokens
+
+    def fit_columns(table_names: List[str]) -> Tuple[Dict[str, Dict], bool, int]:
+        # Largest number of optional columns that fits (the rendering grows with every column)
+        candidate = build(len(optional), table_names)
+        ok, tokens = fits(candidate)
+        if not ok:
+            low, high = 0, len(optional)
+            while low < high:
+                middle = (low + high + 1) // 2
+                if fits(build(middle, table_names))[0]:
+                    low = middle
+                else:
+                    high = middle - 1
+            candidate = build(low, table_names)
+            ok, tokens = fits(candidate)
+        return candidate, ok, tokens
+
+    pruned, ok, tokens = fit_columns(tables)
+
+    # Key columns alone still too large: drop the lowest-ranked table and refit the columns
+    pinned = set(pinned)
+    while not ok:
+        droppable = [name for name in tables[1:] if name not in pinned]
+        if not droppable:
+            break
+        tables.remove(droppable[-1])
+        report["tables_dropped"].append(droppable[-1])
+        pruned, ok, tokens = fit_columns(tables)
+
+    report["tokens_after"] = tokens
+    report["tokens_saved"] = tokens_before - tokens
+    report["columns_after"] = sum(len(table.get("columns", [])) for table in pruned.values())
+    return pruned, report
+
+
+def schema_token_budget() -> Optional[int]:
+    """Token budget of the schema in the text-to-SQL prompt, or None when pruning is disabled"""
+    if os.getenv("SCHEMA_PRUNING_ENABLED", "true").lower() != "true":
+        return None
+    return int(os.getenv("SCHEMA_TOKEN_BUDGET", 4000))
@@ -0,0 +1,169 @@
+"""
+Speculative retrieval
+Starts the Qdrant hybrid search + rerank for a question while intent classification is still
+running. Most traffic is classified as system_query, so by the time populate_qdrant_data runs the
+semantic data is usually ready. For general/help questions the speculation is discarded.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, NamedTuple, Optional, Tuple, Union
+
+from convBI.qdrant_service import get_qdrant_service, aget_qdrant_service
+
+
+class _Speculation(NamedTuple):
+    handle: Union[Future, "asyncio.Task"]
+    started: float
+
+
+def _elapsed_ms(since: float) -> float:
+    return round((time.perf_counter() - since) * 1000, 2)
+
+
+class SpeculativeRetrieval:
+    """
+    Tracks in-flight speculative retrievals keyed by request id
+
+    Sync requests run the retrieval on a small thread pool, async requests as an asyncio task on
+    the request's event loop. Every speculation is either taken by populate_qdrant_data or
+    discarded; both return metrics for the request.
+
+    Args:
+        max_workers: Threads available to sync speculative retrievals
+    """
+
+    def __init__(self, max_workers: int = 8):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="speculative-retrieval")
+        self._pending: Dict[str, _Speculation] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _retrieve(collection_name: str, question: str) -> Tuple[Dict[str, Any], float]:
+        started = time.perf_counter()
+        semantic_data = get_qdrant_service(collection_name=collection_name).get_all_semantic_data(question)
+        return semantic_data, _elapsed_ms(started)
+
+    @staticmethod
+    async def _aretrieve(collection_name: str, question: str) -> Tuple[Dict[str, Any], float]:
+        started = time.perf_counter()
+        qdrant_service = await aget_qdrant_service(collection_name=collection_name)
+        semantic_data = await qdrant_service.aget_all_semantic_data(question)
+        return semantic_data, _elapsed_ms(started)
+
+    def _register(self, request_id: str, handle) -> None:
+        with self._lock:
+            previous = self._pending.pop(request_id, None)
+            self._pending[request_id] = _Speculation(handle, time.perf_counter())
+        if previous is not None:
+            previous.handle.cancel()
+
+    def _pop(self, request_id: str) -> Optional[_Speculation]:
+        with self._lock:
+            return self._pending.pop(request_id, None)
+
+    def start(self, request_id: str, collection_name: str, question: str) -> None:
+        """Start retrieval for a sync request"""
+        self._register(request_id, self._executor.submit(self._retrieve, collection_name, question))
+
+    def astart(self, request_id: str, collection_name: str, question: str) -> None:
+        """Start retrieval for an async request (must be called from the running event loop)"""
+        self._register(request_id, asyncio.create_task(self._aretrieve(collection_name, question)))
+
+    @staticmethod
+    def _used_metrics(retrieval_ms: float, waited_ms: float) -> Dict[str, Any]:
+        return {
+            "used": True,
+            "retrieval_ms": retrieval_ms,
+            "waited_ms": waited_ms,
+            # Retrieval time hidden behind intent classification
+            "time_saved_ms": round(max(retrieval_ms - waited_ms, 0.0), 2),
+        }
+
+    def take(self, request_id: str) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Wait for the speculative retrieval of a sync request
+
+        Returns:
+            (semantic_data, metrics); semantic_data is None when there was no speculation or it
+            failed, in which case the caller retrieves as usual.
+        """
+        speculation = self._pop(request_id)
+        if speculation is None:
+            return None, {}
+        wait_started = time.perf_counter()
+        try:
+            semantic_data, retrieval_ms = speculation.handle.result()
+        except Exception as e:
+            return None, {"used": False, "error": str(e)}
+        return semantic_data, self._used_metrics(retrieval_ms, _elapsed_ms(wait_started))
+
+    async def atake(self, request_id: str) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        """Async variant of take"""
+        speculation = self._pop(request_id)
+        if speculation is None:
+            return None, {}
+        wait_started = time.perf_counter()
+        try:
+            semantic_data, retrieval_ms = await speculation.handle
+        except Exception as e:
+            return None, {"used": False, "error": str(e)}
+        return semantic_data, self._used_metrics(retrieval_ms, _elapsed_ms(wait_started))
+
+    def discard(self, request_id: str) -> Dict[str, Any]:
+        """
+        Drop the speculation of a request that does not need retrieval
+
+        Pending work is cancelled; a retrieval already running on a thread finishes in the
+        background and its result is ignored. wasted_ms is the retrieval time spent so far.
+        """
+        speculation = self._pop(request_id)
+        if speculation is None:
+            return {}
+        handle = speculation.handle
+        wasted_ms = _elapsed_ms(speculation.started)
+        if handle.done() and not handle.cancelled():
+            if handle.exception() is None:
+                wasted_ms = min(wasted_ms, handle.result()[1])
+            cancelled = False
+        else:
+            cancelled = handle.cancel()
+            if cancelled and isinstance(handle, Future):
+                # Never started on the pool, so nothing was spent
+                wasted_ms = 0.0
+        return {"used": False, "cancelled": cancelled, "wasted_ms": wasted_ms}
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def close(self) -> None:
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for speculation in pending:
+            speculation.handle.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_speculative: Optional[SpeculativeRetrieval] = None
+_speculative_lock = threading.Lock()
+
+
+def is_speculative_retrieval_enabled() -> bool:
+    return os.getenv("SPECULATIVE_RETRIEVAL", "false").lower() == "true"
+
+
+def get_speculative_retrieval() -> SpeculativeRetrieval:
+    """Return the process-wide speculative retrieval tracker configured from the environment"""
+    global _speculative
+    if _speculative is None:
+        with _speculative_lock:
+            if _speculative is None:
+                _speculative = SpeculativeRetrieval(
+                    max_workers=int(os.getenv("SPECULATIVE_RETRIEVAL_WORKERS", 8))
+                )
+    return _speculative
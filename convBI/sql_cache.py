@@ -0,0 +1,143 @@
+"""
+Semantic question-to-SQL cache
+Stores (question embedding, SQL) pairs of successfully executed queries per collection and
+returns the stored SQL for new questions whose embedding is similar enough. Entries belong to
+the collection's index epoch (convBI.index_epoch) they were stored in and are dropped once it
+changes.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from services.embedding_cache import normalize_text
+
+
+class _CollectionEntries:
+    """Entries for one collection and index epoch plus a lazily rebuilt matrix for vectorized lookup"""
+
+    def __init__(self, epoch: int = 0):
+        self.epoch = epoch
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.matrix: Optional[np.ndarray] = None
+        self.keys: List[str] = []
+
+    def rebuild(self):
+        self.keys = list(self.entries)
+        self.matrix = np.vstack([self.entries[k]["vector"] for k in self.keys]) if self.keys else None
+
+
+class SemanticSQLCache:
+    """
+    Per-collection cache of successful question -> SQL pairs
+
+    Args:
+        threshold: Minimum cosine similarity for a cached SQL to be reused
+        max_entries: Maximum entries kept per collection (least recently used are evicted)
+    """
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 500):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._collections: Dict[str, _CollectionEntries] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _current(self, collection_name: str, epoch: int) -> Optional[_CollectionEntries]:
+        """Entries of the collection, dropping them if they belong to another index epoch"""
+        collection = self._collections.get(collection_name)
+        if collection is not None and collection.epoch != epoch:
+            del self._collections[collection_name]
+            return None
+        return collection
+
+    def lookup(self, collection_name: str, vector, epoch: int = 0) -> Optional[Dict[str, Any]]:
+        """Return the most similar cached entry of the index epoch above the threshold, or None"""
+        query = self._normalize(vector)
+        with self._lock:
+            collection = self._current(collection_name, epoch)
+            if collection is not None and collection.entries:
+                if collection.matrix is None:
+                    collection.rebuild()
+                similarities = collection.matrix @ query
+                best = int(np.argmax(similarities))
+                similarity = float(similarities[best])
+                if similarity >= self.threshold:
+                    key = collection.keys[best]
+                    entry = collection.entries[key]
+                    collection.entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return {"question": entry["question"], "sql": entry["sql"], "similarity": similarity}
+            self._stats["misses"] += 1
+            return None
+
+    def store(self, collection_name: str, question: str, vector, sql: str, epoch: int = 0):
+        """Store the SQL that successfully answered a question against the index epoch"""
+        key = normalize_text(question)
+        with self._lock:
+            collection = self._current(collection_name, epoch)
+            if collection is None:
+                collection = self._collections[collection_name] = _CollectionEntries(epoch)
+            collection.entries[key] = {"question": question, "sql": sql, "vector": self._normalize(vector)}
+            collection.entries.move_to_end(key)
+            while len(collection.entries) > self.max_entries:
+                collection.entries.popitem(last=False)
+                self._stats["evictions"] += 1
+            collection.matrix = None
+            self._stats["stores"] += 1
+
+    def invalidate(self, collection_name: Optional[str] = None, question: Optional[str] = None):
+        """
+        Drop cached entries
+
+        Args:
+            collection_name: Collection to clear (None = all collections)
+            question: Only drop the entry stored for this question
+        """
+        with self._lock:
+            if collection_name is None:
+                self._collections.clear()
+                return
+            if question is None:
+                self._collections.pop(collection_name, None)
+                return
+            collection = self._collections.get(collection_name)
+            if collection is not None and collection.entries.pop(normalize_text(question), None) is not None:
+                collection.matrix = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = {name: len(c.entries) for name, c in self._collections.items()}
+        stats["threshold"] = self.threshold
+        return stats
+
+
+_cache: Optional[SemanticSQLCache] = None
+_cache_lock = threading.Lock()
+
+
+def is_sql_cache_enabled() -> bool:
+    return os.getenv("SQL_CACHE_ENABLED", "false").lower() == "true"
+
+
+def get_sql_cache() -> SemanticSQLCache:
+    """Return the process-wide semantic SQL cache configured from the environment"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SemanticSQLCache(
+                    threshold=float(os.getenv("SQL_CACHE_SIMILARITY_THRESHOLD", 0.95)),
+                    max_entries=int(os.getenv("SQL_CACHE_MAX_ENTRIES", 500))
+                )
+    return _cache
@@ -0,0 +1,43 @@
+"""
+Token counting for prompt budgets
+Uses tiktoken when the encoding is available and falls back to a ~4 characters per token
+estimate otherwise (e.g. when the encoding file cannot be downloaded).
+"""
+
+import logging
+import math
+import os
+import threading
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+_encoding: Optional[Any] = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def get_encoding() -> Optional[Any]:
+    """Return the tiktoken encoding (TOKEN_ENCODING, default o200k_base), or None if unavailable"""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding(os.getenv("TOKEN_ENCODING", "o200k_base"))
+                except Exception as e:
+                    logger.warning(f"tiktoken encoding unavailable, estimating token counts: {e}")
+                    _encoding = None
+                _encoding_loaded = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in text"""
+    if not text:
+        return 0
+    encoding = get_encoding()
+    if encoding is None:
+        return math.ceil(len(text) / 4)
+    return len(encoding.encode(text, disallowed_special=()))
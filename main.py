@@ -3,6 +3,7 @@ Standalone ConvBI FastAPI Server
 This is a standalone version of the Conversational BI system that can run independently.
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
@@ -13,13 +14,37 @@ import os
 load_dotenv()
 
 # Import routers
-from routes import chat_router, index_router, health_router
+from routes import chat_router, index_router, health_router, cache_router
+from convBI.conversationalBI import TextToSQLWorkflow
+from services.postgres.pool import warm_up_db_pool, close_db_pools
+from services.qdrant.client import close_qdrant_clients
+from services.index_jobs import close_index_jobs
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create process-wide resources once and share them across all requests"""
+    # Workflow owns the LLM client, the Redis connection pool and the compiled graph
+    app.state.workflow = TextToSQLWorkflow()
+    # Open the query database pool before the first request arrives
+    if os.getenv("QUERY_DB_POOL_WARMUP", "true").lower() == "true":
+        await warm_up_db_pool()
+    try:
+        yield
+    finally:
+        app.state.workflow.close()
+        await app.state.workflow.aclose()
+        close_index_jobs()
+        await close_db_pools()
+        await close_qdrant_clients()
+
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Text2SQL API",
     version="1.0.0",
-    description="Standalone Conversational BI System"
+    description="Standalone Conversational BI System",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -35,6 +60,7 @@ app.add_middleware(
 app.include_router(health_router)
 app.include_router(chat_router)
 app.include_router(index_router)
+app.include_router(cache_router)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,32 @@
+"""
+Cache administration endpoints
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+
+from convBI.result_cache import get_result_cache
+
+router = APIRouter(prefix="/api/v1", tags=["cache"])
+
+
+@router.delete("/cache/results")
+async def invalidate_result_cache_endpoint(
+    table: str = Query(..., description="Table name (bare or schema-qualified) whose cached results should be dropped")
+):
+    """Invalidate every cached SQL result that references the given table."""
+    try:
+        removed = await get_result_cache().ainvalidate_table(table)
+        return {
+            "status": "success",
+            "table": table,
+            "invalidated_results": removed
+        }
+    except Exception as e:
+        import traceback
+        print(f"Error in cache invalidation endpoint: {str(e)}")
+        print(f"Traceback: {traceback.format_exc()}")
+
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}",
+        )
@@ -2,7 +2,7 @@
 Chat streaming endpoint
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import StreamingResponse
 from typing import AsyncGenerator
 import uuid
@@ -13,21 +13,26 @@ from convBI.conversationalBI import TextToSQLWorkflow
 router = APIRouter(prefix="/api/v1", tags=["chat"])
 
 
+def get_workflow(http_request: Request) -> TextToSQLWorkflow:
+    """Return the process-wide workflow created in the application lifespan"""
+    return http_request.app.state.workflow
+
+
 @router.post("/stream/chat")
-async def stream_chat_endpoint(request: ConversationRequest):
+async def stream_chat_endpoint(
+    request: ConversationRequest,
+    workflow: TextToSQLWorkflow = Depends(get_workflow)
+):
     """Streaming chat endpoint for conversational BI using Server-Sent Events (SSE)."""
     try:
         # Use provided thread_id or generate a new one for the user
         # If thread_id is provided, it maintains conversation history
         # If not provided, create a new conversation thread
         thread_id = request.thread_id or f"{request.user_id}_{uuid.uuid4().hex[:8]}"
-        
-        # Initialize workflow
-        workflow = TextToSQLWorkflow()
 
         async def event_stream() -> AsyncGenerator[str, None]:
-            # Dynamic table discovery using Qdrant
-            for chunk in workflow.run_stream_workflow(
+            # Dynamic table discovery using Qdrant; the async path never blocks the event loop
+            async for chunk in workflow.arun_stream_workflow(
                 question=request.question,
                 thread_id=thread_id,
                 collection_name=request.collection_name or "semantics"
@@ -4,6 +4,13 @@ Health check and root endpoints
 
 from fastapi import APIRouter
 
+from services.postgres.pool import get_db_pool_stats
+from services.embedding_cache import get_embedding_cache
+from services.rerank_cache import get_rerank_cache
+from convBI.sql_cache import get_sql_cache, is_sql_cache_enabled
+from convBI.result_cache import get_result_cache, is_result_cache_enabled
+from convBI.intent_classifier import get_intent_classifier, is_intent_classifier_enabled
+
 router = APIRouter()
 
 
@@ -22,3 +29,47 @@ async def health():
     """Health check endpoint"""
     return {"status": "healthy"}
 
+
+
+@router.get("/health/db-pool")
+async def db_pool_stats():
+    """Query database connection pool statistics"""
+    return {"pools": get_db_pool_stats()}
+
+
+@router.get("/health/embedding-cache")
+async def embedding_cache_stats():
+    """Query embedding cache hit/miss statistics"""
+    return get_embedding_cache().stats()
+
+
+@router.get("/health/rerank-cache")
+async def rerank_cache_stats():
+    """Rerank outcome cache statistics (each hit is a rerank call skipped)"""
+    return get_rerank_cache().stats()
+
+
+@router.get("/health/sql-cache")
+async def sql_cache_stats():
+    """Semantic question-to-SQL cache statistics"""
+    if not is_sql_cache_enabled():
+        return {"enabled": False}
+    return get_sql_cache().stats()
+
+
+@router.get("/health/result-cache")
+async def result_cache_stats():
+    """SQL result cache hit/miss statistics (each hit is a query not sent to the database)"""
+    if not is_result_cache_enabled():
+        # Do not open Redis pools or resolve the database identity for a disabled cache
+        return {"enabled": False}
+    return get_result_cache().stats()
+
+
+@router.get("/health/intent-classifier")
+async def intent_classifier_stats():
+    """How many intents were decided locally (rules, centroid) versus by the LLM (fallback)"""
+    if not is_intent_classifier_enabled():
+        # Creating the classifier would load the examples and create an embeddings client
+        return {"enabled": False}
+    return get_intent_classifier().stats()
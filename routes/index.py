@@ -3,19 +3,77 @@ Index semantics endpoint
 """
 
 from fastapi import APIRouter, HTTPException, Form
+from fastapi.responses import JSONResponse
 from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+import asyncio
 import json
 import os
 
-from services.hybrid_retrieval import HybridRetrieval
+from services.hybrid_retrieval import HybridRetrieval, INDEX_MODES
+from services.index_jobs import get_index_jobs, JobConflictError
+from convBI.index_epoch import get_index_epochs
+from convBI.result_cache import get_result_cache, is_result_cache_enabled
 
 router = APIRouter(prefix="/api/v1", tags=["index"])
 
 
+def _run_index(
+    collection_name: str,
+    template_file: Path,
+    template_data: Dict,
+    mode: str,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> Dict[str, Any]:
+    """Index the template and invalidate caches that depend on it; returns the response body"""
+    hybrid_retrieval = HybridRetrieval(
+        collection_name=collection_name,
+        use_reranking=bool(os.getenv("COHERE_API_KEY"))
+    )
+    
+    # Index the tables (only changed ones in diff mode)
+    counts = hybrid_retrieval.index_tables(template_data, mode=mode, progress=progress)
+    if counts["added"] or counts["updated"] or counts["deleted"] or counts.get("join_graph", {}).get("changed"):
+        # New index epoch: every worker rebuilds its services (and cached join graph) for this
+        # collection and drops cached SQL that may reference tables or columns that changed
+        get_index_epochs().bump(collection_name)
+    if counts["changed_tables"] and is_result_cache_enabled():
+        # Cached results of queries over changed or removed tables may no longer be valid
+        try:
+            get_result_cache().invalidate_tables(counts["changed_tables"])
+        except Exception as e:
+            print(f"Result cache invalidation failed for {collection_name}: {str(e)}")
+    
+    # Count total tables and indexes
+    total_tables = 0
+    total_indexes = 0
+    for schema_data in template_data.get("schemas", {}).values():
+        for table in schema_data.get("tables", []):
+            total_tables += 1
+            total_indexes += len(table.get("indexes", []))
+    
+    return {
+        "status": "success",
+        "message": (
+            f"Indexed {total_tables} tables to Qdrant: {counts['added']} added, {counts['updated']} updated, "
+            f"{counts['unchanged']} unchanged, {counts['deleted']} deleted"
+        ),
+        "collection_name": collection_name,
+        "template_path": str(template_file),
+        "mode": mode,
+        **counts,
+        "total_tables": total_tables,
+        "total_indexes": total_indexes,
+        "total_schemas": len(template_data.get("schemas", {}))
+    }
+
+
 @router.post("/index")
 async def index_template_endpoint(
     collection_name: str = Form(default="semantics"),
-    template_path: str = Form(...)
+    template_path: str = Form(...),
+    mode: str = Form(default="diff"),
+    background: bool = Form(default=True)
 ):
     """
     Index semantics data from a template file to Qdrant.
@@ -23,6 +81,11 @@ async def index_template_endpoint(
     Parameters:
     - collection_name: Name of the Qdrant collection (default: "semantics")
     - template_path: Path to the template JSON file (relative to project root or absolute)
+    - mode: "diff" (default) re-embeds only new or changed tables and deletes removed ones;
+      "full" recreates the collection and re-embeds everything
+    - background: Run as a background job (default) and return its job ID immediately; poll
+      GET /api/v1/index/jobs/{job_id} for progress. With false, the request waits for the result.
+      Either way, 409 is returned while the collection is already being indexed.
     
     The template file should contain:
     {
@@ -42,6 +105,12 @@ async def index_template_endpoint(
         }
     }
     """
+    if mode not in INDEX_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid mode: {mode} (expected one of {', '.join(INDEX_MODES)})"
+        )
+
     try:
         # Resolve template path
         template_file = Path(template_path)
@@ -76,32 +145,25 @@ async def index_template_endpoint(
                 detail="Template must contain a 'schemas' key with schema definitions"
             )
         
-        # Initialize HybridRetrieval with collection name
-        hybrid_retrieval = HybridRetrieval(
-            collection_name=collection_name,
-            use_reranking=bool(os.getenv("COHERE_API_KEY"))
-        )
-        
-        # Index the tables
-        hybrid_retrieval.index_tables(template_data)
-        
-        # Count total tables and indexes
-        total_tables = 0
-        total_indexes = 0
-        for schema_data in template_data.get("schemas", {}).values():
-            for table in schema_data.get("tables", []):
-                total_tables += 1
-                total_indexes += len(table.get("indexes", []))
-        
-        return {
-            "status": "success",
-            "message": f"Successfully indexed {total_tables} tables to Qdrant",
+        run_index = lambda job: _run_index(collection_name, template_file, template_data, mode, job.progress)
+        try:
+            if not background:
+                job = await asyncio.to_thread(get_index_jobs().run, collection_name, str(template_file), mode, run_index)
+                if job.error is not None:
+                    raise HTTPException(status_code=500, detail=f"Internal server error: {job.error}")
+                return job.result
+            job = get_index_jobs().submit(collection_name, str(template_file), mode, run_index)
+        except JobConflictError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        return JSONResponse(status_code=202, content={
+            "status": "accepted",
+            "message": f"Indexing {collection_name} in the background",
+            "job_id": job.job_id,
+            "status_url": f"/api/v1/index/jobs/{job.job_id}",
             "collection_name": collection_name,
             "template_path": str(template_file),
-            "total_tables": total_tables,
-            "total_indexes": total_indexes,
-            "total_schemas": len(template_data.get("schemas", {}))
-        }
+            "mode": mode
+        })
         
     except HTTPException:
         raise
@@ -116,3 +178,18 @@ async def index_template_endpoint(
             detail=f"Internal server error: {str(e)}",
         )
 
+
+
+@router.get("/index/jobs")
+async def list_index_jobs_endpoint():
+    """Recent index jobs, newest first"""
+    return {"jobs": [job.to_dict() for job in get_index_jobs().list()]}
+
+
+@router.get("/index/jobs/{job_id}")
+async def index_job_status_endpoint(job_id: str):
+    """Status, progress (tables upserted / tables to index) and throughput of an index job"""
+    job = get_index_jobs().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Index job not found: {job_id}")
+    return job.to_dict()
@@ -12,6 +12,8 @@ try:
 except ImportError:
     cohere = None
 
+from services.reranker import Reranker, rerank_document_text
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -22,11 +24,13 @@ class RerankConfig:
     max_chunks_per_doc: int = 10
     return_documents: bool = True
 
-class CohereReranker:
+class CohereReranker(Reranker):
     """
     Cohere Reranker service using rerank-v3.5 model
     Provides advanced reranking for hybrid search results
     """
+
+    name = "cohere"
     
     def __init__(self, api_key: Optional[str] = None, config: Optional[RerankConfig] = None):
         """
@@ -47,6 +51,7 @@ class CohereReranker:
         
         try:
             self.client = cohere.Client(api_key=self.api_key)
+            self.async_client = cohere.AsyncClient(api_key=self.api_key)
         except Exception as e:
             logger.error(f"Failed to initialize Cohere client: {e}")
             raise
@@ -74,18 +79,7 @@ class CohereReranker:
         top_k = top_k or self.config.top_k
         
         try:
-            # Prepare documents for reranking
-            rerank_documents = []
-            for doc in documents:
-                # Create searchable text from table information
-                searchable_text = self._create_searchable_text(doc)
-                rerank_documents.append({
-                    "text": searchable_text,
-                    "metadata": doc
-                })
-            
-            # Extract text for reranking
-            texts = [doc["text"] for doc in rerank_documents]
+            rerank_documents, texts = self._prepare_documents(documents)
             
             # Perform reranking
             rerank_response = self.client.rerank(
@@ -95,27 +89,81 @@ class CohereReranker:
                 return_documents=self.config.return_documents
             )
             
-            # Process reranked results
-            reranked_results = []
-            for result in rerank_response.results:
-                original_doc = rerank_documents[result.index]["metadata"]
-                
-                # Update with reranked score and ranking
-                reranked_doc = original_doc.copy()
-                reranked_doc["rerank_score"] = result.relevance_score
-                reranked_doc["rerank_rank"] = result.index
-                reranked_doc["original_score"] = original_doc.get("score", 0.0)
-                
-                reranked_results.append(reranked_doc)
+            return self._process_response(rerank_response, rerank_documents, top_k)
             
-            # Apply top_k filtering
-            final_results = reranked_results[:top_k]
+        except Exception as e:
+            logger.error(f"Reranking failed: {e}")
+            raise
+
+    async def arerank_results(
+        self,
+        query: str,
+        documents: List[Dict[str, Any]],
+        top_k: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Async variant of rerank_results using Cohere's async client
+        
+        Args:
+            query: Original search query
+            documents: List of document dictionaries from hybrid search
+            top_k: Number of top results to return (defaults to config.top_k)
             
-            return final_results
+        Returns:
+            List of reranked documents with updated scores
+        """
+        if not documents:
+            return []
+        
+        top_k = top_k or self.config.top_k
+        
+        try:
+            rerank_documents, texts = self._prepare_documents(documents)
+            
+            rerank_response = await self.async_client.rerank(
+                model=self.config.model,
+                query=query,
+                documents=texts,
+                return_documents=self.config.return_documents
+            )
+            
+            return self._process_response(rerank_response, rerank_documents, top_k)
             
         except Exception as e:
             logger.error(f"Reranking failed: {e}")
             raise
+
+    def _prepare_documents(self, documents: List[Dict[str, Any]]):
+        """Build rerank documents and the texts sent to Cohere"""
+        rerank_documents = []
+        for doc in documents:
+            # Create searchable text from table information
+            searchable_text = self._create_searchable_text(doc)
+            rerank_documents.append({
+                "text": searchable_text,
+                "metadata": doc
+            })
+        
+        # Extract text for reranking
+        texts = [doc["text"] for doc in rerank_documents]
+        return rerank_documents, texts
+
+    def _process_response(self, rerank_response, rerank_documents, top_k: int) -> List[Dict[str, Any]]:
+        """Map Cohere rerank results back to the original documents"""
+        reranked_results = []
+        for result in rerank_response.results:
+            original_doc = rerank_documents[result.index]["metadata"]
+            
+            # Update with reranked score and ranking
+            reranked_doc = original_doc.copy()
+            reranked_doc["rerank_score"] = result.relevance_score
+            reranked_doc["rerank_rank"] = result.index
+            reranked_doc["original_score"] = original_doc.get("score", 0.0)
+            
+            reranked_results.append(reranked_doc)
+        
+        # Apply top_k filtering
+        return reranked_results[:top_k]
     
     def _create_searchable_text(self, doc: Dict[str, Any]) -> str:
         """
@@ -127,68 +175,7 @@ class CohereReranker:
         Returns:
             Formatted text for reranking
         """
-        # Extract key information
-        table_name = doc.get("table_name", "")
-        description = doc.get("table_description", "")
-        database_name = doc.get("database_name", "")
-        schema_name = doc.get("schema_name", "")
-        
-        # Create comprehensive searchable text
-        searchable_parts = []
-        
-        # Table identification
-        if table_name:
-            searchable_parts.append(f"Table: {table_name}")
-        
-        if database_name:
-            searchable_parts.append(f"Database: {database_name}")
-        
-        if schema_name:
-            searchable_parts.append(f"Schema: {schema_name}")
-        
-        # Table description
-        if description:
-            searchable_parts.append(f"Description: {description}")
-        
-        # Column information
-        columns = doc.get("columns_summary", [])
-        if columns:
-            column_info = []
-            for col in columns[:10]:  # Limit to first 10 columns
-                col_name = col.get("column_name", "")
-                col_desc = col.get("description", "")
-                col_type = col.get("data_type", "")
-                
-                if col_name:
-                    col_text = f"{col_name} ({col_type})"
-                    if col_desc:
-                        col_text += f": {col_desc}"
-                    column_info.append(col_text)
-            
-            if column_info:
-                searchable_parts.append(f"Columns: {', '.join(column_info)}")
-        
-        # Primary and foreign keys
-        primary_keys = doc.get("primary_key", [])
-        if primary_keys:
-            searchable_parts.append(f"Primary Keys: {', '.join(primary_keys)}")
-        
-        foreign_keys = doc.get("foreign_keys", [])
-        if foreign_keys:
-            fk_info = []
-            for fk in foreign_keys[:5]:  # Limit foreign keys
-                if isinstance(fk, dict) and "column" in fk:
-                    fk_text = fk["column"]
-                    if "references" in fk:
-                        ref = fk["references"]
-                        if isinstance(ref, dict) and "table" in ref:
-                            fk_text += f" -> {ref['table']}"
-                    fk_info.append(fk_text)
-            
-            if fk_info:
-                searchable_parts.append(f"Foreign Keys: {', '.join(fk_info)}")
-        
-        return " | ".join(searchable_parts)
+        return rerank_document_text(doc)
     
     def get_rerank_stats(self, original_results: List[Dict], reranked_results: List[Dict]) -> Dict[str, Any]:
         """
@@ -0,0 +1,232 @@
+"""
+Two-tier cache for query embeddings
+An in-process LRU sits in front of an optional Redis tier with TTL. Entries are keyed by
+vector kind, model name and normalized text, and stored as compact float32 bytes.
+"""
+
+import os
+import struct
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DENSE = "dense"
+SPARSE = "sparse"
+
+
+class SparseVectorData(NamedTuple):
+    """Sparse vector with the same indices/values interface as FastEmbed's SparseEmbedding"""
+    indices: np.ndarray
+    values: np.ndarray
+
+
+def normalize_text(text: str) -> str:
+    """Case- and whitespace-insensitive form of a query used for cache keys"""
+    return " ".join(text.lower().split())
+
+
+def make_key(kind: str, model: str, text: str) -> str:
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"emb:{kind}:{model}:{digest}"
+
+
+def encode_dense(vector) -> bytes:
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def decode_dense(data: bytes) -> List[float]:
+    return np.frombuffer(data, dtype=np.float32).tolist()
+
+
+def encode_sparse(vector) -> bytes:
+    indices = np.asarray(vector.indices, dtype=np.int32)
+    values = np.asarray(vector.values, dtype=np.float32)
+    return struct.pack("<I", len(indices)) + indices.tobytes() + values.tobytes()
+
+
+def decode_sparse(data: bytes) -> SparseVectorData:
+    (nnz,) = struct.unpack_from("<I", data)
+    indices = np.frombuffer(data, dtype=np.int32, count=nnz, offset=4)
+    values = np.frombuffer(data, dtype=np.float32, count=nnz, offset=4 + 4 * nnz)
+    return SparseVectorData(indices=indices, values=values)
+
+
+_CODECS = {
+    DENSE: (encode_dense, decode_dense),
+    SPARSE: (encode_sparse, decode_sparse),
+}
+
+
+class EmbeddingCache:
+    """
+    In-process LRU with an optional Redis tier
+
+    Args:
+        max_entries: Maximum number of vectors kept in process memory
+        redis_client: Optional sync Redis client (binary, decode_responses=False)
+        async_redis_client: Optional asyncio Redis client for the async path
+        ttl_seconds: Expiry of Redis entries
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        redis_client=None,
+        async_redis_client=None,
+        ttl_seconds: int = 86400
+    ):
+        self.max_entries = max_entries
+        self.redis_client = redis_client
+        self.async_redis_client = async_redis_client
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "redis_hits": 0, "misses": 0, "redis_errors": 0}
+
+    def _memory_get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self._stats["memory_hits"] += 1
+            return data
+
+    def _memory_set(self, key: str, data: bytes):
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def get(self, kind: str, model: str, text: str) -> Optional[Any]:
+        """Return a cached vector or None"""
+        key = make_key(kind, model, text)
+        data = self._memory_get(key)
+        if data is None and self.redis_client is not None:
+            try:
+                data = self.redis_client.get(key)
+            except Exception as e:
+                self._count("redis_errors")
+                logger.warning(f"Embedding cache Redis read failed: {e}")
+            if data is not None:
+                self._count("redis_hits")
+                self._memory_set(key, data)
+        if data is None:
+            self._count("misses")
+            return None
+        return _CODECS[kind][1](data)
+
+    def set(self, kind: str, model: str, text: str, vector):
+        """Store a vector in both tiers"""
+        key = make_key(kind, model, text)
+        data = _CODECS[kind][0](vector)
+        self._memory_set(key, data)
+        if self.redis_client is not None:
+            try:
+                self.redis_client.set(key, data, ex=self.ttl_seconds)
+            except Exception as e:
+                self._count("redis_errors")
+                logger.warning(f"Embedding cache Redis write failed: {e}")
+
+    async def aget(self, kind: str, model: str, text: str) -> Optional[Any]:
+        """Async variant of get using the asyncio Redis client"""
+        key = make_key(kind, model, text)
+        data = self._memory_get(key)
+        if data is None and self.async_redis_client is not None:
+            try:
+                data = await self.async_redis_client.get(key)
+            except Exception as e:
+                self._count("redis_errors")
+                logger.warning(f"Embedding cache Redis read failed: {e}")
+            if data is not None:
+                self._count("redis_hits")
+                self._memory_set(key, data)
+        if data is None:
+            self._count("misses")
+            return None
+        return _CODECS[kind][1](data)
+
+    async def aset(self, kind: str, model: str, text: str, vector):
+        """Async variant of set using the asyncio Redis client"""
+        key = make_key(kind, model, text)
+        data = _CODECS[kind][0](vector)
+        self._memory_set(key, data)
+        if self.async_redis_client is not None:
+            try:
+                await self.async_redis_client.set(key, data, ex=self.ttl_seconds)
+            except Exception as e:
+                self._count("redis_errors")
+                logger.warning(f"Embedding cache Redis write failed: {e}")
+
+    def get_or_compute(self, kind: str, model: str, text: str, compute: Callable[[str], Any]) -> Any:
+        """Return the cached vector, or compute, store and return it"""
+        vector = self.get(kind, model, text)
+        if vector is None:
+            vector = compute(text)
+            self.set(kind, model, text, vector)
+        return vector
+
+    async def aget_or_compute(self, kind: str, model: str, text: str, compute: Callable[[str], Awaitable[Any]]) -> Any:
+        """Async variant of get_or_compute; compute must be a coroutine function"""
+        vector = await self.aget(kind, model, text)
+        if vector is None:
+            vector = await compute(text)
+            await self.aset(kind, model, text, vector)
+        return vector
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current in-process size"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._entries)
+        lookups = stats["memory_hits"] + stats["redis_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["redis_hits"]) / lookups if lookups else 0.0
+        stats["redis_enabled"] = self.redis_client is not None
+        return stats
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def _redis_kwargs() -> Dict[str, Any]:
+    return {
+        "host": os.getenv('REDIS_HOST', 'localhost'),
+        "port": int(os.getenv('REDIS_PORT', 6379)),
+        "password": os.getenv('REDIS_PASSWORD', ''),
+        "db": int(os.getenv('REDIS_DB', 0)),
+        # Vectors are raw bytes
+        "decode_responses": False
+    }
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Return the process-wide embedding cache configured from the environment"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                redis_client = None
+                async_redis_client = None
+                if os.getenv("EMBEDDING_CACHE_REDIS", "false").lower() == "true":
+                    import redis
+                    import redis.asyncio as aioredis
+                    redis_client = redis.Redis(**_redis_kwargs())
+                    async_redis_client = aioredis.Redis(**_redis_kwargs())
+                _cache = EmbeddingCache(
+                    max_entries=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", 2048)),
+                    redis_client=redis_client,
+                    async_redis_client=async_redis_client,
+                    ttl_seconds=int(os.getenv("EMBEDDING_CACHE_TTL", 86400))
+                )
+    return _cache
@@ -0,0 +1,235 @@
+"""
+Persistent on-disk embedding store for the indexer
+Content-addressed by hash(model, text): re-indexing an unchanged (or slightly edited) catalog
+reads vectors from local disk instead of calling the embedding APIs. Each model gets its own
+directory of append-only files:
+
+    index.bin    fixed-size records (sha256 digest, offset, length)
+    values.f32   float32 vector values, memory-mapped for reads
+    indices.i32  int32 token indices (sparse models only)
+    write.lock   exclusive flock held while appending
+
+Records are appended after their data, so a partially written entry is never indexed. Several
+processes (e.g. gunicorn workers) may share a directory: writers take the lock and first read
+the records other processes appended, and readers pick those records up on a miss.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import struct
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, keep one writing process per directory
+    fcntl = None
+
+from services.embedding_cache import SPARSE, SparseVectorData
+
+logger = logging.getLogger(__name__)
+
+_RECORD = struct.Struct("<32sqi")  # digest, offset (elements), length (elements)
+
+
+def _digest(model: str, text: str) -> bytes:
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).digest()
+
+
+class _ModelFiles:
+    """Index and memory-mapped data files of one (kind, model) pair"""
+
+    def __init__(self, directory: Path, kind: str, model: str):
+        self.kind = kind
+        self.model = model
+        directory.mkdir(parents=True, exist_ok=True)
+        self.index_path = directory / "index.bin"
+        self.values_path = directory / "values.f32"
+        self.indices_path = directory / "indices.i32"
+        self.lock_path = directory / "write.lock"
+        self.index: Dict[bytes, tuple] = {}
+        self._index_bytes = 0  # Bytes of index.bin already loaded
+        self._values: Optional[np.memmap] = None
+        self._indices: Optional[np.memmap] = None
+        self._load_index()
+
+    def _data_length(self, path: Path) -> int:
+        return path.stat().st_size // 4 if path.exists() else 0
+
+    def _load_index(self):
+        """Load the records appended since the last load (by this or another process)"""
+        if not self.index_path.exists() or self.index_path.stat().st_size <= self._index_bytes:
+            return
+        data_length = self._data_length(self.values_path)
+        if self.kind == SPARSE:
+            data_length = min(data_length, self._data_length(self.indices_path))
+        with open(self.index_path, "rb") as index_file:
+            index_file.seek(self._index_bytes)
+            data = index_file.read()
+        usable = len(data) - len(data) % _RECORD.size
+        for digest, offset, length in _RECORD.iter_unpack(data[:usable]):
+            # Skip entries whose data did not make it to disk
+            if offset + length <= data_length:
+                self.index[digest] = (offset, length)
+        self._index_bytes += usable
+
+    @contextmanager
+    def _write_lock(self):
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _mapped(self, path: Path, dtype, current: Optional[np.memmap], needed: int) -> np.memmap:
+        if current is None or current.shape[0] < needed:
+            current = np.memmap(path, dtype=dtype, mode="r")
+        return current
+
+    def get(self, digest: bytes) -> Optional[Any]:
+        location = self.index.get(digest)
+        if location is None:
+            # Another process may have stored it since
+            self._load_index()
+            location = self.index.get(digest)
+        if location is None:
+            return None
+        offset, length = location
+        self._values = self._mapped(self.values_path, np.float32, self._values, offset + length)
+        values = np.array(self._values[offset:offset + length])
+        if self.kind == SPARSE:
+            self._indices = self._mapped(self.indices_path, np.int32, self._indices, offset + length)
+            return SparseVectorData(indices=np.array(self._indices[offset:offset + length]), values=values)
+        return values.tolist()
+
+    def put_many(self, digests: Sequence[bytes], vectors: Sequence[Any]):
+        """Append the vectors not stored yet; the file lock serializes writers across processes"""
+        with self._write_lock():
+            self._load_index()
+            new = [(digest, vector) for digest, vector in zip(digests, vectors) if digest not in self.index]
+            if new:
+                self._append(*zip(*new))
+
+    def _append(self, digests: Sequence[bytes], vectors: Sequence[Any]):
+        offset = self._data_length(self.values_path)
+        if self.kind == SPARSE and self._data_length(self.indices_path) != offset:
+            # An interrupted write left the two files out of step; drop the unindexed tail
+            offset = min(offset, self._data_length(self.indices_path))
+            self._values = self._indices = None
+            for path in (self.values_path, self.indices_path):
+                os.truncate(path, offset * 4)
+        records = []
+        with open(self.values_path, "ab") as values_file:
+            indices_file = open(self.indices_path, "ab") if self.kind == SPARSE else None
+            try:
+                for digest, vector in zip(digests, vectors):
+                    if self.kind == SPARSE:
+                        values = np.asarray(vector.values, dtype=np.float32)
+                        indices_file.write(np.asarray(vector.indices, dtype=np.int32).tobytes())
+                    else:
+                        values = np.asarray(vector, dtype=np.float32)
+                    values_file.write(values.tobytes())
+                    records.append((digest, offset, len(values)))
+                    offset += len(values)
+            finally:
+                if indices_file is not None:
+                    indices_file.close()
+        with open(self.index_path, "ab") as index_file:
+            index_file.write(b"".join(_RECORD.pack(*record) for record in records))
+        for digest, offset, length in records:
+            self.index[digest] = (offset, length)
+        self._index_bytes += len(records) * _RECORD.size
+
+
+class EmbeddingStore:
+    """
+    Content-addressed, memory-mapped float32 store of document embeddings
+
+    Args:
+        path: Directory holding one subdirectory per (kind, model)
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._files: Dict[tuple, _ModelFiles] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def _model_files(self, kind: str, model: str) -> _ModelFiles:
+        key = (kind, model)
+        if key not in self._files:
+            slug = re.sub(r"[^A-Za-z0-9._-]+", "_", model)
+            self._files[key] = _ModelFiles(self.path / kind / slug, kind, model)
+        return self._files[key]
+
+    def get_many(self, kind: str, model: str, texts: Sequence[str]) -> List[Optional[Any]]:
+        """Stored vectors for texts, None where missing"""
+        with self._lock:
+            files = self._model_files(kind, model)
+            vectors = [files.get(_digest(model, text)) for text in texts]
+            hits = sum(v is not None for v in vectors)
+            self._stats["hits"] += hits
+            self._stats["misses"] += len(texts) - hits
+        return vectors
+
+    def put_many(self, kind: str, model: str, texts: Sequence[str], vectors: Sequence[Any]):
+        with self._lock:
+            files = self._model_files(kind, model)
+            digests, new_vectors, seen = [], [], set()
+            for text, vector in zip(texts, vectors):
+                digest = _digest(model, text)
+                if digest not in seen:
+                    seen.add(digest)
+                    digests.append(digest)
+                    new_vectors.append(vector)
+            if digests:
+                files.put_many(digests, new_vectors)
+
+    def embed_documents(self, kind: str, model: str, texts: List[str], embed: Callable[[List[str]], List[Any]]) -> List[Any]:
+        """Vectors for texts, calling embed only for the ones not on disk yet"""
+        vectors = self.get_many(kind, model, texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            computed = embed([texts[i] for i in missing])
+            for i, vector in zip(missing, computed):
+                vectors[i] = vector
+            try:
+                self.put_many(kind, model, [texts[i] for i in missing], computed)
+            except OSError as e:
+                logger.warning(f"Embedding store write failed: {e}")
+        return vectors
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = {f"{kind}/{model}": len(files.index) for (kind, model), files in self._files.items()}
+        stats["path"] = str(self.path)
+        return stats
+
+
+_store: Optional[EmbeddingStore] = None
+_store_lock = threading.Lock()
+
+
+def is_embedding_store_enabled() -> bool:
+    return os.getenv("EMBEDDING_STORE_ENABLED", "true").lower() == "true"
+
+
+def get_embedding_store() -> EmbeddingStore:
+    """Return the process-wide embedding store (EMBEDDING_STORE_PATH, default .embedding_store)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                default_path = Path(__file__).parent.parent / ".embedding_store"
+                _store = EmbeddingStore(Path(os.getenv("EMBEDDING_STORE_PATH", default_path)))
+    return _store
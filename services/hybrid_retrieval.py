@@ -1,15 +1,43 @@
 import os
-from typing import Dict, List, Optional
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+from typing import Any, Callable, Dict, List, Optional
 from langchain_openai import AzureOpenAIEmbeddings
 from langchain_core.embeddings import Embeddings
-from services.qdrant.client import get_qdrant_client
-from services.cohere_reranker import CohereReranker, RerankConfig
+from services.qdrant.client import get_qdrant_client, get_async_qdrant_client
+from services.reranker import Reranker, create_reranker, reranker_name
+from services.rerank_cache import from_ranked, get_rerank_cache, is_rerank_cache_enabled, make_key as rerank_cache_key
+from services.embedding_cache import get_embedding_cache, DENSE, SPARSE
+from services.embedding_store import get_embedding_store, is_embedding_store_enabled
+from services.join_graph import JOIN_GRAPH_POINT_ID, JoinGraph, is_join_graph_enabled, join_graph_collection_name
+
+logger = logging.getLogger(__name__)
+
+SPARSE_MODEL_NAME = "Qdrant/bm42-all-minilm-l6-v2-attentions"
+DENSE_MODEL_NAME = "text-embedding-3-large"
 
 class FastEmbedSparseWrapper(Embeddings):
     """Wrapper for FastEmbed sparse embeddings to work with LangChain"""
-    def __init__(self):
-        from fastembed import SparseTextEmbedding
-        self.model = SparseTextEmbedding(model_name="Qdrant/bm42-all-minilm-l6-v2-attentions")
+    def __init__(self, model_name: str = SPARSE_MODEL_NAME):
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        # Load the ONNX model lazily, exactly once, even under concurrent first use
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from fastembed import SparseTextEmbedding
+                    self._model = SparseTextEmbedding(model_name=self.model_name)
+        return self._model
     
     def embed_documents(self, texts):
         return list(self.model.embed(texts))
@@ -17,45 +45,197 @@ class FastEmbedSparseWrapper(Embeddings):
     def embed_query(self, text):
         return list(self.model.embed([text]))[0]
 
+
+# Process-wide clients shared by every HybridRetrieval instance
+_shared_clients: Dict[str, Any] = {}
+_shared_lock = threading.Lock()
+
+def _get_shared(name: str, factory: Callable[[], Any]) -> Any:
+    """Thread-safe lazy initialization of a shared client"""
+    if name not in _shared_clients:
+        with _shared_lock:
+            if name not in _shared_clients:
+                _shared_clients[name] = factory()
+    return _shared_clients[name]
+
+def get_dense_embeddings() -> AzureOpenAIEmbeddings:
+    """Shared Azure OpenAI embeddings client"""
+    return _get_shared("dense", lambda: AzureOpenAIEmbeddings(
+        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+        api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
+        model=DENSE_MODEL_NAME
+    ))
+
+def get_sparse_embeddings() -> FastEmbedSparseWrapper:
+    """Shared BM42 sparse embedding model (loaded on first use)"""
+    return _get_shared("sparse", FastEmbedSparseWrapper)
+
+def get_reranker(name: str = "cohere") -> Optional[Reranker]:
+    """Shared reranker by name (cohere, fastembed), or None if it cannot be initialized (e.g. no API key)"""
+    return _get_shared(f"reranker:{name}", lambda: create_reranker(name))
+
+class RerankPool:
+    """
+    Thread pool for sync rerank calls that refuses work instead of queueing it
+
+    Calls past their budget are abandoned but keep their worker until they finish, so without a
+    bound a slow reranker would pile up queued calls that can only time out.
+
+    Args:
+        workers: Concurrent rerank calls, abandoned ones included
+    """
+
+    def __init__(self, workers: int = 8):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rerank")
+        self._slots = threading.BoundedSemaphore(workers)
+
+    def try_submit(self, fn: Callable, *args) -> Optional[Future]:
+        """Run fn on a free worker, or return None when every worker is busy"""
+        if not self._slots.acquire(blocking=False):
+            return None
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+def get_rerank_pool() -> RerankPool:
+    """Shared pool for sync rerank calls, so a call past its budget can be abandoned"""
+    return _get_shared("rerank_pool", lambda: RerankPool(max(int(os.getenv("RERANK_WORKERS", 8)), 1)))
+
+def rerank_timeout_s() -> float:
+    """Time the reranker gets, measured from the start of the rerank call"""
+    return int(os.getenv("RERANK_TIMEOUT_MS", 1000)) / 1000
+
+def retrieval_deadline_s() -> Optional[float]:
+    """Optional overall latency budget of search_tables (embedding, search and reranking), or None"""
+    deadline_ms = int(os.getenv("RETRIEVAL_DEADLINE_MS", 0) or 0)
+    return deadline_ms / 1000 if deadline_ms > 0 else None
+
+def _retrieval_deadline() -> Optional[float]:
+    budget = retrieval_deadline_s()
+    return time.monotonic() + budget if budget is not None else None
+
+def _rerank_budget(deadline: Optional[float]) -> float:
+    """RERANK_TIMEOUT_MS from now, capped by what is left of the overall deadline if one is set"""
+    timeout = rerank_timeout_s()
+    if deadline is not None:
+        timeout = min(timeout, deadline - time.monotonic())
+    return timeout
+
+INDEX_MODES = ("diff", "full")
+
+
+def index_batch_size() -> int:
+    """Tables per embedding request and upsert"""
+    return max(int(os.getenv("INDEX_BATCH_SIZE", 64)), 1)
+
+
+def index_concurrency() -> int:
+    """Chunks embedded and upserted at the same time"""
+    return max(int(os.getenv("INDEX_CONCURRENCY", 4)), 1)
+
+# Namespace for deterministic table point IDs (uuid5 of the qualified table name)
+TABLE_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "convbi/semantics/table")
+
+
+def table_point_id(qualified_name: str) -> str:
+    return str(uuid.uuid5(TABLE_ID_NAMESPACE, qualified_name))
+
+
+def _index_text(table: Dict) -> str:
+    """Searchable text for a table's indexes"""
+    text = ""
+    for idx in table.get('indexes', []):
+        index_name = idx.get('index_name', '')
+        index_columns = idx.get('columns', [])
+        index_type = idx.get('index_type', '')
+        if index_name:
+            text += f" index {index_name} {index_type}"
+        if index_columns:
+            text += f" {' '.join(index_columns)}"
+    return text
+
+
+def _point_entry(qualified_name: str, content: str, payload: Dict) -> Dict:
+    """Point ID plus a content hash covering the text, payload and embedding models"""
+    digest = hashlib.sha256(
+        json.dumps([DENSE_MODEL_NAME, SPARSE_MODEL_NAME, content, payload], sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    return {
+        "id": table_point_id(qualified_name),
+        "key": qualified_name,
+        "content": content,
+        "payload": {**payload, "content_hash": digest},
+    }
+
+
+def column_collection_name(collection_name: str) -> str:
+    return f"{collection_name}__columns"
+
+
+def is_column_index_enabled() -> bool:
+    return os.getenv("COLUMN_INDEX_ENABLED", "false").lower() == "true"
+
+
+def _column_entries(table_entries: List[Dict]) -> List[Dict]:
+    """One entry per column, with the owning table in the payload"""
+    entries = []
+    for table_entry in table_entries:
+        table = table_entry["payload"]
+        table_name = table.get("table_name", "")
+        schema_name = table.get("schema_name", "")
+        for column in table.get("columns", table.get("columns_summary", [])):
+            column_name = column.get("column_name", "")
+            content = f"{schema_name} {table_name} {column_name} {column.get('data_type', '')} {column.get('description', '')}"
+            payload = {
+                "schema_name": schema_name,
+                "table_name": table_name,
+                "column_name": column_name,
+                "column": column,
+            }
+            entries.append(_point_entry(f"{table_entry['key']}.{column_name}", content, payload))
+    return entries
+
+
 class HybridRetrieval:
     def __init__(self, collection_name: str = "semantics", use_reranking: bool = True):
         self.collection_name = collection_name
         self.use_reranking = use_reranking
         
         # Dense embeddings
-        self.dense_embeddings = AzureOpenAIEmbeddings(
-            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-            model="text-embedding-3-large"
-        )
+        self.dense_embeddings = get_dense_embeddings()
         
         # Sparse embeddings
-        self.sparse_embeddings = FastEmbedSparseWrapper()
+        self.sparse_embeddings = get_sparse_embeddings()
+
+        # Query embedding cache (repeated questions skip the embedding round-trip)
+        self.embedding_cache = get_embedding_cache()
+
+        # On-disk document embeddings (re-indexing unchanged tables skips the embedding APIs)
+        self.embedding_store = get_embedding_store() if is_embedding_store_enabled() else None
         
-        # Reranker (optional)
+        # Reranker (optional, selected per collection)
         self.reranker = None
         if self.use_reranking:
-            try:
-                rerank_config = RerankConfig(
-                    model=os.getenv("COHERE_RERANK_MODEL", "rerank-v3.5"),
-                    top_k=int(os.getenv("COHERE_RERANK_TOP_K", "10")),
-                    return_documents=True
-                )
-                self.reranker = CohereReranker(config=rerank_config)
-                pass  # Reranking enabled
-            except Exception as e:
+            self.reranker = get_reranker(reranker_name(collection_name))
+            if self.reranker is None:
                 self.use_reranking = False
+        self.rerank_cache = get_rerank_cache() if is_rerank_cache_enabled() else None
     
-    def create_collection(self):
+    def create_collection(self, collection_name: Optional[str] = None):
         """Create collection with hybrid support"""
+        collection_name = collection_name or self.collection_name
         client = get_qdrant_client()
-        if client.collection_exists(self.collection_name):
-            client.delete_collection(self.collection_name)
+        if client.collection_exists(collection_name):
+            client.delete_collection(collection_name)
         
         from qdrant_client.models import SparseVectorParams
         client.create_collection(
-            collection_name=self.collection_name,
+            collection_name=collection_name,
             vectors_config={
                 'dense': {
                     'size': 3072,
@@ -66,23 +246,178 @@ class HybridRetrieval:
                 'sparse': SparseVectorParams()
             }
         )
+
+    def ensure_collection(self, collection_name: Optional[str] = None) -> bool:
+        """Create the collection if it does not exist; returns True if it was created"""
+        collection_name = collection_name or self.collection_name
+        if get_qdrant_client().collection_exists(collection_name):
+            return False
+        self.create_collection(collection_name)
+        return True
     
-    def index_tables(self, semantics_data: Dict):
-        """Index tables - one point per table with all data as payload"""
-        # Always recreate collection to ensure correct configuration
+    def index_tables(
+        self,
+        semantics_data: Dict,
+        mode: str = "diff",
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> Dict[str, int]:
+        """
+        Index tables - one point per table with all data as payload
+
+        Point IDs are derived from the table's qualified name and every point stores a hash of
+        its content, so re-indexing is idempotent:
+          - diff: upsert only new or changed tables and delete tables no longer in the template;
+                  the collection stays searchable throughout
+          - full: recreate the collection and re-embed every table
+
+        With COLUMN_INDEX_ENABLED, the column collection ({collection}__columns, one point per
+        column) is synced the same way and its counts are returned under "columns". With
+        JOIN_GRAPH_ENABLED, the foreign-key join graph is rebuilt from the template and stored in
+        {collection}__join_graph; its size, and whether it differs from the stored graph, are
+        returned under "join_graph".
+
+        progress(done, total) is called as chunks of tables (and columns) to (re-)embed are upserted.
+        Returns counts of added, updated, unchanged and deleted tables, and the qualified names
+        (schema.table) of those tables under "changed_tables".
+        """
+        if mode not in INDEX_MODES:
+            raise ValueError(f"Unknown index mode: {mode} (expected one of {', '.join(INDEX_MODES)})")
+
+        entries = self._table_entries(semantics_data)
+        plans = [self._plan_sync(self.collection_name, entries, mode)]
+        if is_column_index_enabled():
+            plans.append(self._plan_sync(column_collection_name(self.collection_name), _column_entries(entries), mode))
+
+        # One progress scale across the table and column collections
+        total = sum(len(plan["upserts"]) for plan in plans)
+        offset = 0
+        for plan in plans:
+            chunk_progress = None
+            if progress is not None:
+                chunk_progress = lambda done, _, base=offset: progress(base + done, total)
+            self._upsert_entries(plan["upserts"], chunk_progress, plan["collection_name"])
+            offset += len(plan["upserts"])
+            if plan["deleted"]:
+                from qdrant_client.models import PointIdsList
+                get_qdrant_client().delete(
+                    collection_name=plan["collection_name"],
+                    points_selector=PointIdsList(points=plan["deleted"])
+                )
+
+        counts = plans[0]["counts"]
+        counts["changed_tables"] = plans[0]["changed_tables"]
+        if len(plans) > 1:
+            counts["columns"] = plans[1]["counts"]
+        if is_join_graph_enabled():
+            graph = JoinGraph.from_template(semantics_data)
+            previous = self.load_join_graph()
+            self.save_join_graph(graph)
+            counts["join_graph"] = {
+                "tables": len(graph.tables),
+                "edges": len(graph.edges),
+                "changed": previous is None or previous.to_dict() != graph.to_dict(),
+            }
+        return counts
+
+    def save_join_graph(self, graph: JoinGraph):
+        """Store the join graph as the single point of {collection}__join_graph"""
+        from qdrant_client.models import PointStruct
         client = get_qdrant_client()
-        if client.collection_exists(self.collection_name):
-            client.delete_collection(self.collection_name)
-        self.create_collection()
-        
-        # Process the semantics data
-        schemas = semantics_data.get('schemas', {})
-        total_tables = sum(len(schema_data.get('tables', [])) for schema_data in schemas.values())
-        
-        # Handle the exact structure you showed
-        # Check if this is a single table structure (has database_name but no schemas)
+        collection_name = join_graph_collection_name(self.collection_name)
+        if not client.collection_exists(collection_name):
+            client.create_collection(collection_name=collection_name, vectors_config={})
+        client.upsert(
+            collection_name=collection_name,
+            points=[PointStruct(id=JOIN_GRAPH_POINT_ID, vector={}, payload=graph.to_dict())]
+        )
+
+    def load_join_graph(self) -> Optional[JoinGraph]:
+        """The collection's join graph, or None if it was indexed without one"""
+        client = get_qdrant_client()
+        collection_name = join_graph_collection_name(self.collection_name)
+        if not client.collection_exists(collection_name):
+            return None
+        points = client.retrieve(collection_name=collection_name, ids=[JOIN_GRAPH_POINT_ID], with_payload=True)
+        return JoinGraph.from_dict(points[0].payload) if points else None
+
+    async def aload_join_graph(self) -> Optional[JoinGraph]:
+        client = get_async_qdrant_client()
+        collection_name = join_graph_collection_name(self.collection_name)
+        if not await client.collection_exists(collection_name):
+            return None
+        points = await client.retrieve(collection_name=collection_name, ids=[JOIN_GRAPH_POINT_ID], with_payload=True)
+        return JoinGraph.from_dict(points[0].payload) if points else None
+
+    def get_tables(self, keys: List[str]) -> List[Dict]:
+        """Table results by qualified name (schema.table), in the order given"""
+        if not keys:
+            return []
+        points = get_qdrant_client().retrieve(
+            collection_name=self.collection_name, ids=[table_point_id(key) for key in keys], with_payload=True
+        )
+        return self._ordered_tables(keys, points)
+
+    async def aget_tables(self, keys: List[str]) -> List[Dict]:
+        if not keys:
+            return []
+        points = await get_async_qdrant_client().retrieve(
+            collection_name=self.collection_name, ids=[table_point_id(key) for key in keys], with_payload=True
+        )
+        return self._ordered_tables(keys, points)
+
+    def _ordered_tables(self, keys: List[str], points) -> List[Dict]:
+        by_id = {str(point.id): result for point, result in zip(points, self._to_results(points))}
+        return [by_id[table_point_id(key)] for key in keys if table_point_id(key) in by_id]
+
+    def _plan_sync(self, collection_name: str, entries: List[Dict], mode: str) -> Dict[str, Any]:
+        """Entries to upsert and point IDs to delete so the collection matches entries"""
+        if mode == "full":
+            self.create_collection(collection_name)
+            existing = {}
+        elif self.ensure_collection(collection_name):
+            existing = {}
+        else:
+            existing = self._existing_points(collection_name)
+
+        added = [e for e in entries if e["id"] not in existing]
+        updated = [e for e in entries if e["id"] in existing and existing[e["id"]].get("content_hash", "") != e["payload"]["content_hash"]]
+        current_ids = {e["id"] for e in entries}
+        deleted = [point_id for point_id in existing if point_id not in current_ids]
+        changed = [e["payload"] for e in added + updated] + [existing[point_id] for point_id in deleted]
+        return {
+            "collection_name": collection_name,
+            "upserts": added + updated,
+            "deleted": deleted,
+            "changed_tables": sorted({".".join(filter(None, (p.get("schema_name"), p.get("table_name")))) for p in changed}),
+            "counts": {
+                "added": len(added),
+                "updated": len(updated),
+                "unchanged": len(entries) - len(added) - len(updated),
+                "deleted": len(deleted),
+            },
+        }
+
+    def _existing_points(self, collection_name: str) -> Dict[str, Dict[str, str]]:
+        """Point ID -> stored content hash and table name for every point in the collection"""
+        client = get_qdrant_client()
+        hashes, offset = {}, None
+        while True:
+            points, offset = client.scroll(
+                collection_name=collection_name,
+                limit=1000,
+                offset=offset,
+                with_payload=["content_hash", "schema_name", "table_name"],
+                with_vectors=False
+            )
+            for point in points:
+                hashes[str(point.id)] = point.payload or {}
+            if offset is None:
+                return hashes
+
+    def _table_entries(self, semantics_data: Dict) -> List[Dict]:
+        """Searchable text, payload and deterministic point ID for every table in the template"""
+        # Single table structure (has database_name but no schemas)
         if "database_name" in semantics_data and "schemas" not in semantics_data:
-            # Single table structure - store as one point
             table = semantics_data
             table_name = table.get('table_name', '')
             
@@ -96,127 +431,38 @@ class HybridRetrieval:
             columns_summary = table.get('columns_summary', [])
             for col in columns_summary:
                 searchable_content += f" {col.get('column_name', '')} {col.get('data_type', '')} {col.get('description', '')}"
-            
-            # Add index information to searchable content
-            for idx in table.get('indexes', []):
-                index_name = idx.get('index_name', '')
-                index_columns = idx.get('columns', [])
-                index_type = idx.get('index_type', '')
-                if index_name:
-                    searchable_content += f" index {index_name} {index_type}"
-                if index_columns:
-                    searchable_content += f" {' '.join(index_columns)}"
-            
-            # Generate both dense and sparse embeddings for the searchable content
-            dense_vector = self.dense_embeddings.embed_query(searchable_content)
-            sparse_vector_obj = self.sparse_embeddings.embed_query(searchable_content)
-            
-            # Store as single point with all table data in payload
-            import uuid
-            from qdrant_client.models import SparseVector
-            point_id = str(uuid.uuid4())
-            client.upsert(
-                collection_name=self.collection_name,
-                points=[
-                    {
-                        "id": point_id,
-                        "vector": {
-                            "dense": dense_vector,
-                            "sparse": SparseVector(
-                                indices=sparse_vector_obj.indices.tolist(),
-                                values=sparse_vector_obj.values.tolist()
-                            )
-                        },
-                        "payload": {
-                            "database_name": table.get('database_name', ''),
-                            "database_type": table.get('database_type', ''),
-                            "schema_name": table.get('schema_name', ''),
-                            "table_name": table_name,
-                            "table_description": table.get('table_description', ''),
-                            "primary_key": table.get('primary_key', []),
-                            "foreign_keys": table.get('foreign_keys', []),
-                            "columns_summary": columns_summary,
-                            "indexes": table.get('indexes', []),
-                            "column_count": table.get('column_count', 0),
-                            "idempotency_key": table.get('idempotency_key', '')
-                        }
-                    }
-                ]
-            )
-        else:
-            # Handle nested schemas structure with BATCH PROCESSING
-            self._batch_index_tables(semantics_data)
-    
-    def _batch_index_tables(self, semantics_data: Dict):
-        """Batch process tables for maximum performance with chunking for large datasets"""
-        import uuid
-        from qdrant_client.models import SparseVector
-        
-        # Collect all tables and their data
-        all_tables = []
+            searchable_content += _index_text(table)
+
+            payload = {
+                "database_name": table.get('database_name', ''),
+                "database_type": table.get('database_type', ''),
+                "schema_name": table.get('schema_name', ''),
+                "table_name": table_name,
+                "table_description": table.get('table_description', ''),
+                "primary_key": table.get('primary_key', []),
+                "foreign_keys": table.get('foreign_keys', []),
+                "columns_summary": columns_summary,
+                "indexes": table.get('indexes', []),
+                "column_count": table.get('column_count', 0),
+                "idempotency_key": table.get('idempotency_key', '')
+            }
+            key = f"{table.get('database_name', '')}.{table.get('schema_name', '')}.{table_name}"
+            return [_point_entry(key, searchable_content, payload)]
+
+        entries = []
         for schema_name, schema_data in semantics_data.get("schemas", {}).items():
             for table in schema_data.get("tables", []):
-                all_tables.append({
-                    'schema_name': schema_name,
-                    'table': table
-                })
-        
-        # Batch 1: Generate all searchable content (vectorized)
-        searchable_contents = []
-        for table_data in all_tables:
-            schema_name = table_data['schema_name']
-            table = table_data['table']
-            table_name = table['table_name']
-            
-            # Create searchable text content
-            searchable_content = f"{schema_name} {table_name} {table.get('description', '')}"
-            
-            # Add column information to searchable content
-            for col in table.get('columns', []):
-                searchable_content += f" {col.get('column_name', '')} {col.get('data_type', '')} {col.get('description', '')}"
-            
-            # Add index information to searchable content
-            for idx in table.get('indexes', []):
-                index_name = idx.get('index_name', '')
-                index_columns = idx.get('columns', [])
-                index_type = idx.get('index_type', '')
-                if index_name:
-                    searchable_content += f" index {index_name} {index_type}"
-                if index_columns:
-                    searchable_content += f" {' '.join(index_columns)}"
-            
-            searchable_contents.append({
-                'content': searchable_content,
-                'schema_name': schema_name,
-                'table': table
-            })
-        
-        # Batch 2: Generate all embeddings in batch (MASSIVE performance gain!)
-        texts = [item['content'] for item in searchable_contents]
-        
-        # Generate embeddings in batch - this is the key optimization!
-        # Instead of 26 individual API calls, we make just 2 batch calls!
-        dense_vectors = self.dense_embeddings.embed_documents(texts)
-        sparse_vectors = self.sparse_embeddings.embed_documents(texts)
-        
-        # Batch 3: Prepare all points for batch upsert (vectorized)
-        points = []
-        for i, item in enumerate(searchable_contents):
-            schema_name = item['schema_name']
-            table = item['table']
-            table_name = table['table_name']
-            
-            point_id = str(uuid.uuid4())
-            points.append({
-                "id": point_id,
-                "vector": {
-                    "dense": dense_vectors[i],
-                    "sparse": SparseVector(
-                        indices=sparse_vectors[i].indices.tolist(),
-                        values=sparse_vectors[i].values.tolist()
-                    )
-                },
-                "payload": {
+                table_name = table['table_name']
+                
+                # Create searchable text content
+                searchable_content = f"{schema_name} {table_name} {table.get('description', '')}"
+                
+                # Add column information to searchable content
+                for col in table.get('columns', []):
+                    searchable_content += f" {col.get('column_name', '')} {col.get('data_type', '')} {col.get('description', '')}"
+                searchable_content += _index_text(table)
+
+                payload = {
                     "schema_name": schema_name,
                     "table_name": table_name,
                     "description": table.get('description', ''),
@@ -225,13 +471,68 @@ class HybridRetrieval:
                     "columns": table.get('columns', []),
                     "indexes": table.get('indexes', [])
                 }
-            })
+                entries.append(_point_entry(f"{schema_name}.{table_name}", searchable_content, payload))
+        return entries
+    
+    def _upsert_entries(
+        self,
+        entries: List[Dict],
+        progress: Optional[Callable[[int, int], None]] = None,
+        collection_name: Optional[str] = None
+    ):
+        """
+        Embed and upsert entries in chunks with bounded parallelism
+
+        Each chunk's dense (Azure) and sparse (BM42) embeddings are computed concurrently and the
+        chunk is upserted as soon as both are ready, so request and payload sizes stay bounded by
+        INDEX_BATCH_SIZE and at most INDEX_CONCURRENCY chunks are in flight.
+        """
+        if not entries:
+            return
+        batch_size, concurrency = index_batch_size(), index_concurrency()
+        chunks = [entries[i:i + batch_size] for i in range(0, len(entries), batch_size)]
+        done = 0
+
+        def index_chunk(chunk: List[Dict], sparse_pool: ThreadPoolExecutor) -> int:
+            texts = [entry['content'] for entry in chunk]
+            sparse_future = sparse_pool.submit(self.embed_documents_sparse, texts)
+            dense_vectors = self.embed_documents_dense(texts)
+            self._upsert_points(collection_name or self.collection_name, chunk, dense_vectors, sparse_future.result())
+            return len(chunk)
+
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="index-chunk") as chunk_pool, \
+                ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="index-sparse") as sparse_pool:
+            futures = [chunk_pool.submit(index_chunk, chunk, sparse_pool) for chunk in chunks]
+            try:
+                for future in as_completed(futures):
+                    done += future.result()
+                    if progress is not None:
+                        progress(done, len(entries))
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    def _upsert_points(self, collection_name: str, entries: List[Dict], dense_vectors, sparse_vectors):
+        from qdrant_client.models import PointStruct, SparseVector
+
+        points = []
+        for i, entry in enumerate(entries):
+            points.append(PointStruct(
+                id=entry["id"],
+                vector={
+                    "dense": dense_vectors[i],
+                    "sparse": SparseVector(
+                        indices=sparse_vectors[i].indices.tolist(),
+                        values=sparse_vectors[i].values.tolist()
+                    )
+                },
+                payload=entry["payload"]
+            ))
         
-        # Batch 4: Single upsert call for all points (MASSIVE performance gain!)
-        # Instead of 26 individual upsert calls, we make just 1 batch call!
         client = get_qdrant_client()
         client.upsert(
-            collection_name=self.collection_name,
+            collection_name=collection_name,
             points=points
         )
     
@@ -243,12 +544,16 @@ class HybridRetrieval:
             query: Search query
             k: Number of results to return
             use_reranking: Override reranking setting (None = use instance default)
+
+        Reranking gets RERANK_TIMEOUT_MS (capped by what is left of RETRIEVAL_DEADLINE_MS when
+        set); when it runs out or fails, the RRF results are returned with rerank_fallback set.
         """
+        deadline = _retrieval_deadline()
         client = get_qdrant_client()
         
-        # Generate both dense and sparse embeddings for the query
-        dense_vector = self.dense_embeddings.embed_query(query)
-        sparse_vector = self.sparse_embeddings.embed_query(query)
+        # Generate both dense and sparse embeddings for the query (served from cache when repeated)
+        dense_vector = self.embed_query_dense(query)
+        sparse_vector = self.embed_query_sparse(query)
         
         # Determine if we should use reranking
         should_rerank = use_reranking if use_reranking is not None else self.use_reranking
@@ -257,11 +562,167 @@ class HybridRetrieval:
         search_k = k * 3 if should_rerank else k
         
         # HYBRID SEARCH: Single call using Qdrant's Query API with fusion
-        from qdrant_client.models import Prefetch, FusionQuery, Fusion, SparseVector
+        search_results = client.query_points(**self._hybrid_query(dense_vector, sparse_vector, search_k))
+        results = self._to_results(search_results.points)
+        
+        # Apply reranking if enabled and reranker is available
+        if should_rerank and self.reranker and results:
+            return self._rerank(query, results, k, deadline)
+        
+        return self._mark_not_reranked(results, k)
+
+    def _rerank(self, query: str, results: List[Dict], k: int, deadline: Optional[float]) -> List[Dict]:
+        """Reranked results, or the RRF results when the reranker misses its deadline or fails"""
+        cache_key = rerank_cache_key(self.reranker.name, query, results, k)
+        cached = self._cached_rerank(cache_key, results)
+        if cached is not None:
+            return cached
+        remaining = _rerank_budget(deadline)
+        if remaining <= 0:
+            return self._mark_not_reranked(results, k, fallback="deadline")
+
+        future = get_rerank_pool().try_submit(self.reranker.rerank_results, query, results, k)
+        if future is None:
+            logger.warning(f"All {self.reranker.name} rerank workers are busy; using RRF order")
+            return self._mark_not_reranked(results, k, fallback="saturated")
+        try:
+            reranked_results = future.result(timeout=remaining)
+        except FutureTimeoutError:
+            logger.warning(f"Reranker {self.reranker.name} missed its {remaining * 1000:.0f} ms budget; using RRF order")
+            # Drop it if it never started; otherwise a late answer still warms the cache
+            if not future.cancel():
+                future.add_done_callback(lambda f: self._store_late_rerank(cache_key, f))
+            return self._mark_not_reranked(results, k, fallback="timeout")
+        except Exception as e:
+            logger.warning(f"Reranker {self.reranker.name} failed, using RRF order: {e}")
+            return self._mark_not_reranked(results, k, fallback="error")
+        if self.rerank_cache is not None:
+            self.rerank_cache.set(cache_key, reranked_results)
+        return self._mark_reranked(reranked_results)
+
+    async def _arerank(self, query: str, results: List[Dict], k: int, deadline: Optional[float]) -> List[Dict]:
+        cache_key = rerank_cache_key(self.reranker.name, query, results, k)
+        cached = self._cached_rerank(cache_key, results)
+        if cached is not None:
+            return cached
+        remaining = _rerank_budget(deadline)
+        if remaining <= 0:
+            return self._mark_not_reranked(results, k, fallback="deadline")
+
+        task = asyncio.ensure_future(self.reranker.arerank_results(query, results, k))
+        try:
+            # Shielded so a late answer still completes and warms the cache
+            reranked_results = await asyncio.wait_for(asyncio.shield(task), timeout=remaining)
+        except asyncio.TimeoutError:
+            logger.warning(f"Reranker {self.reranker.name} missed its {remaining * 1000:.0f} ms budget; using RRF order")
+            task.add_done_callback(lambda t: self._store_late_rerank(cache_key, t))
+            return self._mark_not_reranked(results, k, fallback="timeout")
+        except Exception as e:
+            logger.warning(f"Reranker {self.reranker.name} failed, using RRF order: {e}")
+            return self._mark_not_reranked(results, k, fallback="error")
+        if self.rerank_cache is not None:
+            self.rerank_cache.set(cache_key, reranked_results)
+        return self._mark_reranked(reranked_results)
+
+    def _cached_rerank(self, cache_key: str, results: List[Dict]) -> Optional[List[Dict]]:
+        if self.rerank_cache is None:
+            return None
+        ranked = self.rerank_cache.get(cache_key)
+        if ranked is None:
+            return None
+        return self._mark_reranked(from_ranked(results, ranked), cached=True)
+
+    def _store_late_rerank(self, cache_key: str, future):
+        if self.rerank_cache is None or future.cancelled() or future.exception() is not None:
+            return
+        self.rerank_cache.set(cache_key, future.result(), late=True)
+
+    async def asearch_tables(self, query: str, k: int = 20, use_reranking: Optional[bool] = None) -> List[Dict]:
+        """
+        Async variant of search_tables: embeddings, Qdrant query and reranking are awaited
+        and CPU-bound sparse inference runs in a worker thread, so the event loop stays free
+        
+        Args:
+            query: Search query
+            k: Number of results to return
+            use_reranking: Override reranking setting (None = use instance default)
+        """
+        deadline = _retrieval_deadline()
+        # Generate both dense and sparse embeddings for the query concurrently
+        dense_vector, sparse_vector = await asyncio.gather(
+            self.aembed_query_dense(query),
+            self.aembed_query_sparse(query)
+        )
         
+        should_rerank = use_reranking if use_reranking is not None else self.use_reranking
+        search_k = k * 3 if should_rerank else k
+        
+        client = get_async_qdrant_client()
+        search_results = await client.query_points(**self._hybrid_query(dense_vector, sparse_vector, search_k))
+        results = self._to_results(search_results.points)
+        
+        if should_rerank and self.reranker and results:
+            return await self._arerank(query, results, k, deadline)
+        
+        return self._mark_not_reranked(results, k)
+
+    def embed_documents_dense(self, texts: List[str]) -> List[List[float]]:
+        """Dense document embeddings, read from the embedding store when already computed"""
+        if self.embedding_store is None:
+            return self.dense_embeddings.embed_documents(texts)
+        return self.embedding_store.embed_documents(DENSE, DENSE_MODEL_NAME, texts, self.dense_embeddings.embed_documents)
+
+    def embed_documents_sparse(self, texts: List[str]) -> List[Any]:
+        """Sparse (BM42) document embeddings, read from the embedding store when already computed"""
+        if self.embedding_store is None:
+            return self.sparse_embeddings.embed_documents(texts)
+        return self.embedding_store.embed_documents(SPARSE, SPARSE_MODEL_NAME, texts, self.sparse_embeddings.embed_documents)
+
+    def embed_query_dense(self, query: str) -> List[float]:
+        """Dense query embedding through the embedding cache"""
+        return self.embedding_cache.get_or_compute(DENSE, DENSE_MODEL_NAME, query, self.dense_embeddings.embed_query)
+
+    def embed_query_sparse(self, query: str):
+        """Sparse (BM42) query embedding through the embedding cache"""
+        return self.embedding_cache.get_or_compute(SPARSE, SPARSE_MODEL_NAME, query, self.sparse_embeddings.embed_query)
+
+    async def aembed_query_dense(self, query: str) -> List[float]:
+        return await self.embedding_cache.aget_or_compute(DENSE, DENSE_MODEL_NAME, query, self.dense_embeddings.aembed_query)
+
+    async def aembed_query_sparse(self, query: str):
+        async def compute(text):
+            # BM42 inference is CPU-bound; keep it off the event loop
+            return await asyncio.to_thread(self.sparse_embeddings.embed_query, text)
+        return await self.embedding_cache.aget_or_compute(SPARSE, SPARSE_MODEL_NAME, query, compute)
+
+    def search_columns(self, query: str, k: int = 50) -> List[Dict]:
+        """Hybrid search over the column collection (one point per column), no reranking"""
+        dense_vector = self.embed_query_dense(query)
+        sparse_vector = self.embed_query_sparse(query)
+        client = get_qdrant_client()
         search_results = client.query_points(
-            collection_name=self.collection_name,
-            prefetch=[
+            **self._hybrid_query(dense_vector, sparse_vector, k, column_collection_name(self.collection_name))
+        )
+        return self._to_column_results(search_results.points)
+
+    async def asearch_columns(self, query: str, k: int = 50) -> List[Dict]:
+        dense_vector, sparse_vector = await asyncio.gather(
+            self.aembed_query_dense(query),
+            self.aembed_query_sparse(query)
+        )
+        client = get_async_qdrant_client()
+        search_results = await client.query_points(
+            **self._hybrid_query(dense_vector, sparse_vector, k, column_collection_name(self.collection_name))
+        )
+        return self._to_column_results(search_results.points)
+
+    def _hybrid_query(self, dense_vector, sparse_vector, search_k: int, collection_name: Optional[str] = None) -> Dict:
+        """Build query_points arguments for dense + sparse prefetch fused with RRF"""
+        from qdrant_client.models import Prefetch, FusionQuery, Fusion, SparseVector
+        
+        return {
+            "collection_name": collection_name or self.collection_name,
+            "prefetch": [
                 Prefetch(
                     query=dense_vector,
                     using="dense",  # Dense vector field name
@@ -278,18 +739,17 @@ class HybridRetrieval:
                     score_threshold=0.2
                 )
             ],
-            query=FusionQuery(
+            "query": FusionQuery(
                 fusion=Fusion.RRF  # Reciprocal Rank Fusion
             ),
-            limit=search_k,
-            with_payload=True
-        )
-        
-        # Convert results to list of dictionaries
+            "limit": search_k,
+            "with_payload": True
+        }
+
+    def _to_results(self, points) -> List[Dict]:
+        """Convert Qdrant points to list of dictionaries"""
         results = []
-        search_results = search_results.points
-        
-        for result in search_results:
+        for result in points:
             results.append({
                 "table_name": result.payload.get("table_name", ""),
                 "database_name": result.payload.get("database_name", ""),
@@ -302,24 +762,38 @@ class HybridRetrieval:
                 "indexes": result.payload.get("indexes", []),
                 "column_count": result.payload.get("column_count", 0),
                 "idempotency_key": result.payload.get("idempotency_key", ""),
-                "score": result.score
+                "content_hash": result.payload.get("content_hash", ""),
+                "score": getattr(result, "score", None)  # Retrieved (not searched) points have no score
             })
+        return results
+
+    def _to_column_results(self, points) -> List[Dict]:
+        return [
+            {
+                "schema_name": point.payload.get("schema_name", ""),
+                "table_name": point.payload.get("table_name", ""),
+                "column_name": point.payload.get("column_name", ""),
+                "column": point.payload.get("column", {}),
+                "score": point.score
+            }
+            for point in points
+        ]
+
+    def _mark_reranked(self, reranked_results: List[Dict], cached: bool = False) -> List[Dict]:
+        # Add reranking metadata
+        for i, result in enumerate(reranked_results):
+            result["final_rank"] = i + 1
+            result["reranking_applied"] = True
+            result["rerank_cached"] = cached
         
-        # Apply reranking if enabled and reranker is available
-        if should_rerank and self.reranker and results:
-            reranked_results = self.reranker.rerank_results(query, results, k)
-            
-            # Add reranking metadata
-            for i, result in enumerate(reranked_results):
-                result["final_rank"] = i + 1
-                result["reranking_applied"] = True
-            
-            return reranked_results
-        
-        # Return original results
+        return reranked_results
+
+    def _mark_not_reranked(self, results: List[Dict], k: int, fallback: Optional[str] = None) -> List[Dict]:
+        # Return original results (fallback: why reranking was skipped - deadline, timeout, saturated, error)
         final_results = results[:k]
         for result in final_results:
             result["reranking_applied"] = False
+            if fallback:
+                result["rerank_fallback"] = fallback
         
         return final_results
-
@@ -0,0 +1,162 @@
+"""
+Background indexing jobs
+Index requests run on a small worker pool so /api/v1/index returns immediately with a job ID;
+the job record tracks status, progress and throughput for the status endpoint. Requests that
+wait for the result run in the caller's thread but are recorded the same way, so at most one
+index run per collection is queued or running either way.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class JobConflictError(Exception):
+    """Raised when a collection already has an index job queued or running"""
+
+
+@dataclass
+class IndexJob:
+    job_id: str
+    collection_name: str
+    template_path: str
+    mode: str
+    status: str = QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    # Tables to (re-)embed and how many have been upserted so far
+    total: int = 0
+    done: int = 0
+    result: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def progress(self, done: int, total: int):
+        self.done, self.total = done, total
+
+    def to_dict(self) -> Dict[str, Any]:
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        return {
+            "job_id": self.job_id,
+            "collection_name": self.collection_name,
+            "template_path": self.template_path,
+            "mode": self.mode,
+            "status": self.status,
+            "progress": {
+                "done": self.done,
+                "total": self.total,
+                "percent": round(100 * self.done / self.total, 1) if self.total else (100.0 if self.status == SUCCEEDED else 0.0),
+            },
+            "elapsed_s": round(elapsed, 3),
+            "tables_per_second": round(self.done / elapsed, 2) if elapsed > 0 else 0.0,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class IndexJobManager:
+    """
+    Runs index jobs in the background and keeps the most recent job records
+
+    Args:
+        max_workers: Jobs running at the same time (each job chunks its own work further)
+        max_history: Finished jobs kept for the status endpoint
+    """
+
+    def __init__(self, max_workers: int = 1, max_history: int = 100):
+        self.max_history = max_history
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="index-job")
+        self._jobs: "OrderedDict[str, IndexJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _register(self, collection_name: str, template_path: str, mode: str) -> IndexJob:
+        with self._lock:
+            for job in self._jobs.values():
+                if job.collection_name == collection_name and job.status in (QUEUED, RUNNING):
+                    raise JobConflictError(f"Collection {collection_name} is already being indexed by job {job.job_id}")
+            job = IndexJob(job_id=uuid.uuid4().hex, collection_name=collection_name, template_path=template_path, mode=mode)
+            self._jobs[job.job_id] = job
+            self._trim()
+        return job
+
+    def submit(self, collection_name: str, template_path: str, mode: str, func: Callable[[IndexJob], Dict[str, Any]]) -> IndexJob:
+        """Queue func(job); its return value becomes the job result"""
+        job = self._register(collection_name, template_path, mode)
+        self._executor.submit(self._run, job, func)
+        return job
+
+    def run(self, collection_name: str, template_path: str, mode: str, func: Callable[[IndexJob], Dict[str, Any]]) -> IndexJob:
+        """Run func(job) in the calling thread, with the same conflict check as submit"""
+        job = self._register(collection_name, template_path, mode)
+        self._run(job, func)
+        return job
+
+    def _run(self, job: IndexJob, func: Callable[[IndexJob], Dict[str, Any]]):
+        job.status, job.started_at = RUNNING, time.time()
+        try:
+            job.result = func(job)
+            job.status = SUCCEEDED
+        except Exception as e:
+            logger.exception(f"Index job {job.job_id} failed")
+            job.error, job.status = str(e), FAILED
+        finally:
+            job.finished_at = time.time()
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in (SUCCEEDED, FAILED)]
+        for job_id in finished[:max(len(self._jobs) - self.max_history, 0)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[IndexJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[IndexJob]:
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_manager: Optional[IndexJobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_index_jobs() -> IndexJobManager:
+    """Return the process-wide index job manager configured from the environment"""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = IndexJobManager(
+                    max_workers=int(os.getenv("INDEX_JOB_WORKERS", 1)),
+                    max_history=int(os.getenv("INDEX_JOB_HISTORY", 100))
+                )
+    return _manager
+
+
+def close_index_jobs():
+    """Stop accepting jobs (called on application shutdown)"""
+    global _manager
+    with _manager_lock:
+        manager, _manager = _manager, None
+    if manager is not None:
+        manager.close()
@@ -0,0 +1,188 @@
+"""
+Foreign-key join graph
+Built from the semantic template at index time and stored as a single point in the
+{collection}__join_graph collection. For the tables a search returned, join_paths finds a
+minimal set of foreign-key joins connecting them (a Steiner tree approximation over the
+undirected FK graph), including bridge tables that were not retrieved, so the text-to-SQL
+prompt gets explicit join conditions instead of leaving join discovery to the LLM.
+"""
+
+import os
+import uuid
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+JOIN_GRAPH_POINT_ID = str(uuid.uuid5(uuid.NAMESPACE_URL, "convbi/semantics/join_graph"))
+
+
+def join_graph_collection_name(collection_name: str) -> str:
+    return f"{collection_name}__join_graph"
+
+
+def is_join_graph_enabled() -> bool:
+    return os.getenv("JOIN_GRAPH_ENABLED", "true").lower() == "true"
+
+
+def join_graph_max_bridges() -> int:
+    """Tables a join path may pass through between two retrieved tables"""
+    return max(int(os.getenv("JOIN_GRAPH_MAX_BRIDGE_TABLES", 2)), 0)
+
+
+def template_tables(semantics_data: Dict) -> Iterator[Tuple[str, str, Dict]]:
+    """(qualified key, schema name, table) for every table, keyed like the table points"""
+    if "database_name" in semantics_data and "schemas" not in semantics_data:
+        table = semantics_data
+        key = f"{table.get('database_name', '')}.{table.get('schema_name', '')}.{table.get('table_name', '')}"
+        yield key, table.get("schema_name", ""), table
+        return
+    for schema_name, schema_data in semantics_data.get("schemas", {}).items():
+        for table in schema_data.get("tables", []):
+            yield f"{schema_name}.{table['table_name']}", schema_name, table
+
+
+def column_names(value: Any) -> List[str]:
+    """Column list of a key, foreign key or index definition (one name or a composite list)"""
+    if isinstance(value, (list, tuple)):
+        return [str(v) for v in value]
+    return [str(value)] if value else []
+
+
+class JoinGraph:
+    """
+    Undirected graph of tables connected by foreign keys
+
+    Args:
+        tables: Qualified key -> {"schema_name", "table_name"}
+        edges: Foreign keys as {"from", "from_columns", "to", "to_columns"} (qualified keys)
+    """
+
+    def __init__(self, tables: Dict[str, Dict[str, str]], edges: List[Dict[str, Any]]):
+        self.tables = tables
+        self.edges = edges
+        self._adjacency: Dict[str, List[Tuple[str, int]]] = {key: [] for key in tables}
+        for i, edge in enumerate(edges):
+            self._adjacency[edge["from"]].append((edge["to"], i))
+            self._adjacency[edge["to"]].append((edge["from"], i))
+        self._by_name: Dict[str, List[str]] = {}
+        self._by_schema_name: Dict[Tuple[str, str], str] = {}
+        for key, table in tables.items():
+            self._by_name.setdefault(table["table_name"], []).append(key)
+            self._by_schema_name.setdefault((table["schema_name"], table["table_name"]), key)
+
+    @classmethod
+    def from_template(cls, semantics_data: Dict) -> "JoinGraph":
+        tables, foreign_keys = {}, []
+        for key, schema_name, table in template_tables(semantics_data):
+            tables[key] = {"schema_name": schema_name, "table_name": table.get("table_name", "")}
+            foreign_keys.extend((key, schema_name, fk) for fk in table.get("foreign_keys", []) or [] if isinstance(fk, dict))
+
+        graph = cls(tables, [])
+        edges = []
+        for key, schema_name, fk in foreign_keys:
+            references = fk.get("references") or {}
+            if not isinstance(references, dict):
+                continue
+            target = graph.resolve(str(references.get("table", "")), references.get("schema") or schema_name)
+            # FKs to tables outside the template cannot be joined through
+            if target is None or not column_names(fk.get("column")) or not column_names(references.get("column")):
+                continue
+            edges.append({
+                "from": key,
+                "from_columns": column_names(fk.get("column")),
+                "to": target,
+                "to_columns": column_names(references.get("column")),
+            })
+        return cls(tables, edges)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "JoinGraph":
+        return cls(data.get("tables", {}), data.get("edges", []))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"tables": self.tables, "edges": self.edges}
+
+    def resolve(self, table_name: str, schema_name: Optional[str] = None) -> Optional[str]:
+        """Qualified key of a table: exact key, same-schema name, or a name unique across schemas"""
+        if table_name in self.tables:
+            return table_name
+        if "." in table_name:
+            schema_name, table_name = table_name.rsplit(".", 1)
+        if schema_name and (schema_name, table_name) in self._by_schema_name:
+            return self._by_schema_name[(schema_name, table_name)]
+        candidates = self._by_name.get(table_name, [])
+        return candidates[0] if len(candidates) == 1 else None
+
+    def sql_name(self, key: str) -> str:
+        table = self.tables[key]
+        return f"{table['schema_name']}.{table['table_name']}" if table["schema_name"] else table["table_name"]
+
+    def _nearest(self, sources: set, targets: List[str], max_hops: int) -> Optional[List[Tuple[str, int]]]:
+        """Shortest path (node, edge index) from any source to the closest target, within max_hops"""
+        parent: Dict[str, Optional[Tuple[str, int]]] = {node: None for node in sources}
+        wanted = set(targets)
+        queue = deque((node, 0) for node in sources)
+        while queue:
+            node, hops = queue.popleft()
+            if node in wanted:
+                path = []
+                while parent[node] is not None:
+                    previous, edge = parent[node]
+                    path.append((node, edge))
+                    node = previous
+                return path[::-1]
+            if hops == max_hops:
+                continue
+            for neighbour, edge in self._adjacency[node]:
+                if neighbour not in parent:
+                    parent[neighbour] = (node, edge)
+                    queue.append((neighbour, hops + 1))
+        return None
+
+    def join_paths(self, tables: List[str], max_bridges: int = 2) -> Dict[str, Any]:
+        """
+        Minimal joins connecting tables (qualified keys, most relevant first)
+
+        Grows a tree from the first table, repeatedly attaching the closest remaining table by its
+        shortest FK path; tables more than max_bridges intermediate tables away from every tree
+        start a tree of their own. Returns the joins, the bridge tables that had to be pulled in,
+        and the tables no join path reaches.
+        """
+        terminals = list(dict.fromkeys(key for key in tables if key in self.tables))
+        if not terminals:
+            return {"joins": [], "bridge_tables": [], "unconnected": []}
+
+        tree = {terminals[0]}
+        edges: List[int] = []
+        remaining = terminals[1:]
+        while remaining:
+            path = self._nearest(tree, remaining, max_bridges + 1)
+            if path is None:
+                # Nothing left within reach: the next table starts its own tree
+                tree.add(remaining.pop(0))
+                continue
+            for node, edge in path:
+                if edge not in edges:
+                    edges.append(edge)
+                tree.add(node)
+            remaining = [key for key in remaining if key not in tree]
+
+        joined = list(dict.fromkeys(node for i in edges for node in (self.edges[i]["from"], self.edges[i]["to"])))
+        return {
+            "joins": [self._join(self.edges[i]) for i in edges],
+            "bridge_tables": [key for key in joined if key not in terminals],
+            "unconnected": [key for key in terminals if key not in joined] if len(terminals) > 1 else [],
+        }
+
+    def _join(self, edge: Dict[str, Any]) -> Dict[str, Any]:
+        left, right = self.sql_name(edge["from"]), self.sql_name(edge["to"])
+        condition = " AND ".join(
+            f"{left}.{left_column} = {right}.{right_column}"
+            for left_column, right_column in zip(edge["from_columns"], edge["to_columns"])
+        )
+        return {
+            "left_table": left,
+            "left_columns": edge["from_columns"],
+            "right_table": right,
+            "right_columns": edge["to_columns"],
+            "condition": condition,
+        }
@@ -0,0 +1 @@
+# PostgreSQL services
@@ -0,0 +1,125 @@
+"""
+PostgreSQL connection pools for query execution
+Connections are opened once, health-checked on checkout and reused across requests
+"""
+
+import os
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, Optional
+from urllib.parse import quote_plus
+
+from psycopg_pool import ConnectionPool, AsyncConnectionPool
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ConnectionPool] = None
+_async_pool: Optional[AsyncConnectionPool] = None
+_pool_lock = threading.Lock()
+_async_pool_lock: Optional[asyncio.Lock] = None
+
+
+def get_database_url() -> str:
+    """Build the target database URL from environment configuration"""
+    q_user = os.getenv('QUERY_DB_USER')
+    q_pass = os.getenv('QUERY_DB_PASSWORD', '')
+    q_host = os.getenv('QUERY_DB_HOST')
+    q_port = os.getenv('QUERY_DB_PORT')
+    q_name = os.getenv('QUERY_DB_NAME')
+    sslmode = os.getenv('QUERY_DB_SSLMODE', 'require')
+    encoded_q_pass = quote_plus(q_pass or '')
+    return f"postgresql://{q_user}:{encoded_q_pass}@{q_host}:{q_port}/{q_name}?sslmode={sslmode}"
+
+
+def get_database_identity() -> str:
+    """Stable identifier of the target database (used to scope cached results)"""
+    return f"{os.getenv('QUERY_DB_HOST')}:{os.getenv('QUERY_DB_PORT')}/{os.getenv('QUERY_DB_NAME')}"
+
+
+def _pool_kwargs() -> Dict[str, Any]:
+    """Pool sizing and lifetime settings shared by the sync and async pools"""
+    return {
+        "min_size": int(os.getenv("QUERY_DB_POOL_MIN_SIZE", 1)),
+        "max_size": int(os.getenv("QUERY_DB_POOL_MAX_SIZE", 10)),
+        "timeout": float(os.getenv("QUERY_DB_POOL_TIMEOUT", 30)),
+        "max_idle": float(os.getenv("QUERY_DB_POOL_MAX_IDLE", 600)),
+        "max_lifetime": float(os.getenv("QUERY_DB_POOL_MAX_LIFETIME", 3600)),
+        # Queries are read-only; autocommit avoids leaving idle transactions on returned connections
+        "kwargs": {"autocommit": True},
+    }
+
+
+def get_db_pool() -> ConnectionPool:
+    """Return the process-wide connection pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    get_database_url(),
+                    name="query-db",
+                    check=ConnectionPool.check_connection,
+                    open=True,
+                    **_pool_kwargs()
+                )
+    return _pool
+
+
+async def get_async_db_pool() -> AsyncConnectionPool:
+    """Return the process-wide asyncio connection pool, creating it on first use"""
+    global _async_pool, _async_pool_lock
+    if _async_pool is None:
+        if _async_pool_lock is None:
+            _async_pool_lock = asyncio.Lock()
+        async with _async_pool_lock:
+            if _async_pool is None:
+                pool = AsyncConnectionPool(
+                    get_database_url(),
+                    name="query-db-async",
+                    check=AsyncConnectionPool.check_connection,
+                    open=False,
+                    **_pool_kwargs()
+                )
+                await pool.open()
+                _async_pool = pool
+    return _async_pool
+
+
+async def warm_up_db_pool(timeout: Optional[float] = None) -> bool:
+    """
+    Open the async pool and wait until min_size connections are established
+
+    Returns:
+        True if the pool is warm, False if the database could not be reached in time
+        (the pool keeps reconnecting in the background)
+    """
+    timeout = timeout if timeout is not None else float(os.getenv("QUERY_DB_POOL_WARMUP_TIMEOUT", 10))
+    try:
+        pool = await get_async_db_pool()
+        await pool.wait(timeout=timeout)
+        return True
+    except Exception as e:
+        logger.warning(f"Database pool warm-up failed: {e}")
+        return False
+
+
+def get_db_pool_stats() -> Dict[str, Any]:
+    """Return pool statistics (sizes, waiting clients, connection errors, ...)"""
+    stats = {}
+    if _pool is not None:
+        stats["sync"] = _pool.get_stats()
+    if _async_pool is not None:
+        stats["async"] = _async_pool.get_stats()
+    return stats
+
+
+async def close_db_pools():
+    """Close all pools (called on application shutdown)"""
+    global _pool, _async_pool
+    if _async_pool is not None:
+        await _async_pool.close()
+        _async_pool = None
+    if _pool is not None:
+        _pool.close()
+        _pool = None
@@ -1,14 +1,61 @@
 import os
-from qdrant_client import QdrantClient
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
+from qdrant_client import QdrantClient, AsyncQdrantClient
+
+# Clients are created once per process and reused, so every call shares the same
+# HTTP keep-alive connections (or gRPC channel when QDRANT_PREFER_GRPC is enabled)
+_client: Optional[QdrantClient] = None
+_async_client: Optional[AsyncQdrantClient] = None
+_client_lock = threading.Lock()
+
+
+def _client_kwargs() -> Dict[str, Any]:
+    """Connection settings shared by the sync and async clients"""
+    return {
+        "url": os.getenv("QDRANT_URL", "http://localhost:6333"),
+        "api_key": os.getenv("QDRANT_API_KEY") or None,
+        "prefer_grpc": os.getenv("QDRANT_PREFER_GRPC", "false").lower() == "true",
+        "grpc_port": int(os.getenv("QDRANT_GRPC_PORT", 6334)),
+        "timeout": int(os.getenv("QDRANT_TIMEOUT", 30)),
+        # qdrant-client disables keep-alive for localhost by default; keep connections open instead
+        "limits": httpx.Limits(
+            max_connections=int(os.getenv("QDRANT_MAX_CONNECTIONS", 100)),
+            max_keepalive_connections=int(os.getenv("QDRANT_MAX_KEEPALIVE_CONNECTIONS", 20)),
+            keepalive_expiry=float(os.getenv("QDRANT_KEEPALIVE_EXPIRY", 30)),
+        ),
+    }
 
 
 def get_qdrant_client() -> QdrantClient:
-    url = os.getenv("QDRANT_URL", "http://localhost:6333")
-    api_key = os.getenv("QDRANT_API_KEY")
-    client = QdrantClient(url=url, api_key=api_key)
-    
-    # Set sparse model for BM25
-    client.set_sparse_model('Qdrant/bm25')
-    
-    return client
+    """Return the process-wide Qdrant client, creating it on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = QdrantClient(**_client_kwargs())
+    return _client
+
+
+def get_async_qdrant_client() -> AsyncQdrantClient:
+    """Return the process-wide async Qdrant client, creating it on first use"""
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                _async_client = AsyncQdrantClient(**_client_kwargs())
+    return _async_client
+
 
+async def close_qdrant_clients():
+    """Close the shared clients (called on application shutdown)"""
+    global _client, _async_client
+    with _client_lock:
+        client, async_client = _client, _async_client
+        _client, _async_client = None, None
+    if async_client is not None:
+        await async_client.close()
+    if client is not None:
+        client.close()
@@ -0,0 +1,116 @@
+"""
+In-process cache of rerank outcomes
+Keyed by reranker, normalized question and a hash of the candidate set (table identity and
+content hash), so a repeated question over an unchanged index skips the rerank call and a
+re-indexed table never reuses a stale order. Entries hold the reranked candidate keys and scores.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.embedding_cache import normalize_text
+
+RankedKeys = List[Tuple[str, float]]  # (candidate key, rerank score), best first
+
+
+def candidate_key(result: Dict[str, Any]) -> str:
+    return f"{result.get('schema_name', '')}.{result.get('table_name', '')}"
+
+
+def make_key(reranker: str, query: str, candidates: List[Dict[str, Any]], top_k: int) -> str:
+    candidate_set = sorted((candidate_key(r), r.get("content_hash", "")) for r in candidates)
+    digest = hashlib.sha256(
+        json.dumps([normalize_text(query), candidate_set, top_k]).encode("utf-8")
+    ).hexdigest()
+    return f"rerank:{reranker}:{digest}"
+
+
+class RerankCache:
+    """
+    LRU of rerank outcomes with a TTL
+
+    Args:
+        max_entries: Maximum number of outcomes kept
+        ttl_seconds: Age after which an outcome is recomputed
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: int = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, RankedKeys]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "late_stores": 0}
+
+    def get(self, key: str) -> Optional[RankedKeys]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+
+    def set(self, key: str, reranked: List[Dict[str, Any]], late: bool = False):
+        """Store reranked results; late marks an outcome that arrived after its deadline"""
+        ranked = [(candidate_key(r), float(r.get("rerank_score", 0.0))) for r in reranked]
+        with self._lock:
+            self._entries[key] = (time.monotonic(), ranked)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if late:
+                self._stats["late_stores"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+def from_ranked(candidates: List[Dict[str, Any]], ranked: RankedKeys) -> List[Dict[str, Any]]:
+    """Rebuild reranked results from the current candidates and a cached outcome"""
+    positions = {candidate_key(r): i for i, r in enumerate(candidates)}
+    results = []
+    for key, score in ranked:
+        i = positions.get(key)
+        if i is None:
+            continue
+        doc = candidates[i].copy()
+        doc["rerank_score"] = score
+        doc["rerank_rank"] = i
+        doc["original_score"] = candidates[i].get("score", 0.0)
+        results.append(doc)
+    return results
+
+
+_cache: Optional[RerankCache] = None
+_cache_lock = threading.Lock()
+
+
+def is_rerank_cache_enabled() -> bool:
+    return os.getenv("RERANK_CACHE_ENABLED", "true").lower() == "true"
+
+
+def get_rerank_cache() -> RerankCache:
+    """Return the process-wide rerank cache configured from the environment"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = RerankCache(
+                    max_entries=int(os.getenv("RERANK_CACHE_MAX_ENTRIES", 1024)),
+                    ttl_seconds=int(os.getenv("RERANK_CACHE_TTL", 3600))
+                )
+    return _cache
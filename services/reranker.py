@@ -0,0 +1,164 @@
+"""
+Pluggable rerankers for hybrid search results
+A reranker reorders the RRF-fused candidates of HybridRetrieval.search_tables by relevance to the
+question. Implementations:
+
+    cohere     Cohere Rerank API (services.cohere_reranker)
+    fastembed  Local ONNX cross-encoder via FastEmbed, scored in batches on CPU, no network
+    none       Keep the RRF order
+
+RERANKER selects the default and COLLECTION_RERANKERS ("collection:reranker,...") overrides it
+per collection.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+RERANKERS = ("cohere", "fastembed", "none")
+
+
+def rerank_document_text(doc: Dict[str, Any]) -> str:
+    """Text a reranker scores for a table search result"""
+    searchable_parts = []
+    if doc.get("table_name"):
+        searchable_parts.append(f"Table: {doc['table_name']}")
+    if doc.get("database_name"):
+        searchable_parts.append(f"Database: {doc['database_name']}")
+    if doc.get("schema_name"):
+        searchable_parts.append(f"Schema: {doc['schema_name']}")
+    if doc.get("table_description"):
+        searchable_parts.append(f"Description: {doc['table_description']}")
+
+    column_info = []
+    for col in doc.get("columns_summary", [])[:10]:  # Limit to first 10 columns
+        col_name = col.get("column_name", "")
+        if col_name:
+            col_text = f"{col_name} ({col.get('data_type', '')})"
+            if col.get("description"):
+                col_text += f": {col['description']}"
+            column_info.append(col_text)
+    if column_info:
+        searchable_parts.append(f"Columns: {', '.join(column_info)}")
+
+    primary_keys = doc.get("primary_key", [])
+    if primary_keys:
+        searchable_parts.append(f"Primary Keys: {', '.join(primary_keys)}")
+
+    fk_info = []
+    for fk in doc.get("foreign_keys", [])[:5]:  # Limit foreign keys
+        if isinstance(fk, dict) and "column" in fk:
+            fk_text = fk["column"]
+            ref = fk.get("references")
+            if isinstance(ref, dict) and "table" in ref:
+                fk_text += f" -> {ref['table']}"
+            fk_info.append(fk_text)
+    if fk_info:
+        searchable_parts.append(f"Foreign Keys: {', '.join(fk_info)}")
+
+    return " | ".join(searchable_parts)
+
+
+def reranked_documents(documents: List[Dict[str, Any]], scores: List[float], top_k: int) -> List[Dict[str, Any]]:
+    """Copies of documents ordered by score, with the rerank fields Cohere results carry"""
+    order = sorted(range(len(documents)), key=lambda i: scores[i], reverse=True)
+    results = []
+    for i in order[:top_k]:
+        doc = documents[i].copy()
+        doc["rerank_score"] = float(scores[i])
+        doc["rerank_rank"] = i
+        doc["original_score"] = documents[i].get("score", 0.0)
+        results.append(doc)
+    return results
+
+
+class Reranker(ABC):
+    """Interface of the rerankers HybridRetrieval can use"""
+
+    name = ""
+
+    @abstractmethod
+    def rerank_results(self, query: str, documents: List[Dict[str, Any]], top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Copies of the top_k documents, best first, with rerank_score, rerank_rank and original_score"""
+
+    async def arerank_results(self, query: str, documents: List[Dict[str, Any]], top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        # Local rerankers are CPU-bound: keep them off the event loop
+        return await asyncio.to_thread(self.rerank_results, query, documents, top_k)
+
+
+class FastEmbedReranker(Reranker):
+    """
+    Local ONNX cross-encoder reranker (FastEmbed TextCrossEncoder)
+
+    Args:
+        model_name: Cross-encoder model (LOCAL_RERANK_MODEL)
+        top_k: Default number of results to return
+        batch_size: Query/document pairs scored per ONNX run
+    """
+
+    name = "fastembed"
+
+    def __init__(self, model_name: str = "Xenova/ms-marco-MiniLM-L-6-v2", top_k: int = 10, batch_size: int = 32):
+        self.model_name = model_name
+        self.top_k = top_k
+        self.batch_size = batch_size
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        # Load the ONNX model lazily, exactly once, even under concurrent first use
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from fastembed.rerank.cross_encoder import TextCrossEncoder
+                    self._model = TextCrossEncoder(model_name=self.model_name)
+        return self._model
+
+    def score(self, query: str, texts: List[str]) -> List[float]:
+        return list(self.model.rerank(query, texts, batch_size=self.batch_size))
+
+    def rerank_results(self, query: str, documents: List[Dict[str, Any]], top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        if not documents:
+            return []
+        scores = self.score(query, [rerank_document_text(doc) for doc in documents])
+        return reranked_documents(documents, scores, top_k or self.top_k)
+
+
+def reranker_name(collection_name: str) -> str:
+    """Reranker for a collection: COLLECTION_RERANKERS entry, else RERANKER (default cohere)"""
+    for entry in os.getenv("COLLECTION_RERANKERS", "").split(","):
+        collection, _, name = entry.partition(":")
+        if collection.strip() == collection_name and name.strip():
+            return name.strip().lower()
+    return os.getenv("RERANKER", "cohere").lower()
+
+
+def create_reranker(name: str) -> Optional[Reranker]:
+    """Reranker by name, or None for "none" or when it cannot be initialized"""
+    top_k = int(os.getenv("RERANK_TOP_K", os.getenv("COHERE_RERANK_TOP_K", "10")))
+    try:
+        if name == "cohere":
+            from services.cohere_reranker import CohereReranker, RerankConfig
+            return CohereReranker(config=RerankConfig(
+                model=os.getenv("COHERE_RERANK_MODEL", "rerank-v3.5"),
+                top_k=top_k,
+                return_documents=True
+            ))
+        if name == "fastembed":
+            import fastembed.rerank.cross_encoder  # noqa: F401 - fail here rather than on the first search
+            return FastEmbedReranker(
+                model_name=os.getenv("LOCAL_RERANK_MODEL", "Xenova/ms-marco-MiniLM-L-6-v2"),
+                top_k=top_k,
+                batch_size=int(os.getenv("LOCAL_RERANK_BATCH_SIZE", 32))
+            )
+        if name != "none":
+            logger.warning(f"Unknown reranker {name} (expected one of {', '.join(RERANKERS)}); reranking disabled")
+    except Exception as e:
+        logger.warning(f"Reranker {name} unavailable, reranking disabled: {e}")
+    return None
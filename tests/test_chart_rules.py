@@ -0,0 +1,112 @@
+from convBI.chart_rules import MAX_BAR_CATEGORIES, recommend_chart
+from convBI.query_result import QueryResult
+
+
+def _result(columns, types, rows, truncated=False):
+    return QueryResult(columns=columns, types=types, rows=rows, truncated=truncated)
+
+
+def test_no_columns_is_left_to_the_llm():
+    assert recommend_chart(_result([], [], [])) is None
+
+
+def test_no_rows_is_empty():
+    recommendation = recommend_chart(_result(["n"], ["int8"], []))
+    assert recommendation.chart == "empty"
+    assert recommendation.option == {"title": {"text": "No data to visualize"}}
+
+
+def test_single_value_is_a_kpi_with_a_series():
+    recommendation = recommend_chart(_result(["total"], ["int8"], [(12345,)]))
+    assert recommendation.chart == "kpi"
+    assert recommendation.option["title"]["text"] == "12,345"
+    assert recommendation.option["series"] == [{"name": "total", "type": "bar", "data": [12345]}]
+
+
+def test_single_row_of_measures_is_a_bar_per_column():
+    recommendation = recommend_chart(_result(["min", "max"], ["int4", "int4"], [(1, 9)]))
+    assert recommendation.chart == "bar"
+    assert recommendation.option["xAxis"]["data"] == ["min", "max"]
+    assert recommendation.option["series"][0]["data"] == [1, 9]
+
+
+def test_time_series_is_a_sorted_line():
+    rows = [("2024-03-01", 3), ("2024-01-01", 1), ("2024-02-01", 2)]
+    recommendation = recommend_chart(_result(["month", "orders"], ["date", "int8"], rows))
+    assert recommendation.chart == "line"
+    assert recommendation.option["xAxis"]["data"] == ["2024-01-01", "2024-02-01", "2024-03-01"]
+    assert recommendation.option["series"][0]["data"] == [1, 2, 3]
+
+
+def test_time_series_with_a_group_column_pivots_into_series():
+    rows = [("2024-01-01", "a", 1), ("2024-01-01", "b", 2), ("2024-02-01", "a", 3)]
+    recommendation = recommend_chart(_result(["month", "team", "orders"], ["date", "text", "int8"], rows))
+    assert recommendation.chart == "line"
+    assert {s["name"]: s["data"] for s in recommendation.option["series"]} == {"a": [1, 3], "b": [2, None]}
+
+
+def test_repeated_times_are_left_to_the_llm():
+    rows = [("2024-01-01", 1), ("2024-01-01", 2), ("2024-01-02", 3)]
+    assert recommend_chart(_result(["day", "orders"], ["date", "int8"], rows)) is None
+
+
+def test_repeated_time_and_group_pairs_are_left_to_the_llm():
+    rows = [("2024-01-01", "a", 1), ("2024-01-01", "a", 2), ("2024-01-02", "b", 3)]
+    assert recommend_chart(_result(["day", "team", "orders"], ["date", "text", "int8"], rows)) is None
+
+
+def test_categories_are_a_bar_chart():
+    rows = [("north", 10), ("south", 20), ("east", 5)]
+    recommendation = recommend_chart(_result(["region", "sales"], ["text", "numeric"], rows), "Sales by region")
+    assert recommendation.chart == "bar"
+    assert recommendation.option["xAxis"]["data"] == ["north", "south", "east"]
+
+
+def test_proportion_wording_selects_a_pie_chart():
+    rows = [("north", 10), ("south", 20), ("east", 5)]
+    recommendation = recommend_chart(_result(["region", "sales"], ["text", "numeric"], rows), "Share of sales by region")
+    assert recommendation.chart == "pie"
+    assert recommendation.option["series"][0]["data"][1] == {"value": 20, "name": "south"}
+
+
+def test_repeated_labels_are_left_to_the_llm():
+    rows = [("north", 10), ("north", 20), ("east", 5)]
+    assert recommend_chart(_result(["region", "sales"], ["text", "numeric"], rows)) is None
+
+
+def test_many_categories_become_a_top_n_bar_chart():
+    rows = [(f"customer {i}", i) for i in range(MAX_BAR_CATEGORIES + 10)]
+    recommendation = recommend_chart(_result(["customer", "revenue"], ["text", "int8"], rows))
+    assert recommendation.chart == "bar"
+    data = recommendation.option["series"][0]["data"]
+    assert len(data) == MAX_BAR_CATEGORIES
+    assert data[0] == MAX_BAR_CATEGORIES + 9
+    assert data == sorted(data, reverse=True)
+    assert recommendation.option["title"]["subtext"] == f"Top {MAX_BAR_CATEGORIES} of {MAX_BAR_CATEGORIES + 10} by revenue"
+
+
+def test_two_measures_are_a_scatter_chart():
+    rows = [(1.5, 2.0), (2.5, 3.5), (3.0, 1.0)]
+    recommendation = recommend_chart(_result(["price", "rating"], ["float8", "float8"], rows))
+    assert recommendation.chart == "scatter"
+    assert recommendation.option["series"][0]["data"] == [[1.5, 2.0], [2.5, 3.5], [3.0, 1.0]]
+
+
+def test_identifier_or_period_column_is_not_a_scatter_axis():
+    rows = [(2021, 10.5), (2022, 12.0), (2023, 9.75)]
+    assert recommend_chart(_result(["year", "revenue"], ["int4", "numeric"], rows)) is None
+
+
+def test_results_without_numbers_are_left_to_the_llm():
+    rows = [("alice", "admin"), ("bob", "viewer")]
+    assert recommend_chart(_result(["name", "role"], ["text", "text"], rows)) is None
+
+
+def test_every_chart_option_has_a_series():
+    results = [
+        _result(["total"], ["int8"], [(1,)]),
+        _result(["region", "sales"], ["text", "int8"], [(f"r{i}", i) for i in range(80)]),
+        _result(["x", "y"], ["float8", "float8"], [(0.5, 1.0), (1.5, 2.0), (2.5, 0.5)]),
+    ]
+    for result in results:
+        assert recommend_chart(result).option["series"]
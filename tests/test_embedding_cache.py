@@ -0,0 +1,69 @@
+import struct
+
+import numpy as np
+
+from services.embedding_cache import (
+    DENSE,
+    SPARSE,
+    EmbeddingCache,
+    SparseVectorData,
+    decode_dense,
+    decode_sparse,
+    encode_dense,
+    encode_sparse,
+    make_key,
+)
+
+
+def test_dense_vectors_pack_as_float32():
+    vector = [0.25, -1.5, 3.0]
+    data = encode_dense(vector)
+    assert len(data) == 4 * len(vector)
+    assert decode_dense(data) == vector
+
+
+def test_sparse_vectors_pack_count_indices_and_values():
+    vector = SparseVectorData(indices=np.array([3, 17, 1024]), values=np.array([0.5, 1.25, -2.0]))
+    data = encode_sparse(vector)
+    assert struct.unpack_from("<I", data) == (3,)
+    assert len(data) == 4 + 3 * 4 + 3 * 4
+    decoded = decode_sparse(data)
+    assert decoded.indices.tolist() == [3, 17, 1024]
+    assert decoded.values.tolist() == [0.5, 1.25, -2.0]
+
+
+def test_empty_sparse_vector():
+    decoded = decode_sparse(encode_sparse(SparseVectorData(indices=np.array([]), values=np.array([]))))
+    assert decoded.indices.size == 0
+    assert decoded.values.size == 0
+
+
+def test_keys_ignore_case_and_whitespace_but_not_kind_or_model():
+    assert make_key(DENSE, "m", "Total  Sales\n") == make_key(DENSE, "m", "total sales")
+    assert make_key(DENSE, "m", "total sales") != make_key(SPARSE, "m", "total sales")
+    assert make_key(DENSE, "m", "total sales") != make_key(DENSE, "other", "total sales")
+
+
+def test_memory_tier_is_an_lru():
+    cache = EmbeddingCache(max_entries=2)
+    cache.set(DENSE, "m", "a", [1.0])
+    cache.set(DENSE, "m", "b", [2.0])
+    assert cache.get(DENSE, "m", "a") == [1.0]
+    cache.set(DENSE, "m", "c", [3.0])
+    assert cache.get(DENSE, "m", "b") is None
+    assert cache.get(DENSE, "m", "A ") == [1.0]
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["misses"], stats["memory_entries"]) == (2, 1, 2)
+
+
+def test_get_or_compute_computes_once():
+    cache = EmbeddingCache()
+    calls = []
+
+    def compute(text):
+        calls.append(text)
+        return [float(len(text))]
+
+    assert cache.get_or_compute(DENSE, "m", "revenue", compute) == [7.0]
+    assert cache.get_or_compute(DENSE, "m", "Revenue", compute) == [7.0]
+    assert calls == ["revenue"]
@@ -0,0 +1,49 @@
+import multiprocessing
+
+import numpy as np
+
+from services.embedding_cache import DENSE, SPARSE, SparseVectorData
+from services.embedding_store import EmbeddingStore
+
+
+def test_vectors_round_trip_through_disk(tmp_path):
+    EmbeddingStore(tmp_path).put_many(DENSE, "model", ["a", "b"], [[1.0, 2.0], [3.0, 4.0]])
+    store = EmbeddingStore(tmp_path)
+    assert store.get_many(DENSE, "model", ["b", "a", "c"]) == [[3.0, 4.0], [1.0, 2.0], None]
+
+
+def test_stores_sharing_a_directory_see_each_others_writes(tmp_path):
+    first, second = EmbeddingStore(tmp_path), EmbeddingStore(tmp_path)
+    assert first.get_many(DENSE, "model", ["a"]) == [None]
+    second.put_many(DENSE, "model", ["a"], [[1.0]])
+    assert first.get_many(DENSE, "model", ["a"]) == [[1.0]]
+
+    # Both append after the other's write without overwriting it
+    first.put_many(DENSE, "model", ["b", "a"], [[2.0], [9.0]])
+    second.put_many(DENSE, "model", ["c"], [[3.0]])
+    assert EmbeddingStore(tmp_path).get_many(DENSE, "model", ["a", "b", "c"]) == [[1.0], [2.0], [3.0]]
+
+
+def _write(path, worker):
+    texts = [f"{worker}-{i}" for i in range(50)]
+    EmbeddingStore(path).put_many(DENSE, "model", texts, [[float(worker), float(i)] for i in range(50)])
+
+
+def test_concurrent_writer_processes_do_not_corrupt_the_store(tmp_path):
+    processes = [multiprocessing.Process(target=_write, args=(tmp_path, worker)) for worker in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    store = EmbeddingStore(tmp_path)
+    for worker in range(4):
+        vectors = store.get_many(DENSE, "model", [f"{worker}-{i}" for i in range(50)])
+        assert vectors == [[float(worker), float(i)] for i in range(50)]
+
+
+def test_sparse_vectors_keep_indices_and_values(tmp_path):
+    vector = SparseVectorData(indices=np.array([3, 17]), values=np.array([0.5, -1.0]))
+    EmbeddingStore(tmp_path).put_many(SPARSE, "bm25", ["a"], [vector])
+    stored = EmbeddingStore(tmp_path).get_many(SPARSE, "bm25", ["a"])[0]
+    assert stored.indices.tolist() == [3, 17]
+    assert stored.values.tolist() == [0.5, -1.0]
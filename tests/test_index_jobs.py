@@ -0,0 +1,24 @@
+import threading
+
+import pytest
+
+from services.index_jobs import FAILED, SUCCEEDED, IndexJobManager, JobConflictError
+
+
+def test_inline_run_conflicts_with_a_running_background_job():
+    jobs, release = IndexJobManager(), threading.Event()
+    background = jobs.submit("semantics", "template.json", "diff", lambda job: release.wait(5) and {"status": "success"})
+    with pytest.raises(JobConflictError):
+        jobs.run("semantics", "template.json", "diff", lambda job: {})
+    assert jobs.run("other", "template.json", "diff", lambda job: {"status": "success"}).status == SUCCEEDED
+    release.set()
+    jobs.close()
+    assert background.job_id in {job.job_id for job in jobs.list()}
+
+
+def test_inline_run_records_failures():
+    def fail(job):
+        raise ValueError("boom")
+
+    job = IndexJobManager().run("semantics", "template.json", "diff", fail)
+    assert (job.status, job.error) == (FAILED, "boom")
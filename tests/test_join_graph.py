@@ -0,0 +1,85 @@
+import json
+from pathlib import Path
+
+from services.join_graph import JoinGraph, template_tables
+
+TEMPLATE = Path(__file__).resolve().parent.parent / "semantics" / "template.json"
+
+
+def _graph():
+    return JoinGraph.from_template(json.loads(TEMPLATE.read_text()))
+
+
+def _composite_template():
+    return {"schemas": {"sales": {"tables": [
+        {"table_name": "orders", "primary_key": ["order_id", "region"], "foreign_keys": []},
+        {
+            "table_name": "order_lines",
+            "primary_key": ["order_id", "region", "line_no"],
+            "foreign_keys": [
+                {"column": ["order_id", "region"], "references": {"table": "orders", "column": ["order_id", "region"]}},
+                {"column": "sku", "references": {"schema": "catalog", "table": "products", "column": "sku"}},
+            ],
+        },
+    ]}}}
+
+
+def test_template_tables_are_keyed_by_schema_and_name():
+    keys = [key for key, _, _ in template_tables(json.loads(TEMPLATE.read_text()))]
+    assert "public.users" in keys
+    assert "analytics.events" in keys
+
+
+def test_edges_skip_references_outside_the_template():
+    graph = JoinGraph.from_template(_composite_template())
+    assert graph.edges == [{
+        "from": "sales.order_lines",
+        "from_columns": ["order_id", "region"],
+        "to": "sales.orders",
+        "to_columns": ["order_id", "region"],
+    }]
+
+
+def test_composite_join_condition():
+    plan = JoinGraph.from_template(_composite_template()).join_paths(["sales.orders", "sales.order_lines"])
+    assert [join["condition"] for join in plan["joins"]] == [
+        "sales.order_lines.order_id = sales.orders.order_id AND sales.order_lines.region = sales.orders.region"
+    ]
+    assert plan["bridge_tables"] == []
+    assert plan["unconnected"] == []
+
+
+def test_resolve_by_key_schema_and_unique_name():
+    graph = _graph()
+    assert graph.resolve("public.users") == "public.users"
+    assert graph.resolve("users", "public") == "public.users"
+    assert graph.resolve("users") == "public.users"
+    assert graph.resolve("users", "analytics") == "public.users"
+    assert graph.resolve("missing") is None
+
+
+def test_bridge_tables_are_pulled_in():
+    plan = _graph().join_paths(["analytics.events", "analytics.reports"], max_bridges=2)
+    assert set(plan["bridge_tables"]) == {"public.users", "public.organizations"}
+    assert len(plan["joins"]) == 3
+    assert plan["unconnected"] == []
+
+
+def test_paths_longer_than_max_bridges_are_not_joined():
+    plan = _graph().join_paths(["analytics.events", "analytics.reports"], max_bridges=1)
+    assert plan["joins"] == []
+    assert plan["bridge_tables"] == []
+    assert plan["unconnected"] == ["analytics.events", "analytics.reports"]
+
+
+def test_single_or_unknown_tables_need_no_joins():
+    graph = _graph()
+    assert graph.join_paths(["public.users"]) == {"joins": [], "bridge_tables": [], "unconnected": []}
+    assert graph.join_paths(["nowhere.missing"]) == {"joins": [], "bridge_tables": [], "unconnected": []}
+
+
+def test_round_trip_through_dict():
+    graph = _graph()
+    restored = JoinGraph.from_dict(json.loads(json.dumps(graph.to_dict())))
+    tables = ["safety.incidents", "public.organizations", "analytics.events"]
+    assert restored.join_paths(tables) == graph.join_paths(tables)
@@ -0,0 +1,72 @@
+import datetime
+import decimal
+import uuid
+
+from convBI.query_result import QueryResult, render_for_prompt, to_json_value, type_category
+from convBI.token_budget import count_tokens
+
+
+def _result(rows):
+    return QueryResult.from_rows(["id", "name", "amount"], ["int4", "text", "numeric"], rows)
+
+
+def test_type_category():
+    assert type_category("int8") == "number"
+    assert type_category("numeric") == "number"
+    assert type_category("timestamptz") == "temporal"
+    assert type_category("bool") == "boolean"
+    assert type_category("varchar") == "text"
+
+
+def test_to_json_value():
+    assert to_json_value(decimal.Decimal("3")) == 3
+    assert isinstance(to_json_value(decimal.Decimal("3")), int)
+    assert to_json_value(decimal.Decimal("2.50")) == 2.5
+    assert to_json_value(datetime.date(2024, 1, 31)) == "2024-01-31"
+    assert to_json_value(datetime.datetime(2024, 1, 31, 12, 30)) == "2024-01-31T12:30:00"
+    assert to_json_value(datetime.timedelta(hours=1)) == "1:00:00"
+    value = uuid.UUID("12345678-1234-5678-1234-567812345678")
+    assert to_json_value(value) == str(value)
+    assert to_json_value(None) is None
+
+
+def test_dict_round_trip_and_records():
+    result = QueryResult.from_rows(["id", "name"], ["int4", "text"], [(1, "a"), (2, "b")], truncated=True, row_count=10)
+    restored = QueryResult.from_dict(result.to_dict())
+    assert restored == result
+    assert restored.records() == [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+
+
+def test_small_result_renders_in_full():
+    text = _result([(1, "a, b", decimal.Decimal("1.5")), (2, None, 2)]).render(1000)
+    assert text.splitlines() == [
+        "columns: id (int4), name (text), amount (numeric)",
+        "rows: 2",
+        "id,name,amount",
+        '1,"a, b",1.5',
+        "2,,2",
+    ]
+
+
+def test_truncated_result_says_so():
+    result = QueryResult.from_rows(["id"], ["int4"], [(1,)], truncated=True, row_count=5000)
+    assert "rows: 1 fetched (result truncated; 5000 rows in total)" in result.render(1000)
+
+
+def test_large_result_is_sampled_to_the_budget():
+    result = _result([(i, f"customer number {i}", i * 1.5) for i in range(2000)])
+    text, shown = result.render_sampled(300)
+    assert count_tokens(text) <= 300
+    assert 1 <= shown < 2000
+    lines = text.splitlines()
+    assert lines[2] == f"showing {shown} sampled rows: the first {(shown + 1) // 2}, then evenly spaced"
+    # The first rows are kept in order, the rest are spread over the remainder
+    assert lines[4].startswith("0,")
+    assert not lines[-1].startswith(f"{shown - 1},")
+
+
+def test_render_for_prompt_uses_the_prompt_budget(monkeypatch):
+    monkeypatch.setenv("RESULT_TOKEN_BUDGET_SUMMARIZER", "200")
+    result = _result([(i, f"customer number {i}", i * 1.5) for i in range(500)])
+    assert count_tokens(render_for_prompt({"query_result": result}, "summarizer")) <= 200
+    assert render_for_prompt({}, "summarizer") == ""
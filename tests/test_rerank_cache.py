@@ -0,0 +1,67 @@
+import pytest
+
+from services import rerank_cache
+from services.rerank_cache import RerankCache, candidate_key, from_ranked, make_key
+
+
+def _candidates():
+    return [
+        {"schema_name": "public", "table_name": "users", "content_hash": "h1", "score": 0.9},
+        {"schema_name": "public", "table_name": "orders", "content_hash": "h2", "score": 0.8},
+        {"schema_name": "sales", "table_name": "invoices", "content_hash": "h3", "score": 0.7},
+    ]
+
+
+def test_candidate_key():
+    assert candidate_key({"schema_name": "public", "table_name": "users"}) == "public.users"
+
+
+def test_key_ignores_candidate_order_and_question_spelling():
+    candidates = _candidates()
+    assert make_key("cohere", "Orders per user", candidates, 3) == make_key("cohere", "orders  per USER", candidates[::-1], 3)
+
+
+@pytest.mark.parametrize("change", [
+    lambda c: c.__setitem__(0, {**c[0], "content_hash": "changed"}),
+    lambda c: c.pop(),
+])
+def test_key_changes_with_the_candidate_set(change):
+    candidates = _candidates()
+    key = make_key("cohere", "orders per user", candidates, 3)
+    change(candidates)
+    assert make_key("cohere", "orders per user", candidates, 3) != key
+
+
+def test_key_depends_on_reranker_and_top_k():
+    candidates = _candidates()
+    key = make_key("cohere", "orders per user", candidates, 3)
+    assert make_key("fastembed", "orders per user", candidates, 3) != key
+    assert make_key("cohere", "orders per user", candidates, 2) != key
+    assert key.startswith("rerank:cohere:")
+
+
+def test_cached_order_is_rebuilt_from_current_candidates():
+    cache = RerankCache()
+    candidates = _candidates()
+    reranked = [{**candidates[2], "rerank_score": 0.95}, {**candidates[0], "rerank_score": 0.4}]
+    cache.set("key", reranked)
+
+    results = from_ranked(candidates, cache.get("key"))
+    assert [r["table_name"] for r in results] == ["invoices", "users"]
+    assert [r["rerank_score"] for r in results] == [0.95, 0.4]
+    assert results[0]["original_score"] == 0.7
+    assert results[0] is not candidates[2]
+
+
+def test_entries_expire_and_are_evicted(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rerank_cache.time, "monotonic", lambda: now[0])
+    cache = RerankCache(max_entries=2, ttl_seconds=10)
+    cache.set("a", [])
+    cache.set("b", [])
+    cache.set("c", [], late=True)
+    assert cache.get("a") is None
+    now[0] += 11
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["late_stores"], stats["entries"]) == (0, 2, 1, 1)
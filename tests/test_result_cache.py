@@ -0,0 +1,124 @@
+import asyncio
+
+from convBI.result_cache import SQLResultCache, canonicalize_sql, extract_tables
+
+
+def test_whitespace_case_and_trailing_semicolon_are_normalized():
+    assert canonicalize_sql("SELECT  *\n  FROM Users\tWHERE id = 1 ;") == "select * from users where id = 1"
+
+
+def test_literals_and_quoted_identifiers_keep_their_spelling():
+    sql = """SELECT "UserName" FROM users WHERE status = 'Active  User'"""
+    assert canonicalize_sql(sql) == """select "UserName" from users where status = 'Active  User'"""
+
+
+def test_equivalent_spellings_share_a_key():
+    cache = SQLResultCache("db", redis_client=object(), async_redis_client=object())
+    assert cache.make_key("select * from users;") == cache.make_key("SELECT *\nFROM   users")
+    assert cache.make_key("select * from users where name = 'A'") != cache.make_key("select * from users where name = 'a'")
+
+
+def test_keys_are_scoped_to_the_database():
+    first = SQLResultCache("db-1", redis_client=object(), async_redis_client=object())
+    second = SQLResultCache("db-2", redis_client=object(), async_redis_client=object())
+    assert first.make_key("select 1") != second.make_key("select 1")
+
+
+def test_extract_tables_from_from_and_join():
+    sql = canonicalize_sql('SELECT * FROM public.Users u JOIN "Sales"."Orders" o ON o.user_id = u.id LEFT JOIN items ON true')
+    assert extract_tables(sql) == ["items", "orders", "public.users", "sales.orders", "users"]
+
+
+def test_extract_tables_from_comma_separated_from_list():
+    sql = canonicalize_sql("SELECT * FROM orders o, public.customers AS c, items WHERE o.id IN (1, 2) ORDER BY a, b")
+    assert extract_tables(sql) == ["customers", "items", "orders", "public.customers"]
+
+
+def test_ttl_per_collection():
+    cache = SQLResultCache("db", default_ttl=60, ttl_by_collection={"live": 0}, redis_client=object(), async_redis_client=object())
+    assert cache.ttl_for("semantics") == 60
+    assert cache.ttl_for("live") == 0
+    assert cache.get("select 1", "live") is None
+
+
+class _FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+class _FakeRedis:
+    """Just the commands SQLResultCache uses"""
+
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def sadd(self, key, member):
+        self.data.setdefault(key, set()).add(member)
+
+    def expire(self, key, ttl):
+        pass
+
+    def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+
+def test_invalidate_tables_drops_results_referencing_qualified_or_bare_names():
+    cache = SQLResultCache("db", redis_client=_FakeRedis(), async_redis_client=object())
+    cache.set("select * from users", "semantics", {"rows": [1]})
+    cache.set("select * from public.users", "semantics", {"rows": [2]})
+    cache.set("select * from orders", "semantics", {"rows": [3]})
+
+    assert cache.invalidate_tables(["public.users"]) == 2
+    assert cache.get("select * from users", "semantics") is None
+    assert cache.get("select * from public.users", "semantics") is None
+    assert cache.get("select * from orders", "semantics") == {"rows": [3]}
+    assert cache.invalidate_tables([]) == 0
+
+
+class _FakeAsyncPipeline(_FakePipeline):
+    async def execute(self):
+        return [await getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+class _FakeAsyncRedis:
+    def __init__(self, sync):
+        self.sync = sync
+
+    def pipeline(self, transaction=True):
+        return _FakeAsyncPipeline(self)
+
+    def __getattr__(self, name):
+        async def command(*args, **kwargs):
+            return getattr(self.sync, name)(*args, **kwargs)
+        return command
+
+
+def test_ainvalidate_table_drops_qualified_and_bare_names_like_the_sync_path():
+    redis_client = _FakeRedis()
+    cache = SQLResultCache("db", redis_client=redis_client, async_redis_client=_FakeAsyncRedis(redis_client))
+    cache.set("select * from users", "semantics", {"rows": [1]})
+    cache.set('select * from "Public".users', "semantics", {"rows": [2]})
+    cache.set("select * from orders", "semantics", {"rows": [3]})
+
+    assert asyncio.run(cache.ainvalidate_table("public.users")) == 2
+    assert cache.get("select * from users", "semantics") is None
+    assert cache.get("select * from orders", "semantics") == {"rows": [3]}
@@ -0,0 +1,36 @@
+from convBI import schema_ddl
+from convBI.schema_ddl import format_semantic_info, prompt_semantics, render_table
+
+
+def _table(columns=("id", "name"), content_hash="abc"):
+    return {
+        "table_name": "users",
+        "description": "Accounts",
+        "primary_key": ["id"],
+        "columns": [{"column_name": name, "data_type": "text"} for name in columns],
+        "indexes": [{"columns": ["name"]}],
+        "content_hash": content_hash,
+    }
+
+
+def test_content_hash_is_not_rendered():
+    text = render_table("users", _table())
+    assert "abc" not in text and "content_hash" not in text
+    assert "content_hash" not in str(prompt_semantics({"users": _table()}))
+
+
+def test_pruned_variants_of_a_cached_table_render_their_own_columns():
+    schema_ddl._cache.clear()
+    full = render_table("users", _table())
+    pruned = {**_table(columns=("id",)), "omitted_column_count": 1}
+    assert "name text" in full
+    assert "name text" not in render_table("users", pruned)
+    assert render_table("users", _table()) == full
+    assert len(schema_ddl._cache) == 2
+
+
+def test_tables_without_a_content_hash_and_uncached_renders_skip_the_cache():
+    schema_ddl._cache.clear()
+    render_table("users", _table(content_hash=""))
+    format_semantic_info({"users": _table()}, cache=False)
+    assert len(schema_ddl._cache) == 0
@@ -0,0 +1,116 @@
+from convBI.schema_ddl import render_schema
+from convBI.schema_pruning import key_columns, prune_schema, tokenize
+from convBI.token_budget import count_tokens
+
+
+def _table(name, extra_columns, primary_key=("id",), foreign_keys=()):
+    columns = [{"column_name": column, "data_type": "int8"} for column in primary_key]
+    columns += [
+        {"column_name": f"{name}_{i}", "data_type": "text", "description": f"Attribute number {i} of the {name} record"}
+        for i in range(extra_columns)
+    ]
+    for fk in foreign_keys:
+        columns += [{"column_name": column, "data_type": "int8"} for column in ([fk["column"]] if isinstance(fk["column"], str) else fk["column"])]
+    return {
+        "description": f"{name} records",
+        "primary_key": list(primary_key),
+        "foreign_keys": list(foreign_keys),
+        "columns": columns,
+        "indexes": [{"columns": ["id"], "index_type": "btree"}],
+    }
+
+
+def _column_names(table):
+    return [column["column_name"] for column in table["columns"]]
+
+
+def test_tokenize_splits_identifiers_and_stems():
+    assert tokenize("orderItems total_amounts") == {"order", "item", "total", "amount"}
+    assert tokenize("How many companies") == {"company"}
+
+
+def test_key_columns_flattens_composite_keys():
+    table = {
+        "primary_key": ["order_id", "line_no"],
+        "foreign_keys": [
+            {"column": ["order_id", "warehouse_id"], "references": {"table": "orders", "column": ["id", "warehouse_id"]}},
+            {"column": "product_id", "references": {"table": "products", "column": "id"}},
+            {"references": {"table": "broken"}},
+            "not a foreign key",
+        ],
+    }
+    assert key_columns(table) == {"order_id", "line_no", "warehouse_id", "product_id"}
+
+
+def test_schema_within_budget_is_unchanged():
+    semantics = {"users": _table("users", 3)}
+    pruned, report = prune_schema(semantics, "list users", 10_000)
+    assert pruned is semantics
+    assert report["tokens_saved"] == 0
+    assert report["tables_dropped"] == []
+
+
+def test_least_relevant_columns_are_dropped_first():
+    semantics = {"users": _table("users", 30)}
+    semantics["users"]["columns"].append({"column_name": "signup_channel", "data_type": "text"})
+    full = count_tokens(str(semantics))
+    pruned, report = prune_schema(semantics, "users by signup channel", full // 2)
+
+    names = _column_names(pruned["users"])
+    assert "id" in names
+    assert "signup_channel" in names
+    assert "indexes" not in pruned["users"]
+    assert pruned["users"]["omitted_column_count"] == 31 - len(names) + 1
+    assert report["tokens_after"] <= full // 2
+    assert report["columns_after"] == len(names)
+
+
+def test_key_columns_are_never_dropped():
+    semantics = {
+        "orders": _table("orders", 20, foreign_keys=[{"column": ["customer_id", "region_id"], "references": {"table": "customers"}}]),
+    }
+    pruned, _ = prune_schema(semantics, "unrelated question", 1)
+    assert {"id", "customer_id", "region_id"} <= set(_column_names(pruned["orders"]))
+
+
+def test_tables_are_dropped_lowest_rank_first_and_columns_refit():
+    semantics = {
+        "orders": _table("orders", 25),
+        "customers": _table("customers", 25),
+        "products": _table("products", 25, primary_key=tuple(f"sku_part_{i}" for i in range(12))),
+    }
+
+    def keys_only(names):
+        return {
+            name: {key: value for key, value in semantics[name].items() if key != "indexes"}
+            | {"columns": [c for c in semantics[name]["columns"] if c["column_name"] in semantics[name]["primary_key"]],
+               "omitted_column_count": 25}
+            for name in names
+        }
+
+    two_tables = count_tokens(str(keys_only(["orders", "customers"])))
+    three_tables = count_tokens(str(keys_only(["orders", "customers", "products"])))
+    # Room for two tables' key columns and some optional columns, not for all three tables' keys
+    budget = (two_tables + three_tables) // 2
+    pruned, report = prune_schema(semantics, "orders_3", budget)
+
+    assert report["tables_dropped"] == ["products"]
+    assert list(pruned) == ["orders", "customers"]
+    # Dropping a table frees room for the remaining tables' optional columns again
+    assert "orders_3" in _column_names(pruned["orders"])
+    assert report["tokens_after"] <= budget
+
+
+def test_first_and_pinned_tables_are_kept():
+    semantics = {name: _table(name, 10) for name in ("orders", "customers", "order_customers")}
+    pruned, report = prune_schema(semantics, "orders", 1, pinned=["order_customers"])
+    assert list(pruned) == ["orders", "order_customers"]
+    assert report["tables_dropped"] == ["customers"]
+
+
+def test_budget_is_measured_on_the_given_rendering():
+    semantics = {name: _table(name, 20) for name in ("orders", "customers")}
+    budget = count_tokens(render_schema(semantics)) // 2
+    pruned, report = prune_schema(semantics, "orders", budget, render=render_schema)
+    assert report["tokens_after"] == count_tokens(render_schema(pruned))
+    assert report["tokens_after"] <= budget